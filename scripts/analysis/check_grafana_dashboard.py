@@ -3,50 +3,63 @@
 Script para verificar o dashboard Grafana e capturar screenshots dos erros
 """
 from playwright.sync_api import sync_playwright
-import time
+import argparse
 import json
 import os
+import sys
 
-def check_grafana_dashboard():
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from console_capture import ConsoleCapture
+from dom_snapshot import dom_snapshot
+from readiness import NetworkWatcher, wait_for_any_selector, wait_for_dom_quiet, wait_for_url
+from screenshots import ScreenshotStore, print_comparison
+
+# Consultas dos painéis passam por este endpoint do Grafana
+DS_QUERY_ENDPOINT = '/api/ds/query'
+
+def check_grafana_dashboard(tolerance=0.01, update_baseline=False):
     # Criar diretório para outputs se não existir
     output_dir = '/home/leonardo/Documents/VSCODE/MyIA/grafana_check_output'
     os.makedirs(output_dir, exist_ok=True)
     
+    # Screenshots deduplicados/comprimidos, comparados com o baseline
+    screenshots = ScreenshotStore(os.path.join(output_dir, 'screenshots'), tolerance=tolerance)
+    screenshots.start_run()
+    
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         context = browser.new_context(viewport={'width': 1920, 'height': 1080})
         page = context.new_page()
         
-        # Configurar captura de logs do console
-        console_logs = []
-        page.on("console", lambda msg: console_logs.append({
-            "type": msg.type,
-            "text": msg.text
-        }))
+        # Configurar captura de logs do console (buffer limitado; credenciais não podem aparecer)
+        console = ConsoleCapture(page, secrets={'email': '123@123.com', 'password': '123123'})
         
         try:
             print("🔍 Acessando Grafana...")
             page.goto('http://localhost:3002/login', wait_until='domcontentloaded', timeout=30000)
             
+            # Seletores para o campo de email
+            email_selectors = [
+                'input[name="user"]',
+                'input[type="text"]',
+                'input[placeholder*="email"]',
+                'input[placeholder*="username"]'
+            ]
+            
             # Aguardar formulário de login
             print("⏳ Aguardando formulário de login...")
-            time.sleep(2)
+            if not wait_for_any_selector(page, email_selectors, timeout=10000):
+                print("⚠️ Formulário de login não apareceu dentro do limite")
             
             # Capturar screenshot da página de login
-            page.screenshot(path=f'{output_dir}/01_login_page.png')
+            screenshots.capture(page, '01_login_page')
             print("📸 Screenshot da página de login capturada")
             
             # Fazer login com seletores mais robustos
             print("🔐 Fazendo login no Grafana...")
             
             # Tentar diferentes seletores para o campo de email
-            email_selectors = [
-                'input[name="user"]',
-                'input[type="text"]',
-                'input[placeholder*="email"]',
-                'input[placeholder*="username"]'
-            ]
-            
             email_filled = False
             for selector in email_selectors:
                 try:
@@ -60,7 +73,7 @@ def check_grafana_dashboard():
             
             if not email_filled:
                 print("❌ Não foi possível preencher o campo de email")
-                page.screenshot(path=f'{output_dir}/error_email_field.png')
+                screenshots.capture(page, 'error_email_field')
             
             # Tentar diferentes seletores para o campo de senha
             password_selectors = [
@@ -82,10 +95,10 @@ def check_grafana_dashboard():
             
             if not password_filled:
                 print("❌ Não foi possível preencher o campo de senha")
-                page.screenshot(path=f'{output_dir}/error_password_field.png')
+                screenshots.capture(page, 'error_password_field')
             
             # Capturar screenshot antes de clicar
-            page.screenshot(path=f'{output_dir}/02_before_login.png')
+            screenshots.capture(page, '02_before_login')
             
             # Clicar no botão de login
             login_button_selectors = [
@@ -108,14 +121,14 @@ def check_grafana_dashboard():
             
             if not login_clicked:
                 print("❌ Não foi possível clicar no botão de login")
-                page.screenshot(path=f'{output_dir}/error_login_button.png')
+                screenshots.capture(page, 'error_login_button')
             
             # Aguardar navegação após login
             print("⏳ Aguardando navegação após login...")
-            time.sleep(5)
+            wait_for_url(page, lambda url: 'login' not in url, timeout=10000)
             
             # Capturar screenshot após login
-            page.screenshot(path=f'{output_dir}/03_after_login.png')
+            screenshots.capture(page, '03_after_login')
             print("📸 Screenshot após login capturada")
             
             # Verificar se ainda está na página de login
@@ -125,37 +138,43 @@ def check_grafana_dashboard():
             if 'login' in current_url:
                 print("⚠️ Ainda na página de login, tentando acesso direto ao dashboard...")
             
+            # Acompanhar as consultas dos painéis desde a navegação
+            panel_queries = NetworkWatcher(page, DS_QUERY_ENDPOINT)
+            
             # Tentar acessar o dashboard diretamente
             print("🔍 Acessando dashboard de erros...")
             page.goto('http://localhost:3002/d/myia-errors/myia-errors?orgId=1&refresh=10s&viewPanel=8', 
                      wait_until='domcontentloaded', timeout=30000)
             
-            # Aguardar carregamento completo do dashboard
+            # Aguardar as respostas de todos os painéis e o DOM estabilizar
             print("⏳ Aguardando carregamento do dashboard...")
-            time.sleep(10)
+            if not panel_queries.wait_until_idle(quiet_ms=1000, timeout=30000, min_completed=1):
+                print("⚠️ Consultas dos painéis não concluíram dentro do limite")
+            wait_for_dom_quiet(page, quiet_ms=500, timeout=10000)
+            print(f"✅ {panel_queries.completed} consultas concluídas ({panel_queries.failed} falharam)")
             
             # Capturar screenshot da página completa
             print("📸 Capturando screenshot da página completa...")
-            page.screenshot(path=f'{output_dir}/04_dashboard_full.png', full_page=True)
+            screenshots.capture(page, '04_dashboard_full', full_page=True)
             
             # Tentar capturar o painel específico de erros
             print("📸 Capturando screenshot do painel de erros...")
-            page.screenshot(path=f'{output_dir}/05_errors_panel.png')
+            screenshots.capture(page, '05_errors_panel')
             
             # Tentar extrair informações do DOM
             print("🔍 Extraindo informações do DOM...")
             
-            # Verificar se há elementos de erro visíveis
-            error_elements = page.locator('[class*="error"]').all()
-            print(f"✅ Encontrados {len(error_elements)} elementos com 'error' no DOM")
-            
-            # Verificar se há tabelas ou gráficos
-            tables = page.locator('table').all()
-            print(f"✅ Encontradas {len(tables)} tabelas no dashboard")
-            
-            # Verificar painéis Grafana
-            panels = page.locator('[class*="panel"]').all()
-            print(f"✅ Encontrados {len(panels)} painéis Grafana")
+            # Elementos de erro, tabelas e painéis em uma única consulta ao DOM
+            snapshot = dom_snapshot(page, counts={
+                'errors': '[class*="error"]',
+                'tables': 'table',
+                'panels': '[class*="panel"]',
+            })
+            counts = snapshot['counts']
+            print(f"✅ Encontrados {counts['errors']['total']} elementos com 'error' no DOM "
+                  f"({counts['errors']['visible']} visíveis)")
+            print(f"✅ Encontradas {counts['tables']['total']} tabelas no dashboard")
+            print(f"✅ Encontrados {counts['panels']['total']} painéis Grafana")
             
             # Tentar extrair texto visível da página
             page_text = page.inner_text('body')
@@ -166,25 +185,35 @@ def check_grafana_dashboard():
             print(f"✅ Texto da página salvo em {output_dir}/grafana_page_text.txt")
             
             # Salvar logs do console
+            console_report = console.export()
             with open(f'{output_dir}/grafana_console_logs.json', 'w', encoding='utf-8') as f:
-                json.dump(console_logs, f, indent=2)
-            print(f"✅ {len(console_logs)} logs do console salvos em {output_dir}/grafana_console_logs.json")
+                json.dump(console_report, f, indent=2)
+            print(f"✅ {console_report['total']} logs do console ({len(console_report['entries'])} mantidos) "
+                  f"salvos em {output_dir}/grafana_console_logs.json")
+            if console_report['findings']:
+                print(f"⚠️ Dados sensíveis no console: {console_report['findings']}")
             
-            # Aguardar mais um pouco para garantir que dados foram carregados
-            time.sleep(5)
+            # Garantir que nenhuma consulta ficou pendente antes da captura final
+            panel_queries.wait_until_idle(quiet_ms=500, timeout=15000)
             
             # Capturar screenshot final
             print("📸 Capturando screenshot final...")
-            page.screenshot(path=f'{output_dir}/06_final.png', full_page=True)
+            screenshots.capture(page, '06_final', full_page=True)
             
             print("\n✅ Verificação concluída com sucesso!")
+            
+            # Comparação visual com o baseline
+            print("\n🖼️  Screenshots x baseline:")
+            print_comparison(screenshots.compare())
+            stats = screenshots.stats
+            print(f"   {stats['captured']} capturas, {stats['deduplicated']} sem alteração (não regravadas), "
+                  f"{stats['bytes_in'] // 1024}KB → {stats['bytes_stored'] // 1024}KB gravados")
+            if update_baseline:
+                screenshots.update_baseline()
+                print("📌 Baseline de screenshots atualizado")
+            
             print(f"\n📁 Arquivos gerados em {output_dir}:")
-            print("   - 01_login_page.png")
-            print("   - 02_before_login.png")
-            print("   - 03_after_login.png")
-            print("   - 04_dashboard_full.png")
-            print("   - 05_errors_panel.png")
-            print("   - 06_final.png")
+            print("   - screenshots/manifest.json (nome → objeto em screenshots/objects/)")
             print("   - grafana_page_text.txt")
             print("   - grafana_console_logs.json")
             
@@ -192,8 +221,8 @@ def check_grafana_dashboard():
             print(f"❌ Erro ao acessar dashboard: {e}")
             # Tentar capturar screenshot mesmo com erro
             try:
-                page.screenshot(path=f'{output_dir}/error_screenshot.png', full_page=True)
-                print(f"📸 Screenshot de erro salvo em {output_dir}/error_screenshot.png")
+                entry = screenshots.capture(page, 'error_screenshot', full_page=True)
+                print(f"📸 Screenshot de erro salvo em {screenshots.object_path(entry)}")
             except:
                 pass
             raise
@@ -201,4 +230,10 @@ def check_grafana_dashboard():
             browser.close()
 
 if __name__ == "__main__":
-    check_grafana_dashboard()
+    parser = argparse.ArgumentParser(description="Verificação do dashboard de erros do Grafana")
+    parser.add_argument('--tolerance', type=float, default=0.01,
+                        help="Fração de pixels alterados tolerada contra o baseline")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Promove os screenshots desta execução a baseline")
+    args = parser.parse_args()
+    check_grafana_dashboard(tolerance=args.tolerance, update_baseline=args.update_baseline)
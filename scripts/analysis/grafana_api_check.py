@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Verificação dos dashboards do Grafana pela API HTTP (sem browser)
+
+Autentica (Basic ou token), carrega os dashboards por uid, executa os
+targets de todos os painéis via /api/ds/query em paralelo e informa,
+por painel, o resultado, o número de linhas e a latência da consulta.
+
+Com --mock roda contra o backend simulado (scripts/common/mock_backend.py)
+iniciado no próprio processo.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from config import GRAFANA_URL
+from grafana_api import DASHBOARD_UIDS, GrafanaClient, iter_panels, parse_time_ms, summarize_ds_response
+from metrics import summarize
+
+RESULTS_FILE = '/tmp/grafana_api_check.json'
+
+
+async def check_panel(client, uid, panel, time_from, time_to):
+    outcome = {'dashboard': uid, 'panel_id': panel['id'], 'title': panel.get('title', ''), 'type': panel.get('type')}
+    try:
+        response = await client.query_panel(uid, panel, time_from, time_to)
+    except Exception as e:
+        return dict(outcome, status='error', error=str(e) or type(e).__name__, rows=0, latency_ms=None)
+    results = summarize_ds_response(response)
+    errors = [r['error'] for r in results.values() if r['error']]
+    if response.status >= 400 and not errors:
+        errors.append(f"HTTP {response.status}")
+    return dict(
+        outcome,
+        status='error' if errors else ('ok' if any(r['rows'] for r in results.values()) else 'empty'),
+        error='; '.join(errors) or None,
+        rows=sum(r['rows'] for r in results.values()),
+        frames=sum(r['frames'] for r in results.values()),
+        latency_ms=response.elapsed_ms,
+    )
+
+
+async def check_dashboards(base_url, uids, time_from, time_to, user, password, token, concurrency):
+    async with GrafanaClient(base_url, user, password, token, max_connections=concurrency) as client:
+        dashboards = await asyncio.gather(*[client.get_dashboard(uid) for uid in uids])
+        tasks = [
+            check_panel(client, uid, panel, time_from, time_to)
+            for uid, dashboard in zip(uids, dashboards)
+            for panel in iter_panels(dashboard)
+        ]
+        panels = await asyncio.gather(*tasks)
+        return panels, dict(client.http.stats)
+
+
+def print_report(panels, wall_ms):
+    icons = {'ok': '✅', 'empty': '⚪', 'error': '❌'}
+    current = None
+    for p in panels:
+        if p['dashboard'] != current:
+            current = p['dashboard']
+            print(f"\n📊 {current}")
+        latency = f"{p['latency_ms']:>8.1f}ms" if p['latency_ms'] is not None else '       n/a'
+        print(f"   {icons[p['status']]} #{p['panel_id']:<3} {latency} {p['rows']:>6} linhas  {p['title']}")
+        if p['error']:
+            print(f"         {p['error'][:120]}")
+
+    latency = summarize([p['latency_ms'] for p in panels])
+    errors = sum(1 for p in panels if p['status'] == 'error')
+    print("\n" + "=" * 60)
+    print(f"{len(panels)} painéis em {wall_ms:.0f}ms (paralelo), {errors} com erro")
+    if latency['count']:
+        print(f"Latência por painel: p50={latency['p50']}ms p95={latency['p95']}ms max={latency['max']}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificação dos dashboards do Grafana via API")
+    parser.add_argument('--url', default=GRAFANA_URL)
+    parser.add_argument('--user', default=os.environ.get('GRAFANA_USER', 'admin'))
+    parser.add_argument('--password', default=os.environ.get('GRAFANA_PASSWORD', 'admin'))
+    parser.add_argument('--token', default=os.environ.get('GRAFANA_TOKEN'),
+                        help="Token de service account (substitui usuário/senha)")
+    parser.add_argument('--dashboards', default=','.join(DASHBOARD_UIDS), help="UIDs separados por vírgula")
+    parser.add_argument('--from', dest='time_from', default='now-1h')
+    parser.add_argument('--to', dest='time_to', default='now')
+    parser.add_argument('--concurrency', type=int, default=10, help="Conexões simultâneas")
+    parser.add_argument('--mock', action='store_true', help="Usa o backend simulado em vez do Grafana")
+    args = parser.parse_args()
+
+    uids = [uid.strip() for uid in args.dashboards.split(',') if uid.strip()]
+    now_ms = int(time.time() * 1000)
+    time_from, time_to = parse_time_ms(args.time_from, now_ms), parse_time_ms(args.time_to, now_ms)
+
+    mock_server = None
+    base_url = args.url
+    if args.mock:
+        from mock_backend import MockServer
+        mock_server = MockServer().start()
+        base_url = mock_server.url
+
+    print(f"🔍 Consultando {len(uids)} dashboard(s) em {base_url} ({args.time_from} → {args.time_to})")
+    started = time.perf_counter()
+    try:
+        panels, connection_stats = asyncio.run(check_dashboards(
+            base_url, uids, time_from, time_to, args.user, args.password, args.token, args.concurrency))
+        wall_ms = (time.perf_counter() - started) * 1000
+    finally:
+        if mock_server is not None:
+            mock_server.stop()
+
+    print_report(panels, wall_ms)
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump({'base_url': base_url, 'from': time_from, 'to': time_to, 'wall_ms': round(wall_ms, 2),
+                   'connections': connection_stats, 'panels': panels}, f, indent=2)
+    print(f"\n📄 Resultados salvos em: {RESULTS_FILE}")
+    return 1 if any(p['status'] == 'error' for p in panels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
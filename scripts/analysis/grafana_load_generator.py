@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Gerador de carga de "espectadores" de dashboard para Grafana/Loki
+
+Cada espectador simula uma aba aberta: a cada refresh do dashboard dispara
+todas as consultas de painel em paralelo (até 6 conexões, como um
+browser) via /api/ds/query. O número de espectadores sobe em degraus
+(--start, --step, --max) e, a cada degrau, são medidos vazão, latência
+p50/p95/p99, taxa de erros e refreshes que não terminaram dentro do
+intervalo. Se o /metrics do Loki estiver acessível, a vazão e a latência
+média de query_range do lado do Loki entram no relatório.
+
+A rampa para quando o p95 passa do SLO ou a taxa de erros do limite.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from async_http import AsyncHttpClient
+from config import GRAFANA_URL, LOKI_URL
+from grafana_api import GrafanaClient, iter_panels, parse_duration_ms
+from metrics import summarize
+
+RESULTS_FILE = '/tmp/grafana_load_test.json'
+BROWSER_CONNECTIONS = 6
+
+_LOKI_METRIC = re.compile(r'^loki_request_duration_seconds_(count|sum)\{([^}]*)\}\s+([0-9.eE+-]+)$')
+
+
+class StepStats:
+    def __init__(self):
+        self.latencies = []
+        self.requests = 0
+        self.errors = 0
+        self.refreshes = 0
+        self.overruns = 0
+
+    def record(self, response=None, error=False):
+        self.requests += 1
+        if error or response is None or response.status >= 400:
+            self.errors += 1
+        if response is not None:
+            self.latencies.append(response.elapsed_ms)
+
+
+async def loki_query_metrics(loki):
+    """(contagem, soma em s) de query_range no Loki; None se /metrics estiver inacessível"""
+    try:
+        response = await loki.get('/metrics', headers={'Accept': 'text/plain'})
+    except (OSError, asyncio.TimeoutError):
+        return None
+    if response.status != 200:
+        return None
+    totals = {'count': 0.0, 'sum': 0.0}
+    for line in response.body.decode().splitlines():
+        match = _LOKI_METRIC.match(line)
+        if match and 'route="loki_api_v1_query_range"' in match.group(2):
+            totals[match.group(1)] += float(match.group(3))
+    return totals
+
+
+async def viewer(base_url, auth, uid, panels, refresh_s, time_range_ms, stop, stats_ref):
+    """Uma aba: refresh periódico com todas as consultas em paralelo"""
+    async with GrafanaClient(base_url, max_connections=BROWSER_CONNECTIONS, **auth) as client:
+        # Abas não abrem todas no mesmo instante
+        await asyncio.sleep(random.uniform(0, refresh_s))
+        while not stop.is_set():
+            started = time.perf_counter()
+            now_ms = int(time.time() * 1000)
+            stats = stats_ref['current']
+
+            async def one(panel):
+                try:
+                    stats.record(await client.query_panel(uid, panel, now_ms - time_range_ms, now_ms))
+                except Exception:
+                    # Rede, timeout, EOF em conexão nova, linha de status malformada: tudo conta
+                    # como erro; uma exceção solta derrubaria a aba e a carga cairia sem registro
+                    stats.record(error=True)
+
+            await asyncio.gather(*[one(panel) for panel in panels])
+            elapsed = time.perf_counter() - started
+            stats.refreshes += 1
+            if elapsed > refresh_s:
+                stats.overruns += 1
+            try:
+                await asyncio.wait_for(stop.wait(), max(0.0, refresh_s - elapsed))
+            except asyncio.TimeoutError:
+                pass
+
+
+async def run_ramp(args, base_url, auth):
+    async with GrafanaClient(base_url, **auth) as client:
+        dashboard = await client.get_dashboard(args.dashboard)
+    panels = list(iter_panels(dashboard))
+    refresh_s = parse_duration_ms(args.refresh or dashboard.get('refresh') or '10s') / 1000
+    time_range_ms = parse_duration_ms(args.range)
+    print(f"🎯 {args.dashboard}: {len(panels)} painéis, refresh {refresh_s:.0f}s, faixa {args.range}")
+
+    loki = AsyncHttpClient(args.loki_url, timeout=5)
+    stop = asyncio.Event()
+    stats_ref = {'current': StepStats()}
+    viewers = []
+    steps = []
+    try:
+        viewer_count = 0
+        target = args.start
+        while target <= args.max:
+            while viewer_count < target:
+                viewers.append(asyncio.create_task(viewer(
+                    base_url, auth, args.dashboard, panels, refresh_s, time_range_ms, stop, stats_ref)))
+                viewer_count += 1
+
+            # Primeiro refresh de cada aba nova cai dentro do degrau anterior; descarta o aquecimento
+            await asyncio.sleep(min(refresh_s, args.step_duration / 4))
+            stats_ref['current'] = stats = StepStats()
+            loki_before = await loki_query_metrics(loki)
+            started = time.perf_counter()
+            await asyncio.sleep(args.step_duration)
+            elapsed = time.perf_counter() - started
+            loki_after = await loki_query_metrics(loki)
+
+            step = {
+                'viewers': viewer_count,
+                'queries': len(stats.latencies),
+                'throughput_qps': round(len(stats.latencies) / elapsed, 2),
+                'expected_qps': round(viewer_count * len(panels) / refresh_s, 2),
+                'latency_ms': summarize(stats.latencies),
+                'errors': stats.errors,
+                'error_rate': round(stats.errors / stats.requests, 4) if stats.requests else 0.0,
+                'refreshes': stats.refreshes,
+                'refresh_overruns': stats.overruns,
+            }
+            if loki_before and loki_after:
+                count = loki_after['count'] - loki_before['count']
+                step['loki_qps'] = round(count / elapsed, 2)
+                step['loki_mean_ms'] = round((loki_after['sum'] - loki_before['sum']) / count * 1000, 1) if count else None
+            steps.append(step)
+            print_step(step)
+
+            p95 = step['latency_ms'].get('p95') or 0
+            if p95 > args.slo_ms or step['error_rate'] > args.max_error_rate:
+                print(f"🛑 Saturação com {viewer_count} espectadores "
+                      f"(p95 {p95}ms, erros {step['error_rate']:.1%}); rampa interrompida")
+                break
+            target += args.step
+    finally:
+        stop.set()
+        await asyncio.gather(*viewers, return_exceptions=True)
+        await loki.close()
+    return {'dashboard': args.dashboard, 'panels': len(panels), 'refresh_s': refresh_s, 'steps': steps}
+
+
+def print_step(step):
+    latency = step['latency_ms']
+    loki = f" | Loki {step['loki_qps']} q/s, média {step['loki_mean_ms']}ms" if 'loki_qps' in step else ''
+    print(f"👥 {step['viewers']:>4} espectadores: {step['throughput_qps']:>7} q/s (esperado {step['expected_qps']}), "
+          f"p50={latency.get('p50')}ms p95={latency.get('p95')}ms p99={latency.get('p99')}ms, "
+          f"erros {step['error_rate']:.1%}, refresh atrasado {step['refresh_overruns']}/{step['refreshes']}{loki}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga de espectadores de dashboard no Grafana/Loki")
+    parser.add_argument('--url', default=GRAFANA_URL)
+    parser.add_argument('--loki-url', default=LOKI_URL, help="Para ler /metrics do Loki")
+    parser.add_argument('--user', default=os.environ.get('GRAFANA_USER', 'admin'))
+    parser.add_argument('--password', default=os.environ.get('GRAFANA_PASSWORD', 'admin'))
+    parser.add_argument('--token', default=os.environ.get('GRAFANA_TOKEN'))
+    parser.add_argument('--dashboard', default='myia-errors')
+    parser.add_argument('--refresh', help="Sobrescreve o refresh do dashboard")
+    parser.add_argument('--range', default='1h', help="Faixa de tempo das consultas")
+    parser.add_argument('--start', type=int, default=1, help="Espectadores no primeiro degrau")
+    parser.add_argument('--step', type=int, default=5, help="Espectadores adicionados por degrau")
+    parser.add_argument('--max', type=int, default=50)
+    parser.add_argument('--step-duration', type=float, default=60, help="Segundos medidos por degrau")
+    parser.add_argument('--slo-ms', type=float, default=2000, help="p95 máximo por consulta")
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--mock', action='store_true', help="Usa o backend simulado em vez do Grafana")
+    parser.add_argument('--mock-latency-ms', type=int, default=20)
+    args = parser.parse_args()
+
+    auth = {'user': args.user, 'password': args.password, 'token': args.token}
+    mock_server = None
+    base_url = args.url
+    if args.mock:
+        from mock_backend import MockBackend, MockServer
+        mock_server = MockServer(MockBackend(latency_ms=args.mock_latency_ms)).start()
+        base_url = mock_server.url
+    try:
+        report = asyncio.run(run_ramp(args, base_url, auth))
+    finally:
+        if mock_server is not None:
+            mock_server.stop()
+
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Resultados salvos em: {RESULTS_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Tempo até os dados por painel nos dashboards do Grafana (waterfall)
+
+Abre o dashboard no browser (autenticação Basic em todas as requisições,
+sem passar pelo formulário de login) e, ao longo de N ciclos de refresh,
+associa cada /api/ds/query ao seu painel (header X-Panel-Id ou, na falta
+dele, pelas expressões do dashboard) e à última mutação do DOM dentro do
+elemento do painel ([data-panelid]) após a resposta.
+
+Por painel e ciclo: início relativo ao ciclo, TTFB, download, render e
+tempo total até os dados na tela, comparados com um SLO configurável.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import sync_playwright
+
+from async_http import basic_auth
+from config import GRAFANA_URL
+from grafana_api import DS_QUERY_ENDPOINT, iter_panels, parse_duration_ms
+from metrics import summarize
+
+RESULTS_FILE = '/tmp/grafana_panel_timing.json'
+
+# Janela máxima após a resposta em que mutações do painel contam como render
+RENDER_WINDOW_MS = 3000
+BAR_WIDTH = 40
+
+# Registra, por painel, os instantes (epoch ms) de mutação do DOM
+PANEL_MUTATION_SCRIPT = """
+(() => {
+    const marks = window.__myiaPanelMutations = {};
+    const record = (node) => {
+        const element = node.nodeType === 1 ? node : node.parentElement;
+        const panel = element && element.closest && element.closest('[data-panelid]');
+        if (!panel) return;
+        const id = panel.getAttribute('data-panelid');
+        (marks[id] = marks[id] || []).push(performance.timeOrigin + performance.now());
+    };
+    new MutationObserver((mutations) => mutations.forEach((m) => record(m.target)))
+        .observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+})();
+"""
+
+
+def expr_index(dashboard):
+    """Conjunto de expressões de cada painel → id (fallback sem X-Panel-Id)"""
+    index = {}
+    for panel in iter_panels(dashboard):
+        exprs = frozenset(t['expr'] for t in panel['targets'] if 'expr' in t and not t.get('hide'))
+        if exprs:
+            index[exprs] = panel['id']
+    return index
+
+
+def panel_id_for(request, index):
+    header = request.headers.get('x-panel-id')
+    if header:
+        return int(header)
+    try:
+        body = json.loads(request.post_data or '{}')
+    except ValueError:
+        return None
+    return index.get(frozenset(q.get('expr') for q in body.get('queries', []) if q.get('expr')))
+
+
+class PanelQueryRecorder:
+    """Eventos de rede das consultas de painel com tempos absolutos (epoch ms)"""
+
+    def __init__(self, page, index):
+        self.index = index
+        self.queries = []
+        page.on('requestfinished', self._on_done)
+        page.on('requestfailed', self._on_done)
+
+    def _on_done(self, request):
+        if DS_QUERY_ENDPOINT not in request.url:
+            return
+        timing = request.timing
+        start = timing['startTime']
+        response = request.response() if request.failure is None else None
+        self.queries.append({
+            'panel_id': panel_id_for(request, self.index),
+            'start': start,
+            'ttfb': timing['responseStart'] - timing['requestStart'] if timing['responseStart'] >= 0 else None,
+            'response_end': start + timing['responseEnd'] if timing['responseEnd'] >= 0 else None,
+            'status': response.status if response else None,
+            'failure': request.failure,
+        })
+
+
+def assign_cycles(queries):
+    """n-ésima consulta de cada painel pertence ao ciclo n"""
+    seen = {}
+    for query in sorted(queries, key=lambda q: q['start']):
+        query['cycle'] = seen.get(query['panel_id'], 0)
+        seen[query['panel_id']] = query['cycle'] + 1
+    return max(seen.values(), default=0)
+
+
+def attach_render(queries, mutations):
+    """Render concluído = última mutação do painel entre a resposta e a próxima consulta dele"""
+    by_panel = {}
+    for query in queries:
+        by_panel.setdefault(query['panel_id'], []).append(query)
+    for panel_id, panel_queries in by_panel.items():
+        marks = sorted(mutations.get(str(panel_id), []))
+        panel_queries.sort(key=lambda q: q['start'])
+        for i, query in enumerate(panel_queries):
+            if query['response_end'] is None:
+                query['render_end'] = None
+                continue
+            limit = query['response_end'] + RENDER_WINDOW_MS
+            if i + 1 < len(panel_queries):
+                limit = min(limit, panel_queries[i + 1]['start'])
+            window = [m for m in marks if query['response_end'] <= m <= limit]
+            query['render_end'] = window[-1] if window else query['response_end']
+
+
+def build_waterfall(queries, titles, cycles, slo_ms):
+    waterfall = []
+    for cycle in range(cycles):
+        rows = [q for q in queries if q['cycle'] == cycle]
+        if not rows:
+            continue
+        cycle_start = min(q['start'] for q in rows)
+        entries = []
+        for q in sorted(rows, key=lambda q: q['start']):
+            done = q['render_end'] or q['response_end']
+            entry = {
+                'panel_id': q['panel_id'],
+                'title': titles.get(q['panel_id'], '?'),
+                'offset_ms': round(q['start'] - cycle_start, 1),
+                'ttfb_ms': round(q['ttfb'], 1) if q['ttfb'] is not None else None,
+                'query_ms': round(q['response_end'] - q['start'], 1) if q['response_end'] else None,
+                'render_ms': round(q['render_end'] - q['response_end'], 1) if q['render_end'] and q['response_end'] else None,
+                'time_to_data_ms': round(done - cycle_start, 1) if done else None,
+                'status': q['status'],
+                'failure': q['failure'],
+            }
+            entry['slo_ok'] = entry['time_to_data_ms'] is not None and entry['time_to_data_ms'] <= slo_ms
+            entries.append(entry)
+        waterfall.append({'cycle': cycle, 'panels': entries,
+                          'complete_ms': max((e['time_to_data_ms'] or 0) for e in entries)})
+    return waterfall
+
+
+def print_waterfall(waterfall, slo_ms):
+    for cycle in waterfall:
+        scale = max(cycle['complete_ms'], slo_ms) / BAR_WIDTH or 1
+        print(f"\n⏱️  Ciclo {cycle['cycle'] + 1}: painéis com dados em {cycle['complete_ms']:.0f}ms "
+              f"(SLO {slo_ms}ms = '|')")
+        slo_col = int(slo_ms / scale)
+        for e in cycle['panels']:
+            bar = [' '] * (BAR_WIDTH + 1)
+            offset = int(e['offset_ms'] / scale)
+            query_end = offset + int((e['query_ms'] or 0) / scale)
+            render_end = query_end + int((e['render_ms'] or 0) / scale)
+            for col in range(offset, min(query_end + 1, BAR_WIDTH + 1)):
+                bar[col] = '█'
+            for col in range(query_end + 1, min(render_end + 1, BAR_WIDTH + 1)):
+                bar[col] = '░'
+            if slo_col <= BAR_WIDTH and bar[slo_col] == ' ':
+                bar[slo_col] = '|'
+            icon = '✅' if e['slo_ok'] else '❌'
+            total = f"{e['time_to_data_ms']:.0f}ms" if e['time_to_data_ms'] is not None else 'falhou'
+            print(f"   {icon} #{e['panel_id']!s:<3} {''.join(bar)} {total:>8}  {e['title'][:40]}")
+    print("\n   █ consulta (/api/ds/query)   ░ render no DOM")
+
+
+def summarize_panels(waterfall, slo_ms):
+    per_panel = {}
+    for cycle in waterfall:
+        for e in cycle['panels']:
+            per_panel.setdefault((e['panel_id'], e['title']), []).append(e)
+    summary = []
+    for (panel_id, title), entries in per_panel.items():
+        totals = [e['time_to_data_ms'] for e in entries if e['time_to_data_ms'] is not None]
+        summary.append({
+            'panel_id': panel_id,
+            'title': title,
+            'time_to_data_ms': summarize(totals),
+            'query_ms': summarize([e['query_ms'] for e in entries]),
+            'render_ms': summarize([e['render_ms'] for e in entries]),
+            'slo_violations': sum(1 for e in entries if not e['slo_ok']),
+            'cycles': len(entries),
+        })
+    summary.sort(key=lambda s: -(s['time_to_data_ms'].get('p95') or 0))
+    return summary
+
+
+def profile_dashboard(uid, cycles, refresh, headless, user, password):
+    headers = {'Authorization': basic_auth(user, password)}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless)
+        context = browser.new_context(viewport={'width': 1920, 'height': 1080}, extra_http_headers=headers)
+        context.add_init_script(PANEL_MUTATION_SCRIPT)
+        try:
+            response = context.request.get(f'{GRAFANA_URL}/api/dashboards/uid/{uid}')
+            if not response.ok:
+                raise RuntimeError(f"Dashboard {uid}: HTTP {response.status}")
+            dashboard = response.json()['dashboard']
+            refresh = refresh or dashboard.get('refresh') or '10s'
+            panels = list(iter_panels(dashboard))
+            titles = {panel['id']: panel.get('title', '') for panel in panels}
+
+            page = context.new_page()
+            recorder = PanelQueryRecorder(page, expr_index(dashboard))
+            print(f"🔍 {uid}: {len(panels)} painéis, {cycles} ciclo(s) de refresh a cada {refresh}")
+            page.goto(f'{GRAFANA_URL}/d/{uid}/{uid}?orgId=1&refresh={refresh}', wait_until='domcontentloaded')
+
+            # Aguarda até cada painel ter completado `cycles` consultas (ou o teto)
+            deadline = time.monotonic() + cycles * parse_duration_ms(refresh) / 1000 + 30
+            while time.monotonic() < deadline:
+                done = {}
+                for q in recorder.queries:
+                    done[q['panel_id']] = done.get(q['panel_id'], 0) + 1
+                if len(done) >= len(panels) and min(done.values()) >= cycles:
+                    break
+                try:
+                    page.wait_for_event('requestfinished', timeout=1000)
+                except PlaywrightTimeoutError:
+                    pass
+            page.wait_for_timeout(RENDER_WINDOW_MS)  # última janela de render
+            mutations = page.evaluate('() => window.__myiaPanelMutations || {}')
+        finally:
+            browser.close()
+
+    queries = recorder.queries
+    observed_cycles = min(assign_cycles(queries), cycles)
+    attach_render(queries, mutations)
+    return queries, titles, observed_cycles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Waterfall de tempo até os dados por painel do Grafana")
+    parser.add_argument('--dashboard', default='myia-errors', help="UID do dashboard")
+    parser.add_argument('--cycles', type=int, default=3, help="Ciclos de refresh observados")
+    parser.add_argument('--refresh', help="Sobrescreve o refresh do dashboard (ex: 5s)")
+    parser.add_argument('--slo-ms', type=int, default=2000, help="Tempo máximo até os dados por painel")
+    parser.add_argument('--headed', action='store_true', help="Mostra o browser")
+    parser.add_argument('--user', default=os.environ.get('GRAFANA_USER', 'admin'))
+    parser.add_argument('--password', default=os.environ.get('GRAFANA_PASSWORD', 'admin'))
+    args = parser.parse_args()
+
+    queries, titles, cycles = profile_dashboard(args.dashboard, args.cycles, args.refresh,
+                                                not args.headed, args.user, args.password)
+    if not queries:
+        print("❌ Nenhuma consulta /api/ds/query observada")
+        return 1
+
+    waterfall = build_waterfall(queries, titles, cycles, args.slo_ms)
+    print_waterfall(waterfall, args.slo_ms)
+    summary = summarize_panels(waterfall, args.slo_ms)
+
+    print("\n" + "=" * 60)
+    print(f"📊 POR PAINEL ({cycles} ciclos, ordenado por p95)")
+    print("=" * 60)
+    for s in summary:
+        t = s['time_to_data_ms']
+        icon = '❌' if s['slo_violations'] else '✅'
+        print(f"{icon} #{s['panel_id']!s:<3} p50={t.get('p50')}ms p95={t.get('p95')}ms "
+              f"(consulta p95={s['query_ms'].get('p95')}ms, render p95={s['render_ms'].get('p95')}ms) "
+              f"{s['slo_violations']}/{s['cycles']} acima do SLO  {s['title']}")
+
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump({'dashboard': args.dashboard, 'slo_ms': args.slo_ms, 'cycles': cycles,
+                   'waterfall': waterfall, 'panels': summary}, f, indent=2, ensure_ascii=False)
+    print(f"\n📄 Resultados salvos em: {RESULTS_FILE}")
+    return 1 if any(s['slo_violations'] for s in summary) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Benchmark de ingestão de logs: arquivo → Promtail → Loki → consulta
+
+Escreve linhas JSON no formato do logger do backend em
+backend/logs/bench-<run>.log (coberto pelo job myia-backend do Promtail)
+a uma taxa controlada ou em rajadas. Cada linha leva um tag único da
+execução e um número de sequência no campo message, pois o Promtail
+envia ao Loki apenas o message (stage output). Em paralelo, consulta o
+Loki até cada linha ficar visível e mede:
+
+- vazão de escrita e de ingestão (linhas visíveis por segundo)
+- latência escrita → visível na consulta (p50/p95/p99), com resolução
+  do intervalo de polling
+- linhas que não apareceram dentro do tempo de espera
+
+Automatiza o que validate-realtime-logs.sh e test-realtime-final.sh
+verificam manualmente.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from async_http import AsyncHttpClient
+from config import LOKI_URL, ROOT_DIR
+from metrics import histogram, summarize
+
+RESULTS_FILE = '/tmp/log_ingestion_benchmark.json'
+DEFAULT_LOG_DIR = os.path.join(ROOT_DIR, 'backend', 'logs')
+QUERY_RANGE_ENDPOINT = '/loki/api/v1/query_range'
+QUERY_LIMIT = 5000
+WRITE_TICK_S = 0.05
+BENCH_SERVICE = 'myia-ingestion-bench'
+
+_SEQ = re.compile(r'seq=(\d+)')
+
+
+def log_line(run_id, seq):
+    """Linha no formato do fileFormat do winston (JSON), com timestamp RFC3339"""
+    now = datetime.now(timezone.utc)
+    return json.dumps({
+        'timestamp': now.isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+        'level': 'info',
+        'message': f'ingestion-bench {run_id} seq={seq}',
+        'service': BENCH_SERVICE,
+        'requestId': f'{run_id}-{seq}',
+    })
+
+
+def write_schedule(args):
+    """(instante relativo em s, número de linhas) para cada escrita"""
+    if args.pattern == 'burst':
+        t = 0.0
+        while t < args.duration:
+            yield t, args.burst_size
+            t += args.burst_interval
+        return
+    ticks = int(args.duration / WRITE_TICK_S)
+    written = 0
+    for tick in range(1, ticks + 1):
+        due = int(args.rate * tick * WRITE_TICK_S)
+        if due > written:
+            yield (tick - 1) * WRITE_TICK_S, due - written
+            written = due
+
+
+async def writer(path, run_id, args, written_at):
+    """Escreve conforme o padrão; written_at[seq] = instante (epoch s) do flush"""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    seq = 0
+    with open(path, 'a', buffering=1) as f:
+        for offset, count in write_schedule(args):
+            delay = started + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            f.write(''.join(log_line(run_id, seq + i) + '\n' for i in range(count)))
+            f.flush()
+            flushed = time.time()
+            for i in range(count):
+                written_at[seq + i] = flushed
+            seq += count
+    return seq
+
+
+class VisibleCursor:
+    """Estado do polling entre consultas: timestamp de retomada e sequências já vistas"""
+
+    def __init__(self, start_ns):
+        self.ns = start_ns
+        self.seen = set()
+        # Blocos de um mesmo ns com QUERY_LIMIT linhas ou mais: o excedente não é paginável
+        self.truncated_ties = 0
+
+
+async def _query_values(loki, query, start_ns, end_ns):
+    response = await loki.get(QUERY_RANGE_ENDPOINT, params={
+        'query': query, 'start': str(start_ns), 'end': str(end_ns),
+        'limit': str(QUERY_LIMIT), 'direction': 'forward',
+    })
+    if response.status != 200:
+        raise RuntimeError(f"Loki: HTTP {response.status} {response.body[:200]!r}")
+    return [v for stream in (response.json() or {}).get('data', {}).get('result', [])
+            for v in stream.get('values', [])]
+
+
+def _take_new(cursor, values):
+    new = set()
+    for _, line in values:
+        match = _SEQ.search(line)
+        if match and int(match.group(1)) not in cursor.seen:
+            seq = int(match.group(1))
+            cursor.seen.add(seq)
+            new.add(seq)
+    return new
+
+
+async def fetch_visible(loki, run_id, cursor):
+    """Sequências novas desde o cursor, paginando pelo timestamp; o cursor avança entre consultas"""
+    query = f'{{job="myia-backend", service="{BENCH_SERVICE}"}} |= "{run_id}"'
+    new = set()
+    while True:
+        values = await _query_values(loki, query, cursor.ns, time.time_ns())
+        new |= _take_new(cursor, values)
+        if not values:
+            return new
+        last_ns = max(int(ts) for ts, _ in values)
+        if len(values) < QUERY_LIMIT:
+            # Retoma no último timestamp (inclusivo, repetidos descartados pelo seq): linhas do
+            # mesmo ns que chegarem em outro push do Promtail não ficam para trás
+            cursor.ns = last_ns
+            return new
+        # Página cheia: o bloco do último ns pode ter sido cortado; busca só ele e segue adiante
+        ties = await _query_values(loki, query, last_ns, last_ns + 1)
+        new |= _take_new(cursor, ties)
+        if len(ties) >= QUERY_LIMIT:
+            cursor.truncated_ties += 1
+        cursor.ns = last_ns + 1
+
+
+async def poller(loki, run_id, cursor, written_at, visible_at, writing_done, args):
+    """Consulta o Loki até todas as linhas escritas aparecerem ou estourar o tempo de espera"""
+    deadline = None
+    while True:
+        polled = time.time()
+        for seq in await fetch_visible(loki, run_id, cursor):
+            visible_at.setdefault(seq, polled)
+        if writing_done.is_set():
+            if len(visible_at) >= len(written_at):
+                return
+            deadline = deadline or time.time() + args.settle
+            if time.time() > deadline:
+                return
+        await asyncio.sleep(args.poll_interval)
+
+
+def ingestion_rate(visible_at, started):
+    """Maior vazão de ingestão observada em janelas de 1s"""
+    per_second = {}
+    for t in visible_at.values():
+        bucket = int(t - started)
+        per_second[bucket] = per_second.get(bucket, 0) + 1
+    return max(per_second.values()) if per_second else 0
+
+
+async def run_benchmark(args):
+    run_id = f'bench-{uuid.uuid4().hex[:10]}'
+    os.makedirs(args.log_dir, exist_ok=True)
+    path = os.path.join(args.log_dir, f'{run_id}.log')
+    written_at, visible_at = {}, {}
+    writing_done = asyncio.Event()
+
+    loki = AsyncHttpClient(args.loki_url, max_connections=2, timeout=10)
+    ready = await loki.get('/ready')
+    if ready.status != 200:
+        await loki.close()
+        raise RuntimeError(f"Loki não está pronto em {args.loki_url} (HTTP {ready.status})")
+
+    pattern = (f"rajadas de {args.burst_size} a cada {args.burst_interval}s" if args.pattern == 'burst'
+               else f"{args.rate} linhas/s")
+    print(f"📝 {run_id}: {pattern} por {args.duration}s → {path}")
+
+    cursor = VisibleCursor(time.time_ns() - 1_000_000_000)
+    started = time.time()
+    poll_task = asyncio.create_task(
+        poller(loki, run_id, cursor, written_at, visible_at, writing_done, args))
+    try:
+        await writer(path, run_id, args, written_at)
+        write_elapsed = time.time() - started
+        writing_done.set()
+        await poll_task
+    finally:
+        poll_task.cancel()
+        await loki.close()
+        if not args.keep_log:
+            os.remove(path)
+
+    latencies = [(visible_at[seq] - t) * 1000 for seq, t in written_at.items() if seq in visible_at]
+    missing = len(written_at) - len(latencies)
+    total_elapsed = (max(visible_at.values()) - started) if visible_at else None
+    return {
+        'run_id': run_id,
+        'pattern': args.pattern,
+        'duration_s': args.duration,
+        'poll_interval_ms': args.poll_interval * 1000,
+        'written': len(written_at),
+        'visible': len(latencies),
+        'missing': missing,
+        'truncated_ties': cursor.truncated_ties,
+        'write_rate': round(len(written_at) / write_elapsed, 2) if write_elapsed else None,
+        'ingest_rate': round(len(latencies) / total_elapsed, 2) if total_elapsed else None,
+        'peak_ingest_rate': ingestion_rate(visible_at, started),
+        'latency_ms': summarize(latencies),
+        'latency_histogram': histogram(latencies),
+    }
+
+
+def print_report(report):
+    latency = report['latency_ms']
+    print("\n" + "=" * 60)
+    print(f"Escritas: {report['written']} linhas ({report['write_rate']}/s)")
+    print(f"Visíveis: {report['visible']} linhas ({report['ingest_rate']}/s, pico {report['peak_ingest_rate']}/s)")
+    if report['missing']:
+        print(f"⚠️  {report['missing']} linhas não apareceram no Loki dentro do tempo de espera")
+    if report['truncated_ties']:
+        print(f"⚠️  {report['truncated_ties']} blocos com ≥{QUERY_LIMIT} linhas no mesmo timestamp "
+              f"(excedente não paginável; pode aparecer como ausente)")
+    if latency['count']:
+        print(f"Escrita → visível: p50={latency['p50']}ms p95={latency['p95']}ms "
+              f"p99={latency['p99']}ms max={latency['max']}ms "
+              f"(resolução {report['poll_interval_ms']:.0f}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão e latência de ingestão Promtail → Loki")
+    parser.add_argument('--loki-url', default=LOKI_URL)
+    parser.add_argument('--log-dir', default=DEFAULT_LOG_DIR, help="Diretório montado em /var/log/myia no Promtail")
+    parser.add_argument('--pattern', choices=['rate', 'burst'], default='rate')
+    parser.add_argument('--rate', type=float, default=50, help="Linhas por segundo (--pattern rate)")
+    parser.add_argument('--burst-size', type=int, default=500, help="Linhas por rajada (--pattern burst)")
+    parser.add_argument('--burst-interval', type=float, default=5, help="Segundos entre rajadas")
+    parser.add_argument('--duration', type=float, default=30, help="Segundos de escrita")
+    parser.add_argument('--poll-interval', type=float, default=0.25, help="Segundos entre consultas ao Loki")
+    parser.add_argument('--settle', type=float, default=30, help="Espera máxima após a última escrita")
+    parser.add_argument('--max-p95-ms', type=float, help="Falha se o p95 passar deste valor")
+    parser.add_argument('--keep-log', action='store_true', help="Não remove o arquivo de log ao final")
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(run_benchmark(args))
+    except (OSError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    print_report(report)
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Resultados salvos em: {RESULTS_FILE}")
+
+    p95 = report['latency_ms'].get('p95')
+    if report['missing'] or (args.max_p95_ms and p95 and p95 > args.max_p95_ms):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
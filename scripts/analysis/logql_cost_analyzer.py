@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Analisador de custo das consultas LogQL dos dashboards provisionados
+
+Lê observability/grafana/dashboards/*.json e a configuração do promtail,
+interpreta cada target (seletor de stream, estágios de parser, filtros de
+linha e de label, janela de range) e estima o custo de varredura no Loki
+considerando a faixa de tempo e o refresh do dashboard.
+
+O custo é relativo (unidades comparáveis entre painéis, não segundos de
+CPU): janela varrida × fração dos streams selecionada × custo por linha
+dos estágios × sobreposição de janelas × avaliações por hora.
+
+Também aponta padrões conhecidos: `| json` para filtrar campos que o
+promtail já transforma em label, `| json` sobre linhas que o promtail
+reduziu ao texto da mensagem (estágio output), filtros regex que seriam
+substring, stat em consulta range e consultas repetidas.
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from config import ROOT_DIR
+from grafana_api import calculate_interval_ms, iter_panels, parse_duration_ms, parse_time_ms
+
+DASHBOARDS_DIR = os.path.join(ROOT_DIR, 'observability', 'grafana', 'dashboards')
+PROMTAIL_CONFIG = os.path.join(ROOT_DIR, 'observability', 'promtail', 'promtail-config.yml')
+RESULTS_FILE = '/tmp/logql_cost_report.json'
+
+# Custo relativo por linha de cada estágio (linha sem estágios = 1)
+PARSER_COST = {'json': 5.0, 'logfmt': 3.0, 'regexp': 4.0, 'pattern': 2.0, 'unpack': 5.0}
+LINE_FILTER_COST = {'|=': 0.2, '!=': 0.2, '|~': 1.0, '!~': 1.0}
+LABEL_FILTER_COST = 0.3
+FORMAT_STAGE_COST = 1.0
+
+# Fração estimada do volume de logs que cada matcher de label seleciona
+LEVEL_SELECTIVITY = {'error': 0.05, 'warn': 0.1, 'info': 0.7, 'debug': 0.15, 'http': 0.3}
+DEFAULT_MATCHER_SELECTIVITY = 0.3
+REGEX_MATCHER_SELECTIVITY = 0.5
+
+RANGE_FUNCTIONS = ('count_over_time', 'rate', 'bytes_over_time', 'bytes_rate', 'sum_over_time',
+                   'avg_over_time', 'max_over_time', 'min_over_time', 'quantile_over_time',
+                   'first_over_time', 'last_over_time', 'stddev_over_time', 'absent_over_time')
+
+_SELECTOR = re.compile(r'\{([^{}]*)\}')
+_MATCHER = re.compile(r'([\w.]+)\s*(=~|!~|!=|=)\s*"((?:[^"\\]|\\.)*)"')
+_LINE_FILTER = re.compile(r'\s*(\|=|!=|\|~|!~)\s*("(?:[^"\\]|\\.)*"|`[^`]*`)')
+_STAGE = re.compile(r'\s*\|\s*(json|logfmt|regexp|pattern|unpack|line_format|label_format|unwrap|drop|keep|decolorize)\b'
+                    r'((?:\s*"(?:[^"\\]|\\.)*"|\s*`[^`]*`|[^|\[)"`])*)')
+_LABEL_FILTER = re.compile(r'\s*\|\s*([\w.]+)\s*(=~|!~|!=|==|=|>=|<=|>|<)\s*("(?:[^"\\]|\\.)*"|`[^`]*`|[\w.]+)')
+_RANGE = re.compile(r'\[\s*([^\]]+?)\s*\]')
+_BY = re.compile(r'\b(?:by|without)\s*\(([^)]*)\)')
+_REGEX_META = re.compile(r'[.^$*+?()\[\]{}|\\]')
+
+
+def _unquote(value):
+    if value[:1] in ('"', '`'):
+        value = value[1:-1]
+    return value.replace('\\"', '"').replace('\\\\', '\\')
+
+
+# --- promtail --------------------------------------------------------------
+
+def parse_promtail(path=PROMTAIL_CONFIG):
+    """
+    Extrai, por job, os labels de stream (static + estágio labels) e a
+    origem da linha final (estágio output). Parser de linhas suficiente
+    para o formato do arquivo versionado; sem dependência de PyYAML.
+    """
+    jobs = {}
+    if not os.path.exists(path):
+        return jobs
+    job = None
+    block = None  # (nome do bloco, indentação da linha que o abriu)
+    with open(path) as f:
+        for raw in f:
+            line = raw.split('#', 1)[0].rstrip()
+            if not line.strip():
+                continue
+            indent = len(line) - len(line.lstrip())
+            text = line.strip()
+
+            match = re.match(r'-\s*job_name:\s*(\S+)', text)
+            if match:
+                job = jobs.setdefault(match.group(1), {'labels': set(), 'static': {}, 'output': None, 'path': None})
+                block = None
+                continue
+            if job is None:
+                continue
+
+            if block and indent <= block[1]:
+                block = None
+            stage = re.match(r'-\s*(labels|static_labels|output|json|regex|timestamp):\s*$', text)
+            if stage:
+                block = (stage.group(1), indent)
+                continue
+            if re.match(r'labels:\s*$', text):
+                block = ('static_config', indent)
+                continue
+
+            key, _, value = text.partition(':')
+            key, value = key.strip().lstrip('- '), value.strip()
+            if block is None:
+                continue
+            if block[0] == 'labels':
+                job['labels'].add(key)
+            elif block[0] in ('static_labels', 'static_config'):
+                if key == '__path__':
+                    job['path'] = value
+                elif not key.startswith('__'):
+                    job['static'][key] = value
+            elif block[0] == 'output' and key == 'source':
+                job['output'] = value
+    return jobs
+
+
+def jobs_for_selector(matchers, jobs):
+    """Jobs do promtail cujos labels estáticos são compatíveis com os matchers de igualdade"""
+    selected = []
+    for name, job in jobs.items():
+        ok = True
+        for label, op, value in matchers:
+            if op == '=' and label in job['static'] and job['static'][label] != value:
+                ok = False
+            if op == '=' and label not in job['static'] and label not in job['labels']:
+                ok = False
+        if ok:
+            selected.append(name)
+    return selected
+
+
+# --- LogQL -----------------------------------------------------------------
+
+def parse_pipeline(text):
+    """Estágios {'kind', ...} a partir do texto após o seletor e a posição onde o pipeline termina"""
+    stages = []
+    pos = 0
+    while pos < len(text):
+        for kind, pattern in (('line_filter', _LINE_FILTER), ('stage', _STAGE), ('label_filter', _LABEL_FILTER)):
+            match = pattern.match(text, pos)
+            if match:
+                break
+        else:
+            break
+        if kind == 'line_filter':
+            stages.append({'kind': 'line_filter', 'op': match.group(1), 'value': _unquote(match.group(2))})
+        elif kind == 'stage':
+            name = match.group(1)
+            stages.append({'kind': 'parser' if name in PARSER_COST else 'format', 'name': name,
+                           'args': match.group(2).strip()})
+        else:
+            stages.append({'kind': 'label_filter', 'label': match.group(1), 'op': match.group(2),
+                           'value': _unquote(match.group(3))})
+        pos = match.end()
+    return stages, pos
+
+
+def parse_logql(expr):
+    """Uma entrada por seletor de stream: matchers, pipeline e janela de range"""
+    scans = []
+    for match in _SELECTOR.finditer(expr):
+        rest = expr[match.end():]
+        stages, end = parse_pipeline(rest)
+        # Janela [..] logo após o pipeline (consultas de log não têm)
+        range_match = _RANGE.match(rest[end:].lstrip())
+        function = None
+        for name in RANGE_FUNCTIONS:
+            if re.search(rf'\b{name}\s*\(\s*$', expr[:match.start()]):
+                function = name
+                break
+        scans.append({
+            'matchers': _MATCHER.findall(match.group(1)),
+            'stages': stages,
+            'range': range_match.group(1) if range_match else None,
+            'function': function,
+        })
+    return {'scans': scans, 'group_by': [label.strip() for group in _BY.findall(expr)
+                                          for label in group.split(',') if label.strip()]}
+
+
+def selectivity(matchers, base_labels=('app', 'job', 'component', 'environment')):
+    """Fração do volume selecionada pelos matchers além dos labels de origem"""
+    fraction = 1.0
+    for label, op, value in matchers:
+        if label in base_labels:
+            continue
+        if op in ('=~', '!~'):
+            fraction *= REGEX_MATCHER_SELECTIVITY
+        elif op == '!=':
+            fraction *= 1 - (LEVEL_SELECTIVITY.get(value, DEFAULT_MATCHER_SELECTIVITY) if label == 'level'
+                             else DEFAULT_MATCHER_SELECTIVITY)
+        elif label == 'level':
+            fraction *= LEVEL_SELECTIVITY.get(value, DEFAULT_MATCHER_SELECTIVITY)
+        else:
+            fraction *= DEFAULT_MATCHER_SELECTIVITY
+    return fraction
+
+
+def line_cost(stages):
+    """Custo por linha: leitura + estágios; filtros de linha antes do parser reduzem as linhas parseadas"""
+    cost = 1.0
+    surviving = 1.0
+    for stage in stages:
+        if stage['kind'] == 'line_filter':
+            cost += LINE_FILTER_COST[stage['op']] * surviving
+            surviving *= 0.5
+        elif stage['kind'] == 'parser':
+            cost += PARSER_COST[stage['name']] * surviving
+        elif stage['kind'] == 'label_filter':
+            cost += LABEL_FILTER_COST * surviving
+        else:
+            cost += FORMAT_STAGE_COST * surviving
+    return cost
+
+
+def resolve_range_ms(value, interval_ms, range_ms):
+    if value is None:
+        return None
+    value = value.replace('$__rate_interval', f'{max(4 * interval_ms, 60000)}ms')
+    value = value.replace('$__interval', f'{interval_ms}ms').replace('$__range', f'{range_ms}ms')
+    return parse_duration_ms(value)
+
+
+# --- achados ---------------------------------------------------------------
+
+def find_issues(panel, target, parsed, jobs, refresh_s):
+    issues = []
+    for scan in parsed['scans']:
+        selected_jobs = jobs_for_selector(scan['matchers'], jobs)
+        stream_labels = set()
+        for name in selected_jobs:
+            stream_labels |= jobs[name]['labels'] | set(jobs[name]['static'])
+        plain_jobs = [name for name in selected_jobs if jobs[name]['output']]
+
+        parsers = [s for s in scan['stages'] if s['kind'] == 'parser']
+        label_filters = [s for s in scan['stages'] if s['kind'] == 'label_filter' and s['label'] != '__error__']
+        if any(p['name'] == 'json' for p in parsers):
+            redundant = [f for f in label_filters if f['label'] in stream_labels]
+            if redundant:
+                moved = ', '.join(f'{f["label"]}{f["op"]}"{f["value"]}"' for f in redundant)
+                issues.append({
+                    'severity': 'high', 'code': 'json_for_stream_label',
+                    'message': f"`| json` só para filtrar {moved}, que já é label de stream no promtail; "
+                               f"mova para o seletor e remova o parser",
+                })
+            grouped = [label for label in parsed['group_by'] if label in stream_labels]
+            if grouped and not redundant and not label_filters:
+                issues.append({
+                    'severity': 'medium', 'code': 'json_for_grouping_label',
+                    'message': f"`| json` desnecessário: agrupamento por {', '.join(grouped)} já é label de stream",
+                })
+            if plain_jobs:
+                sources = ', '.join(f"{name} (output: {jobs[name]['output']})" for name in plain_jobs)
+                issues.append({
+                    'severity': 'high', 'code': 'json_on_plain_lines',
+                    'message': f"`| json` sobre linhas que o promtail reduz a texto puro [{sources}]: "
+                               f"todo parse falha (JSONParserErr); "
+                               + ('`__error__=\"\"` descarta todas as linhas e o painel fica sempre zerado'
+                                  if any(s.get('label') == '__error__' for s in scan['stages'])
+                                  else 'os campos extraídos ficam vazios'),
+                })
+
+        for stage in scan['stages']:
+            if stage['kind'] == 'line_filter' and stage['op'] in ('|~', '!~'):
+                pattern = stage['value']
+                if not _REGEX_META.search(pattern):
+                    issues.append({
+                        'severity': 'low', 'code': 'regex_without_metachars',
+                        'message': f"`{stage['op']} \"{pattern}\"` é um literal; use "
+                                   f"`{'|=' if stage['op'] == '|~' else '!='} \"{pattern}\"` (busca de substring)",
+                    })
+                elif re.fullmatch(r'\(?[\w/]+(\|[\w/]+)+\)?', pattern):
+                    alternatives = pattern.strip('()').split('|')
+                    issues.append({
+                        'severity': 'low', 'code': 'regex_alternation',
+                        'message': "alternação de literais; use `|= \"" + '" or "'.join(alternatives)
+                                   + "\"` ou um label de stream",
+                    })
+                if pattern.isdigit() and len(pattern) == 3:
+                    issues.append({
+                        'severity': 'medium', 'code': 'status_code_as_text',
+                        'message': f"filtro textual por \"{pattern}\" casa qualquer linha contendo o número; "
+                                   f"o job HTTP do promtail expõe statusCode como label",
+                    })
+
+        range_ms = scan.get('range_ms')
+        if range_ms and range_ms >= 3600000 and refresh_s and refresh_s < 60:
+            issues.append({
+                'severity': 'medium', 'code': 'long_range_fast_refresh',
+                'message': f"janela de {scan['range']} recalculada a cada {refresh_s}s",
+            })
+
+    if panel.get('type') == 'stat' and target.get('queryType', 'range') == 'range' and parsed['scans']:
+        issues.append({
+            'severity': 'low', 'code': 'stat_range_query',
+            'message': "stat usa só o último valor; queryType instant evita avaliar a série inteira",
+        })
+    return issues
+
+
+# --- análise ---------------------------------------------------------------
+
+def analyze_dashboard(dashboard, jobs, refresh_override=None, range_override=None, now_ms=None):
+    time_cfg = dashboard.get('time', {'from': 'now-1h', 'to': 'now'})
+    time_from = parse_time_ms(range_override or time_cfg['from'], now_ms)
+    time_to = parse_time_ms(time_cfg['to'], now_ms)
+    dashboard_range_ms = time_to - time_from
+    refresh = refresh_override or dashboard.get('refresh') or ''
+    refresh_s = parse_duration_ms(refresh) / 1000 if refresh else None
+    evals_per_hour = 3600 / refresh_s if refresh_s else 1
+
+    panels = []
+    for panel in iter_panels(dashboard):
+        max_data_points = panel.get('maxDataPoints') or 1000
+        step_ms = calculate_interval_ms(dashboard_range_ms, max_data_points)
+        targets = []
+        for target in panel['targets']:
+            if target.get('hide') or 'expr' not in target:
+                continue
+            parsed = parse_logql(target['expr'])
+            cost = 0.0
+            for scan in parsed['scans']:
+                scan['range_ms'] = resolve_range_ms(scan['range'], step_ms, dashboard_range_ms)
+                if scan['range_ms']:
+                    window_ms = dashboard_range_ms + scan['range_ms']
+                    # Cada linha entra em range/step janelas de avaliação
+                    overlap = max(1.0, scan['range_ms'] / step_ms)
+                else:
+                    window_ms = dashboard_range_ms
+                    overlap = 1.0
+                scan['selectivity'] = round(selectivity(scan['matchers']), 4)
+                scan['line_cost'] = round(line_cost(scan['stages']), 2)
+                scan['overlap'] = round(overlap, 1)
+                cost += window_ms / 60000 * scan['selectivity'] * scan['line_cost'] * overlap
+            targets.append({
+                'ref_id': target.get('refId'),
+                'expr': target['expr'],
+                'cost_per_eval': round(cost, 2),
+                'cost_per_hour': round(cost * evals_per_hour, 1),
+                'scans': [{k: v for k, v in scan.items() if k != 'matchers'} for scan in parsed['scans']],
+                'issues': find_issues(panel, target, parsed, jobs, refresh_s),
+            })
+        issues = [issue for t in targets for issue in t['issues']]
+        if len(targets) > 1:
+            selectors = {re.sub(r'\|.*', '', _SELECTOR.search(t['expr']).group(0)) for t in targets
+                         if _SELECTOR.search(t['expr'])}
+            if len(selectors) == 1:
+                issues.append({
+                    'severity': 'medium', 'code': 'split_targets_same_stream',
+                    'message': f"{len(targets)} targets varrem o mesmo stream {selectors.pop()}; "
+                               f"uma consulta com `sum by (<label>)` lê os dados uma vez",
+                })
+        panels.append({
+            'dashboard': dashboard.get('uid'),
+            'panel_id': panel['id'],
+            'title': panel.get('title', ''),
+            'type': panel.get('type'),
+            'cost_per_hour': round(sum(t['cost_per_hour'] for t in targets), 1),
+            'targets': targets,
+            'issues': issues,
+        })
+    return {'uid': dashboard.get('uid'), 'refresh': refresh, 'range_ms': dashboard_range_ms, 'panels': panels}
+
+
+def flag_duplicates(dashboards):
+    """Mesma expressão em mais de um painel/dashboard"""
+    seen = {}
+    for dashboard in dashboards:
+        for panel in dashboard['panels']:
+            for target in panel['targets']:
+                key = re.sub(r'\s+', '', target['expr'])
+                seen.setdefault(key, []).append(panel)
+    for panels in seen.values():
+        if len(panels) > 1:
+            where = ', '.join(f"{p['dashboard']}#{p['panel_id']}" for p in panels)
+            for panel in panels:
+                panel['issues'].append({
+                    'severity': 'low', 'code': 'duplicate_query',
+                    'message': f"consulta idêntica em {where}; com o mesmo refresh o Loki executa cada uma",
+                })
+
+
+def print_report(dashboards, top):
+    ranked = sorted((p for d in dashboards for p in d['panels']), key=lambda p: -p['cost_per_hour'])
+    total = sum(p['cost_per_hour'] for p in ranked) or 1
+    print("=" * 60)
+    print("💰 CUSTO ESTIMADO DAS CONSULTAS LOGQL (unidades relativas/hora)")
+    print("=" * 60)
+    for d in dashboards:
+        print(f"   {d['uid']}: refresh {d['refresh'] or 'off'}, faixa {d['range_ms'] // 60000}min, "
+              f"{sum(p['cost_per_hour'] for p in d['panels']):,.0f} un/h")
+
+    print(f"\n🏆 Painéis mais caros (top {top}):")
+    for i, panel in enumerate(ranked[:top], 1):
+        print(f"{i:>3}. {panel['cost_per_hour']:>12,.0f} ({panel['cost_per_hour'] / total:>5.1%})  "
+              f"{panel['dashboard']}#{panel['panel_id']} {panel['title']}")
+        for target in panel['targets']:
+            print(f"        {target['ref_id']}: {target['expr'][:100]}")
+
+    icons = {'high': '🔴', 'medium': '🟠', 'low': '🟡'}
+    order = {'high': 0, 'medium': 1, 'low': 2}
+    findings = [(issue, panel) for panel in ranked for issue in panel['issues']]
+    print(f"\n🔎 Achados ({len(findings)}):")
+    for issue, panel in sorted(findings, key=lambda f: (order[f[0]['severity']], -f[1]['cost_per_hour'])):
+        print(f"   {icons[issue['severity']]} {panel['dashboard']}#{panel['panel_id']} {panel['title']}")
+        print(f"      [{issue['code']}] {issue['message']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimativa de custo LogQL dos dashboards do Grafana")
+    parser.add_argument('--dashboards-dir', default=DASHBOARDS_DIR)
+    parser.add_argument('--promtail-config', default=PROMTAIL_CONFIG)
+    parser.add_argument('--refresh', help="Sobrescreve o refresh dos dashboards (ex: 1m)")
+    parser.add_argument('--range', dest='time_range', help="Sobrescreve o início da faixa (ex: now-6h)")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    jobs = parse_promtail(args.promtail_config)
+    dashboards = []
+    for path in sorted(glob.glob(os.path.join(args.dashboards_dir, '*.json'))):
+        with open(path) as f:
+            dashboards.append(analyze_dashboard(json.load(f), jobs, args.refresh, args.time_range))
+    flag_duplicates(dashboards)
+
+    print_report(dashboards, args.top)
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump({'promtail_jobs': {name: dict(job, labels=sorted(job['labels'])) for name, job in jobs.items()},
+                   'dashboards': dashboards}, f, indent=2, ensure_ascii=False)
+    print(f"\n📄 Relatório salvo em: {RESULTS_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Certificação em lote pela fila da API (asyncio), com métricas de vazão
+
+Alternativa aos loops de curl de certify-all-via-api.sh e
+certify-all-models-auto.sh: faz login uma vez e envia um
+POST /api/certification-queue/certify-model por (modelo, região), com
+no máximo --concurrency requisições em voo sobre conexões keep-alive
+reaproveitadas. Cada job é acompanhado em GET jobs/:jobId com backoff
+exponencial (volta ao intervalo mínimo quando o estado muda), até
+PASSED/FAILED/ERROR ou o tempo limite.
+
+Métricas (certificationWorker.ts grava startedAt/completedAt/duration):
+- taxa de submissão e latência do POST
+- espera na fila: envio → startedAt
+- processamento: duration (ou completedAt - startedAt)
+- jobs concluídos por minuto e maior fila observada (enviados e não iniciados)
+
+Com --mock roda contra o mock backend local, que simula a fila com
+--mock-workers workers e --mock-processing-ms por certificação.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from async_http import AsyncHttpClient
+from config import BACKEND_URL, TEST_EMAIL, TEST_PASSWORD
+from metrics import summarize
+
+RESULTS_FILE = '/tmp/certify_batch.json'
+QUEUE_API = '/api/certification-queue'
+DONE_STATUSES = {'PASSED', 'FAILED', 'ERROR', 'SKIPPED'}
+BACKOFF_FACTOR = 1.6
+
+
+def parse_timestamp(value):
+    """ISO 8601 do Prisma ('...Z') → epoch em s; None se ausente"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+async def login(client, email, password):
+    response = await client.post('/api/auth/login', json={'email': email, 'password': password})
+    token = ((response.json() or {}).get('data') or {}).get('token')
+    if response.status != 200 or not token:
+        raise RuntimeError(f"Login falhou (HTTP {response.status})")
+    return token
+
+
+async def list_models(client):
+    """apiModelId dos modelos do provedor (aceito pelo certify-model como deploymentId)"""
+    response = await client.get('/api/providers/models')
+    if response.status != 200:
+        raise RuntimeError(f"Listagem de modelos falhou (HTTP {response.status})")
+    # jsend.success({ data: models }): a lista fica em data.data (como desembrulha o useModelRating.ts)
+    try:
+        models = response.json()['data']['data']
+    except (ValueError, KeyError, TypeError):
+        models = None
+    if not isinstance(models, list):
+        raise RuntimeError("Resposta inesperada de /api/providers/models (esperado data.data com a lista de modelos)")
+    return [m['apiModelId'] for m in models if isinstance(m, dict) and m.get('apiModelId')]
+
+
+async def queue_counts(client):
+    """Contagens da fila (só informativas: qualquer falha vira None)"""
+    try:
+        response = await client.get(f'{QUEUE_API}/stats')
+    except Exception:
+        return None
+    if response.status != 200:
+        return None
+    try:
+        return (((response.json() or {}).get('data') or {}).get('queue') or {}).get('queue')
+    except (ValueError, AttributeError):
+        return None
+
+
+def _error_message(response):
+    """message do JSend; corpo cru quando não é JSON (ex.: 502 em HTML do proxy)"""
+    try:
+        return (response.json() or {}).get('message', '')
+    except (ValueError, AttributeError):
+        return response.body[:200].decode(errors='replace')
+
+
+def _job_data(response):
+    """data de GET jobs/:jobId, ou None se a consulta falhou ou a resposta não é o JSON esperado"""
+    if response is None or response.status != 200:
+        return None
+    try:
+        data = response.json()['data']
+    except (ValueError, KeyError, TypeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class JobTracker:
+    """Envio e acompanhamento de um job; guarda os instantes para as métricas"""
+
+    def __init__(self, model_id, region):
+        self.model_id = model_id
+        self.region = region
+        self.job_id = None
+        self.submitted_at = None
+        self.submit_ms = None
+        self.status = None
+        self.error = None
+        self.polls = 0
+        self.failed_polls = 0
+        self.first_running_seen = None
+        self.done_seen = None
+        self.certification = {}
+
+    async def submit(self, client, semaphore):
+        async with semaphore:
+            self.submitted_at = time.time()
+            try:
+                response = await client.post(f'{QUEUE_API}/certify-model',
+                                             json={'modelId': self.model_id, 'region': self.region})
+            except Exception as e:
+                # Rede, timeout, EOF, resposta malformada: falha deste job, não do lote
+                self.status, self.error = 'SUBMIT_ERROR', str(e) or type(e).__name__
+                return False
+        self.submit_ms = response.elapsed_ms
+        if response.status != 201:
+            self.status = 'SUBMIT_ERROR'
+            self.error = f"HTTP {response.status}: {_error_message(response)}"
+            return False
+        try:
+            self.job_id = response.json()['data']['jobId']
+        except (ValueError, KeyError, TypeError):
+            self.status, self.error = 'SUBMIT_ERROR', f"Resposta sem jobId: {response.body[:200]!r}"
+            return False
+        self.status = 'QUEUED'
+        return True
+
+    async def poll(self, client, semaphore, interval, max_interval, deadline):
+        """GET jobs/:jobId com backoff; o intervalo volta ao mínimo quando o estado muda"""
+        delay = interval
+        while time.time() < deadline:
+            await asyncio.sleep(delay)
+            async with semaphore:
+                try:
+                    response = await client.get(f'{QUEUE_API}/jobs/{self.job_id}')
+                except Exception:
+                    response = None
+            self.polls += 1
+            data = _job_data(response)
+            if data is None:
+                self.failed_polls += 1
+                delay = min(delay * BACKOFF_FACTOR, max_interval)
+                continue
+            certifications = data.get('certifications') or []
+            self.certification = certifications[0] if certifications else {}
+            # Job único: o status geral fica PENDING até terminar; RUNNING vem da certificação
+            status = self.certification.get('status') or data.get('status')
+            if status == 'RUNNING' and self.first_running_seen is None:
+                self.first_running_seen = time.time()
+            if status in DONE_STATUSES or data.get('status') in DONE_STATUSES:
+                self.status = status if status in DONE_STATUSES else data['status']
+                self.done_seen = time.time()
+                return
+            delay = interval if status != self.status else min(delay * BACKOFF_FACTOR, max_interval)
+            self.status = status
+        self.status = 'TIMEOUT'
+
+    def timings(self):
+        """Espera na fila e processamento (s), pelos campos do servidor ou pelo que o polling viu"""
+        started = parse_timestamp(self.certification.get('startedAt')) or self.first_running_seen
+        completed = parse_timestamp(self.certification.get('completedAt')) or self.done_seen
+        duration = self.certification.get('duration')
+        return {
+            'started': started,
+            'completed': completed if self.status in DONE_STATUSES else None,
+            'queue_wait_s': started - self.submitted_at if started and self.submitted_at else None,
+            'processing_s': (duration / 1000 if duration is not None
+                             else (completed - started if started and completed else None)),
+        }
+
+    def export(self):
+        timings = self.timings()
+        return {
+            'model_id': self.model_id, 'region': self.region, 'job_id': self.job_id,
+            'status': self.status, 'error': self.error or self.certification.get('error'),
+            'submitted_at': self.submitted_at, 'submit_ms': self.submit_ms, 'polls': self.polls,
+            'failed_polls': self.failed_polls,
+            'queue_wait_s': _round(timings['queue_wait_s']),
+            'processing_s': _round(timings['processing_s']),
+            'started_at': timings['started'], 'completed_at': timings['completed'],
+        }
+
+
+def _round(value, digits=3):
+    return round(value, digits) if value is not None else None
+
+
+async def track(tracker, client, semaphore, args, deadline):
+    if await tracker.submit(client, semaphore):
+        await tracker.poll(client, semaphore, args.poll_interval, args.max_poll_interval, deadline)
+
+
+def peak_backlog(jobs):
+    """Maior número de jobs enviados e ainda não iniciados (eventos ordenados no tempo)"""
+    events = []
+    for job in jobs:
+        if job['submitted_at'] and job['job_id']:
+            events.append((job['submitted_at'], 1))
+            if job['started_at']:
+                events.append((job['started_at'], -1))
+    backlog = peak = 0
+    for _, delta in sorted(events):
+        backlog += delta
+        peak = max(peak, backlog)
+    return peak
+
+
+def completions_per_minute(jobs, started):
+    """Jobs concluídos em cada minuto desde o início do lote"""
+    buckets = {}
+    for job in jobs:
+        if job['completed_at']:
+            minute = int((job['completed_at'] - started) // 60)
+            buckets[minute] = buckets.get(minute, 0) + 1
+    return [buckets.get(minute, 0) for minute in range(max(buckets) + 1)] if buckets else []
+
+
+def build_report(jobs, started, submit_elapsed, counts_before, counts_after):
+    submitted = [j for j in jobs if j['job_id']]
+    completed = [j for j in jobs if j['completed_at']]
+    last_completion = max((j['completed_at'] for j in completed), default=None)
+    span_min = (last_completion - started) / 60 if last_completion else None
+    statuses = {}
+    for job in jobs:
+        statuses[job['status']] = statuses.get(job['status'], 0) + 1
+    return {
+        'jobs': len(jobs),
+        'submitted': len(submitted),
+        'statuses': statuses,
+        'submit_rate_per_s': round(len(submitted) / submit_elapsed, 2) if submit_elapsed else None,
+        'submit_ms': summarize([j['submit_ms'] for j in jobs]),
+        'queue_wait_s': summarize([j['queue_wait_s'] for j in submitted]),
+        'processing_s': summarize([j['processing_s'] for j in submitted]),
+        'completed_per_min': round(len(completed) / span_min, 2) if span_min else None,
+        'completions_by_minute': completions_per_minute(jobs, started),
+        'peak_backlog': peak_backlog(jobs),
+        'polls': sum(j['polls'] for j in jobs),
+        'failed_polls': sum(j['failed_polls'] for j in jobs),
+        'queue_before': counts_before,
+        'queue_after': counts_after,
+        'details': jobs,
+    }
+
+
+async def run_batch(args, base_url):
+    async with AsyncHttpClient(base_url, max_connections=args.concurrency, timeout=30) as client:
+        token = await login(client, args.email, args.password)
+        client.headers['Authorization'] = f'Bearer {token}'
+        models = args.models or await list_models(client)
+        trackers = [JobTracker(model, region)
+                    for _ in range(args.repeat) for model in models for region in args.regions]
+        print(f"🚀 {len(trackers)} certificações ({len(models)} modelos × {len(args.regions)} regiões"
+              f"{f' × {args.repeat}' if args.repeat > 1 else ''}), até {args.concurrency} requisições em voo")
+
+        counts_before = await queue_counts(client)
+        semaphore = asyncio.Semaphore(args.concurrency)
+        started = time.time()
+        deadline = started + args.timeout
+        tasks = [asyncio.create_task(track(t, client, semaphore, args, deadline)) for t in trackers]
+        progress = asyncio.create_task(print_progress(trackers, started))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            progress.cancel()
+        submit_elapsed = max((t.submitted_at for t in trackers if t.submitted_at), default=started) - started
+        counts_after = await queue_counts(client)
+        connections = dict(client.stats)
+
+    report = build_report([t.export() for t in trackers], started, submit_elapsed, counts_before, counts_after)
+    report['connections'] = connections
+    return report
+
+
+async def print_progress(trackers, started, every_s=10):
+    while True:
+        await asyncio.sleep(every_s)
+        statuses = {}
+        for tracker in trackers:
+            statuses[tracker.status] = statuses.get(tracker.status, 0) + 1
+        summary = ', '.join(f"{status}={count}" for status, count in sorted(statuses.items(), key=str))
+        print(f"   ⏳ {time.time() - started:.0f}s: {summary}")
+
+
+def print_report(report):
+    print("\n" + "=" * 60)
+    print(f"📤 Enviados: {report['submitted']}/{report['jobs']} ({report['submit_rate_per_s']}/s, "
+          f"POST p50={report['submit_ms'].get('p50')}ms p95={report['submit_ms'].get('p95')}ms)")
+    wait, processing = report['queue_wait_s'], report['processing_s']
+    if wait['count']:
+        print(f"⏱️  Espera na fila: p50={wait['p50']}s p95={wait['p95']}s max={wait['max']}s "
+              f"(fila máxima: {report['peak_backlog']} jobs)")
+    if processing['count']:
+        print(f"⚙️  Processamento: p50={processing['p50']}s p95={processing['p95']}s max={processing['max']}s")
+    print(f"✅ Concluídos por minuto: {report['completed_per_min']} "
+          f"(por minuto: {report['completions_by_minute']})")
+    print(f"📊 Status: {', '.join(f'{k}={v}' for k, v in sorted(report['statuses'].items(), key=str))}")
+    connections = report['connections']
+    failed_polls = f" ({report['failed_polls']} sem resposta válida)" if report['failed_polls'] else ''
+    print(f"🔁 {report['polls']} consultas de status{failed_polls}; {connections['requests']} requisições em "
+          f"{connections['connections_opened']} conexões ({connections['connections_reused']} reusos)")
+    failed = [j for j in report['details'] if j['status'] != 'PASSED']
+    for job in failed[:10]:
+        print(f"   ❌ {job['model_id']} @ {job['region']}: {job['status']} {job['error'] or ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Certificação em lote pela fila da API, com métricas de vazão")
+    parser.add_argument('--url', default=BACKEND_URL)
+    parser.add_argument('--models', help="IDs separados por vírgula (padrão: /api/providers/models)")
+    parser.add_argument('--regions', default='us-east-1', help="Regiões separadas por vírgula")
+    parser.add_argument('--repeat', type=int, default=1, help="Envia cada (modelo, região) N vezes (carga)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Requisições em voo (e conexões)")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="Intervalo mínimo entre consultas de um job")
+    parser.add_argument('--max-poll-interval', type=float, default=15.0, help="Teto do backoff")
+    parser.add_argument('--timeout', type=float, default=3600, help="Segundos até desistir dos jobs pendentes")
+    parser.add_argument('--email', default=TEST_EMAIL)
+    parser.add_argument('--password', default=TEST_PASSWORD)
+    parser.add_argument('--mock', action='store_true', help="Usa o mock backend local com a fila simulada")
+    parser.add_argument('--mock-workers', type=int, default=3, help="Workers da fila simulada")
+    parser.add_argument('--mock-processing-ms', type=int, default=2000, help="Tempo médio por certificação simulada")
+    parser.add_argument('--mock-failure-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    args.models = [m.strip() for m in args.models.split(',') if m.strip()] if args.models else None
+    args.regions = [r.strip() for r in args.regions.split(',') if r.strip()]
+
+    mock_server = None
+    base_url = args.url
+    if args.mock:
+        from mock_backend import CertificationQueueSim, MockBackend, MockServer
+        queue = CertificationQueueSim(args.mock_workers, args.mock_processing_ms,
+                                      failure_rate=args.mock_failure_rate)
+        mock_server = MockServer(MockBackend(certification_queue=queue)).start()
+        base_url = mock_server.url
+        print(f"🧪 Fila simulada: {args.mock_workers} workers, ~{args.mock_processing_ms}ms por certificação")
+
+    try:
+        report = asyncio.run(run_batch(args, base_url))
+    except (OSError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if mock_server is not None:
+            mock_server.stop()
+
+    print_report(report)
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump(dict(report, base_url=base_url), f, indent=2)
+    print(f"\n📄 Resultados salvos em: {RESULTS_FILE}")
+    # FAILED/ERROR são resultados da certificação; o driver falha só se não enviou ou não acompanhou
+    return 1 if report['statuses'].get('SUBMIT_ERROR') or report['statuses'].get('TIMEOUT') else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Profiler de chamadas de API baseado em eventos passivos do Playwright
+
+Escuta request/response/requestfinished/requestfailed (sem page.route,
+portanto sem desviar cada requisição para o Python) e registra, por
+requisição: tempos (DNS, conexão, TTFB, download), tamanho, status,
+origem de cache, deduplicação e o X-Request-ID do backend (cruzado com
+o log HTTP no Loki por server_timing.py). build_report() agrega os
+registros em histogramas de latência por endpoint e em um relatório de
+duplicatas; report_inputs() reduz um registro aos campos que build_report()
+e server_timing.correlate() usam, para agregar execuções longas.
+"""
+
+import hashlib
+import re
+import time
+from urllib.parse import urlsplit
+
+from metrics import histogram, summarize
+
+# Segmentos de caminho tratados como identificadores variáveis
+_ID_SEGMENT = re.compile(
+    r'^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{16,}|.*[.:].*)$',
+    re.IGNORECASE,
+)
+
+
+def normalize_endpoint(method, url):
+    """'GET /api/certification/details/:id' a partir de uma URL concreta"""
+    path = urlsplit(url).path
+    segments = [':id' if _ID_SEGMENT.match(segment) else segment
+                for segment in path.split('/')]
+    return f"{method} {'/'.join(segments)}"
+
+
+def _span(timing, start, end):
+    """Diferença entre dois marcos de request.timing (-1 = indisponível)"""
+    if timing.get(start, -1) < 0 or timing.get(end, -1) < 0:
+        return None
+    return round(timing[end] - timing[start], 2)
+
+
+class ApiProfiler:
+    """Coleta métricas por requisição para URLs que contêm `url_filter`"""
+
+    def __init__(self, page, url_filter='/api/', session=None):
+        self.url_filter = url_filter
+        self.session = session
+        self.records = []
+        # Visão (page view) corrente; cada registro guarda a visão em que nasceu
+        self.view = None
+        self._seen = {}
+        self._inflight = {}
+        self._responses = {}
+
+        page.on("request", self._on_request)
+        page.on("response", self._on_response)
+        page.on("requestfinished", self._on_finished)
+        page.on("requestfailed", self._on_failed)
+
+    def mark(self, view):
+        """Inicia uma nova visão lógica (navegação, reload, troca de aba)"""
+        self.view = view
+
+    def _key(self, request):
+        key = f"{request.method} {request.url}"
+        if request.post_data_buffer:
+            key += ' #' + hashlib.sha1(request.post_data_buffer).hexdigest()[:12]
+        return key
+
+    def _on_request(self, request):
+        if self.url_filter not in request.url:
+            return
+        key = self._key(request)
+        if any(entry['key'] == key for entry in self._inflight.values()):
+            dedup = 'concurrent'  # Mesma requisição ainda em voo
+        elif key in self._seen:
+            dedup = 'duplicate'
+        else:
+            dedup = 'unique'
+        self._seen[key] = self._seen.get(key, 0) + 1
+        self._inflight[request] = {
+            'key': key, 'dedup': dedup, 'view': self.view, 'wall_start': time.time(),
+        }
+
+    def _on_response(self, response):
+        if response.request in self._inflight:
+            # Propriedades locais, sem round-trip ao browser
+            self._responses[response.request] = {
+                'status': response.status,
+                'headers': response.headers,
+                'from_service_worker': response.from_service_worker,
+            }
+
+    def _on_finished(self, request):
+        self._complete(request, failure=None)
+
+    def _on_failed(self, request):
+        self._complete(request, failure=request.failure)
+
+    def _complete(self, request, failure):
+        entry = self._inflight.pop(request, None)
+        if entry is None:
+            return
+        response = self._responses.pop(request, {})
+        headers = response.get('headers', {})
+        timing = request.timing
+
+        if response.get('from_service_worker'):
+            cache = 'service-worker'
+        elif response.get('status') == 304:
+            cache = 'revalidated'
+        elif headers.get('x-cache'):
+            cache = headers['x-cache'].lower()
+        else:
+            cache = 'network'
+
+        self.records.append({
+            'session': self.session,
+            'view': entry['view'],
+            'url': request.url,
+            'method': request.method,
+            'endpoint': normalize_endpoint(request.method, request.url),
+            'key': entry['key'],
+            'status': response.get('status'),
+            'request_id': headers.get('x-request-id'),
+            'failure': failure,
+            'started_at': entry['wall_start'],
+            'timing': {
+                'dns': _span(timing, 'domainLookupStart', 'domainLookupEnd'),
+                'connect': _span(timing, 'connectStart', 'connectEnd'),
+                'ttfb': _span(timing, 'requestStart', 'responseStart'),
+                'download': _span(timing, 'responseStart', 'responseEnd'),
+                'total': round(timing['responseEnd'], 2) if timing.get('responseEnd', -1) >= 0 else None,
+            },
+            'cache': cache,
+            'cache_control': headers.get('cache-control'),
+            'dedup': entry['dedup'],
+            '_request': request,
+        })
+
+    def collect_sizes(self):
+        """Resolve tamanhos (um round-trip por requisição); chamar antes de fechar o context"""
+        for record in self.records:
+            request = record.pop('_request', None)
+            if request is None:
+                continue
+            try:
+                sizes = request.sizes()
+                record['size'] = {
+                    'request': sizes['requestBodySize'] + sizes['requestHeadersSize'],
+                    'response_body': sizes['responseBodySize'],
+                    'response_headers': sizes['responseHeadersSize'],
+                }
+            except Exception:
+                record['size'] = None
+
+    def export(self):
+        """Registros serializáveis (JSON/pickle)"""
+        self.collect_sizes()
+        return [dict(record) for record in self.records]
+
+
+def report_inputs(record):
+    """Cópia enxuta do registro: só o que build_report() e correlate() leem"""
+    return {
+        'session': record['session'],
+        'view': record['view'],
+        'url': record['url'],
+        'endpoint': record['endpoint'],
+        'key': record['key'],
+        'status': record['status'],
+        'request_id': record['request_id'],
+        'failure': record['failure'],
+        'started_at': record['started_at'],
+        'timing': {'total': record['timing']['total'], 'ttfb': record['timing']['ttfb']},
+        'size': {'response_body': (record.get('size') or {}).get('response_body', 0)},
+        'dedup': record['dedup'],
+    }
+
+
+def build_report(records):
+    """Histograma de latência por endpoint e relatório de requisições duplicadas"""
+    endpoints = {}
+    for record in records:
+        endpoints.setdefault(record['endpoint'], []).append(record)
+
+    per_endpoint = {}
+    for endpoint, items in sorted(endpoints.items()):
+        totals = [r['timing']['total'] for r in items]
+        per_endpoint[endpoint] = {
+            'count': len(items),
+            'errors': sum(1 for r in items if r['failure'] or (r['status'] or 0) >= 400),
+            'latency_ms': summarize(totals),
+            'ttfb_ms': summarize([r['timing']['ttfb'] for r in items]),
+            'histogram_ms': histogram(totals),
+            'response_bytes': sum((r.get('size') or {}).get('response_body', 0) for r in items),
+        }
+
+    duplicates = {}
+    for record in records:
+        if record['dedup'] != 'unique':
+            group = duplicates.setdefault((record['session'], record['key']), {
+                'session': record['session'], 'key': record['key'],
+                'duplicates': 0, 'concurrent': 0,
+            })
+            group['duplicates'] += 1
+            if record['dedup'] == 'concurrent':
+                group['concurrent'] += 1
+
+    return {
+        'total_requests': len(records),
+        'duplicate_requests': sum(g['duplicates'] for g in duplicates.values()),
+        'endpoints': per_endpoint,
+        'duplicates': sorted(duplicates.values(), key=lambda g: -g['duplicates']),
+    }
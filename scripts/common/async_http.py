@@ -0,0 +1,182 @@
+"""
+Cliente HTTP/1.1 assíncrono mínimo (somente biblioteca padrão)
+
+Mantém um pool de conexões keep-alive por cliente, de modo que muitas
+requisições concorrentes (asyncio.gather) reutilizam poucos sockets em
+vez de abrir um por chamada. Suporta Content-Length e chunked; erros de
+rede e timeouts propagam como exceções, respostas HTTP de erro não.
+"""
+
+import asyncio
+import base64
+import json as jsonlib
+import ssl
+import time
+from urllib.parse import urlencode, urlsplit
+
+
+class HttpResponse:
+    def __init__(self, status, headers, body, elapsed_ms):
+        self.status = status
+        # Nomes de header em minúsculas
+        self.headers = headers
+        self.body = body
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 400
+
+    def json(self):
+        return jsonlib.loads(self.body) if self.body else None
+
+    def __repr__(self):
+        return f'<HttpResponse {self.status} {len(self.body)}B {self.elapsed_ms}ms>'
+
+
+def basic_auth(user, password):
+    """Valor do header Authorization para HTTP Basic"""
+    return 'Basic ' + base64.b64encode(f'{user}:{password}'.encode()).decode()
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.requests = 0
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncHttpClient:
+    """
+    Cliente com pool de conexões keep-alive para um único host
+
+    max_connections limita os sockets simultâneos; requisições além disso
+    aguardam uma conexão livre.
+    """
+
+    def __init__(self, base_url, headers=None, max_connections=10, timeout=30):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.base_path = parts.path.rstrip('/')
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self.stats = {'requests': 0, 'connections_opened': 0, 'connections_reused': 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+    async def _open(self):
+        context = ssl.create_default_context() if self.scheme == 'https' else None
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+        self.stats['connections_opened'] += 1
+        return _Connection(reader, writer)
+
+    async def _connect(self):
+        if self._idle:
+            self.stats['connections_reused'] += 1
+            return self._idle.pop()
+        return await self._open()
+
+    async def _read_body(self, reader, headers):
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip(), 16)
+                if size == 0:
+                    # Trailers opcionais até a linha vazia
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return b''.join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+        if 'content-length' in headers:
+            return await reader.readexactly(int(headers['content-length']))
+        return await reader.read()
+
+    async def _exchange(self, connection, request_bytes):
+        connection.writer.write(request_bytes)
+        await connection.writer.drain()
+
+        status_line = await connection.reader.readline()
+        if not status_line:
+            raise ConnectionError("Conexão encerrada pelo servidor")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await connection.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        body = await self._read_body(connection.reader, headers)
+        return status, headers, body
+
+    async def request(self, method, path, params=None, json=None, data=None, headers=None):
+        """Executa uma requisição e retorna HttpResponse (elapsed_ms inclui a espera por conexão)"""
+        target = self.base_path + path
+        if params:
+            target += ('&' if '?' in target else '?') + urlencode(params, doseq=True)
+        body = b''
+        merged = {'Host': f'{self.host}:{self.port}', 'Connection': 'keep-alive',
+                  'Accept': 'application/json', **self.headers, **(headers or {})}
+        if json is not None:
+            body = jsonlib.dumps(json).encode()
+            merged['Content-Type'] = 'application/json'
+        elif data is not None:
+            body = data if isinstance(data, bytes) else data.encode()
+        if body or method in ('POST', 'PUT', 'PATCH'):
+            merged['Content-Length'] = str(len(body))
+        request_bytes = (f'{method} {target} HTTP/1.1\r\n'
+                         + ''.join(f'{k}: {v}\r\n' for k, v in merged.items())
+                         + '\r\n').encode() + body
+
+        started = time.perf_counter()
+        self.stats['requests'] += 1
+        async with self._slots:
+            connection = await self._connect()
+            try:
+                try:
+                    status, response_headers, response_body = await asyncio.wait_for(
+                        self._exchange(connection, request_bytes), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    if connection.requests == 0:
+                        raise
+                    # Conexão ociosa fechada pelo servidor: tenta uma vez em um socket novo
+                    connection.close()
+                    connection = await self._open()
+                    status, response_headers, response_body = await asyncio.wait_for(
+                        self._exchange(connection, request_bytes), self.timeout)
+            except BaseException:
+                connection.close()
+                raise
+            connection.requests += 1
+            if response_headers.get('connection', '').lower() == 'close':
+                connection.close()
+            else:
+                self._idle.append(connection)
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        return HttpResponse(status, response_headers, response_body, elapsed_ms)
+
+    async def get(self, path, **kwargs):
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request('POST', path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self.request('DELETE', path, **kwargs)
@@ -0,0 +1,203 @@
+"""
+Pool de sessões de browser compartilhado entre testes Playwright
+
+Lança o Chromium uma única vez por execução e entrega a cada teste um
+BrowserContext isolado, opcionalmente pré-carregado com o estado de
+autenticação (localStorage) capturado uma vez a partir de um login real.
+
+Modos HAR (tráfego /api/):
+  - har_record_dir: cada context grava um HAR próprio ao ser fechado
+  - har_replay_dir: os HARs do diretório respondem às chamadas /api/, com
+    latência artificial opcional (replay_latency_ms); o que não estiver
+    gravado segue para a rede
+
+persistent_session() abre um context sobre um diretório de perfil do
+Chromium, para medir cargas com cache HTTP e service workers aquecidos.
+"""
+
+import glob
+import itertools
+import json
+import os
+from contextlib import contextmanager
+
+from playwright.sync_api import sync_playwright
+
+from config import FRONTEND_ADMIN_URL, TEST_EMAIL, TEST_PASSWORD
+from mock_backend import MockBackend, install_routes
+
+HAR_URL_FILTER = '**/api/**'
+
+# localStorage do storage_state semeado por origem, sem sobrescrever o que o perfil já tem
+SEED_STORAGE_SCRIPT = """
+(() => {
+    const items = (ORIGINS)[location.origin];
+    if (!items) return;
+    for (const [name, value] of Object.entries(items)) {
+        if (localStorage.getItem(name) === null) localStorage.setItem(name, value);
+    }
+})();
+"""
+
+
+def _seed_storage(context, state):
+    """Aplica cookies e localStorage de um storage_state (dict ou arquivo) a um context persistente"""
+    if isinstance(state, str):
+        with open(state) as f:
+            state = json.load(f)
+    if state.get('cookies'):
+        context.add_cookies(state['cookies'])
+    origins = {
+        origin['origin']: {item['name']: item['value'] for item in origin.get('localStorage', [])}
+        for origin in state.get('origins', [])
+    }
+    context.add_init_script(SEED_STORAGE_SCRIPT.replace('ORIGINS', json.dumps(origins)))
+
+
+class BrowserSessionPool:
+    """Browser único com contexts isolados por teste"""
+
+    def __init__(self, headless=True, auth_state=None, auth_options=None,
+                 mock_backend=False, har_record_dir=None, har_replay_dir=None,
+                 replay_latency_ms=0, **launch_options):
+        self.headless = headless
+        self.launch_options = launch_options
+        # storage_state do Playwright (dict ou caminho de arquivo JSON)
+        self.auth_state = auth_state
+        # Argumentos de capture_auth_state() usados na captura sob demanda
+        self.auth_options = auth_options or {}
+        # Responde /api/* com o MockBackend (testes sem backend/banco)
+        self.mock_backend = MockBackend() if mock_backend else None
+        self.har_record_dir = har_record_dir
+        self.har_replay_files = sorted(glob.glob(os.path.join(har_replay_dir, '*.har'))) if har_replay_dir else []
+        if har_replay_dir and not self.har_replay_files:
+            raise FileNotFoundError(f"Nenhum arquivo .har em {har_replay_dir}")
+        self.replay_latency_ms = replay_latency_ms
+        self._har_counter = itertools.count(1)
+        self._playwright = None
+        self.browser = None
+
+    def start(self):
+        """Lança o browser (idempotente)"""
+        if self.browser is None:
+            self._playwright = sync_playwright().start()
+            self.browser = self._playwright.chromium.launch(
+                headless=self.headless, **self.launch_options
+            )
+        return self
+
+    def _new_context(self, label='context', **context_options):
+        if self.har_record_dir:
+            os.makedirs(self.har_record_dir, exist_ok=True)
+            # pid evita colisão entre workers do parallel_runner
+            name = f'{label}-{os.getpid()}-{next(self._har_counter)}.har'
+            context_options.update(
+                record_har_path=os.path.join(self.har_record_dir, name),
+                record_har_url_filter=HAR_URL_FILTER,
+                record_har_content='embed',
+            )
+        context = self.start().browser.new_context(**context_options)
+        self._install_routes(context)
+        return context
+
+    def _install_routes(self, context):
+        if self.mock_backend is not None:
+            install_routes(context, self.mock_backend)
+        for har_file in self.har_replay_files:
+            context.route_from_har(har_file, url=HAR_URL_FILTER, not_found='fallback')
+        if self.har_replay_files and self.replay_latency_ms:
+            # Registrada por último = executada primeiro; atrasa e repassa ao HAR
+            def delay(route):
+                route.request.frame.page.wait_for_timeout(self.replay_latency_ms)
+                route.fallback()
+            context.route(HAR_URL_FILTER, delay)
+
+    def close(self):
+        """Fecha o browser e encerra o Playwright"""
+        if self.browser is not None:
+            self.browser.close()
+            self.browser = None
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def capture_auth_state(self, base_url=FRONTEND_ADMIN_URL, email=TEST_EMAIL,
+                           password=TEST_PASSWORD, redirect='**/certifications'):
+        """Faz um login real e guarda o storage_state resultante"""
+        context = self._new_context(label='auth')
+        try:
+            page = context.new_page()
+            page.goto(f'{base_url}/login')
+            page.fill('input[type="email"]', email)
+            page.fill('input[type="password"]', password)
+            page.click('button[type="submit"]')
+            page.wait_for_url(redirect, timeout=10000)
+            self.auth_state = context.storage_state()
+        finally:
+            context.close()
+        return self.auth_state
+
+    @contextmanager
+    def session(self, authenticated=False, local_storage=None,
+                origin=FRONTEND_ADMIN_URL, label='context', **context_options):
+        """
+        Abre um BrowserContext isolado e o fecha ao final
+
+        authenticated: usa o estado capturado por capture_auth_state()
+        local_storage: dict com chaves pré-carregadas no localStorage de origin
+        label: prefixo do arquivo HAR quando gravando
+        """
+        if authenticated:
+            if self.auth_state is None:
+                self.capture_auth_state(**self.auth_options)
+            context_options['storage_state'] = self.auth_state
+        elif local_storage:
+            context_options['storage_state'] = {
+                'cookies': [],
+                'origins': [{
+                    'origin': origin,
+                    'localStorage': [
+                        {'name': name, 'value': value}
+                        for name, value in local_storage.items()
+                    ],
+                }],
+            }
+
+        context = self._new_context(label, **context_options)
+        try:
+            yield context
+        finally:
+            context.close()
+
+    @contextmanager
+    def persistent_session(self, user_data_dir, authenticated=False, **context_options):
+        """
+        BrowserContext sobre um diretório de perfil do Chromium e o fecha ao final
+
+        Cache HTTP, service workers e storage ficam no diretório e valem na
+        próxima abertura dele. Cada chamada lança um Chromium próprio (fora
+        do browser compartilhado). Rotas do mock/replay desativam o cache
+        HTTP do context.
+
+        authenticated: semeia cookies e localStorage do estado capturado
+        (contexts persistentes não aceitam storage_state)
+        """
+        if authenticated and self.auth_state is None:
+            self.capture_auth_state(**self.auth_options)
+        self.start()
+        context = self._playwright.chromium.launch_persistent_context(
+            user_data_dir, **dict(self.launch_options, headless=self.headless, **context_options)
+        )
+        try:
+            self._install_routes(context)
+            if authenticated:
+                _seed_storage(context, self.auth_state)
+            yield context
+        finally:
+            context.close()
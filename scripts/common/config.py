@@ -0,0 +1,21 @@
+"""
+Configuração compartilhada dos scripts Python (espelha scripts/common/config.sh)
+
+URLs podem ser sobrescritas por variáveis de ambiente MYIA_*.
+"""
+
+import os
+
+# URLs dos serviços
+FRONTEND_URL = os.environ.get('MYIA_FRONTEND_URL', 'http://localhost:3000')
+FRONTEND_ADMIN_URL = os.environ.get('MYIA_FRONTEND_ADMIN_URL', 'http://localhost:3003')
+BACKEND_URL = os.environ.get('MYIA_BACKEND_URL', 'http://localhost:3001')
+GRAFANA_URL = os.environ.get('MYIA_GRAFANA_URL', 'http://localhost:3002')
+LOKI_URL = os.environ.get('MYIA_LOKI_URL', 'http://localhost:3100')
+
+# Credenciais do usuário de teste
+TEST_EMAIL = '123@123.com'
+TEST_PASSWORD = '123123'
+
+# Raiz do repositório (scripts/common/../..)
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
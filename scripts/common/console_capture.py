@@ -0,0 +1,156 @@
+"""
+Captura do console do browser com memória limitada e varredura de segredos
+
+Substitui as listas console_logs que crescem sem limite. Cada mensagem é
+processada uma única vez, na chegada:
+
+- o prefixo estruturado do logger do frontend ("ℹ️ [INFO] ...", ver
+  frontend-admin/src/utils/logger.ts) vira o campo level;
+- uma única regex combinada (uma alternativa nomeada por padrão) procura
+  segredos conhecidos (e-mail/senha de teste, token emitido), strings com
+  formato de JWT, Bearer, atribuições de senha e padrões configurados;
+- a mensagem entra em um ring buffer (deque com maxlen).
+
+Contagens por nível e por tipo de achado cobrem a sessão inteira, mesmo
+depois que as mensagens saem do buffer. Os achados guardam o segredo
+mascarado, nunca o valor.
+"""
+
+import re
+import time
+from collections import Counter, deque
+
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_MAX_FINDINGS = 100
+
+# Emoji do logger antes do nível ("ℹ️ [INFO]"); U+2139 conta como \w, então qualquer prefixo curto sem '['
+_LEVEL_PREFIX = re.compile(r'^[^\[]{0,8}\[(DEBUG|INFO|WARN|WARNING|ERROR)\]\s?')
+
+# Padrões genéricos; nomes viram grupos da regex combinada
+BUILTIN_PATTERNS = {
+    # Token completo ou truncado: todo JWT começa com base64url de '{"'
+    'jwt': r'eyJ[A-Za-z0-9_-]{8,}(?:\.[A-Za-z0-9_-]*){0,2}',
+    'bearer': r'(?i:bearer)\s+[A-Za-z0-9._~+/-]{16,}=*',
+    # Chave inteira (não hasPassword/passwordValid) e valor que não seja booleano/nulo
+    # nem já mascarado ("***", "••••", "[REDACTED]")
+    'password_field': (r'(?i:"?\b(?:password|senha|passwd)"?\s*[:=]\s*)"?'
+                       r'(?!(?i:true|false|null|undefined)\b)'
+                       r'(?!(?:[*•xX]+|\[?(?i:redacted)\]?)(?:[\s",}]|$))[^\s",}]{3,}'),
+    'aws_access_key': r'\b(?:AKIA|ASIA)[0-9A-Z]{16}\b',
+}
+
+
+def mask(value):
+    """Primeiros caracteres + tamanho; suficiente para localizar, inútil para reutilizar"""
+    return f'{value[:4]}…({len(value)})' if len(value) > 4 else '…'
+
+
+class ConsoleCapture:
+    """
+    Ring buffer do console de uma página com detecção de segredos em fluxo
+
+    secrets: {nome: valor literal} procurado sem diferenciar maiúsculas
+    patterns: {nome: regex} adicionais aos BUILTIN_PATTERNS
+    """
+
+    def __init__(self, page=None, secrets=None, patterns=None, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_findings=DEFAULT_MAX_FINDINGS, builtin_patterns=True):
+        self.entries = deque(maxlen=max_entries)
+        self.total = 0
+        self.levels = Counter()
+        self.findings = deque(maxlen=max_findings)
+        self.finding_counts = Counter()
+        self._secrets = dict(secrets or {})
+        self._patterns = dict(BUILTIN_PATTERNS if builtin_patterns else {}, **(patterns or {}))
+        self._matcher = None
+        self._group_names = {}
+        self._compile()
+        self.started = time.perf_counter()
+        if page is not None:
+            self.attach(page)
+
+    def attach(self, page):
+        page.on("console", lambda msg: self.feed(msg.type, msg.text))
+        return self
+
+    def _compile(self):
+        """Junta literais e padrões em uma única regex com grupos nomeados"""
+        alternatives = []
+        self._group_names = {}
+        sources = [(name, f'(?i:{re.escape(value)})') for name, value in self._secrets.items() if value]
+        sources += list(self._patterns.items())
+        for index, (name, pattern) in enumerate(sources):
+            group = f'g{index}'
+            self._group_names[group] = name
+            alternatives.append(f'(?P<{group}>{pattern})')
+        self._matcher = re.compile('|'.join(alternatives)) if alternatives else None
+
+    def add_secret(self, name, value):
+        """Registra um segredo conhecido só depois (ex.: token emitido) e revarre o buffer"""
+        if not value:
+            return
+        # Trechos já registrados na chegada (ex.: o mesmo token casado como jwt) não contam de novo
+        previous = self._matcher
+        self._secrets[name] = value
+        self._compile()
+        literal = re.compile(re.escape(value), re.IGNORECASE)
+        for entry in self.entries:
+            covered = [m.span() for m in previous.finditer(entry['text'])] if previous else []
+            for match in literal.finditer(entry['text']):
+                if not any(start < match.end() and match.start() < end for start, end in covered):
+                    self._record(name, entry, match)
+
+    def _record(self, kind, entry, match):
+        self.finding_counts[kind] += 1
+        self.findings.append({'kind': kind, 'seq': entry['seq'], 'level': entry['level'],
+                              'match': mask(match.group())})
+
+    def _scan(self, entry):
+        if self._matcher is None:
+            return
+        for match in self._matcher.finditer(entry['text']):
+            self._record(self._group_names[match.lastgroup], entry, match)
+
+    def feed(self, msg_type, text):
+        """Processa uma mensagem (chamado pelo evento console; também utilizável sem browser)"""
+        match = _LEVEL_PREFIX.match(text)
+        level = match.group(1).replace('WARNING', 'WARN') if match else None
+        entry = {
+            'seq': self.total,
+            't_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'type': msg_type,
+            'level': level,
+            'text': text,
+        }
+        self.total += 1
+        self.levels[level or msg_type] += 1
+        self._scan(entry)
+        self.entries.append(entry)
+        return entry
+
+    def structured(self, levels=None):
+        """Mensagens do buffer com prefixo [LEVEL] (opcionalmente só os níveis dados)"""
+        return [e for e in self.entries if e['level'] and (levels is None or e['level'] in levels)]
+
+    def matching(self, needle):
+        needle = needle.lower()
+        return [e for e in self.entries if needle in e['text'].lower()]
+
+    def tail(self, count=20):
+        """Últimas mensagens no formato '[tipo] texto'"""
+        return [f"[{e['type']}] {e['text']}" for e in list(self.entries)[-count:]]
+
+    @property
+    def leaks(self):
+        return list(self.findings)
+
+    def export(self, tail=None):
+        entries = list(self.entries) if tail is None else list(self.entries)[-tail:]
+        return {
+            'total': self.total,
+            'dropped': self.total - len(self.entries),
+            'levels': dict(self.levels),
+            'findings': dict(self.finding_counts),
+            'leaks': list(self.findings),
+            'entries': entries,
+        }
@@ -0,0 +1,103 @@
+"""
+Extração do DOM em uma única ida e volta ao browser
+
+Em vez de um locator.count()/.all()/text_content() por elemento (cada um
+é uma chamada Python ↔ browser), descreve-se de uma vez tudo o que a
+verificação precisa e um único page.evaluate devolve o resultado:
+
+    snapshot = dom_snapshot(page,
+        counts={'badges': '.MuiChip-root', 'tab': {'selector': 'button', 'has_text': ['Models']}},
+        texts={'badges': '.MuiChip-root'},
+        groups={'cards': {'container': '[class*="ModelCard"]', 'item': '.MuiChip-root'}},
+        globals={'perf': '__myiaPerf'})
+
+    snapshot['counts']['badges']   → {'total': 12, 'visible': 10}
+    snapshot['texts']['badges']    → ['Certificado', ...]
+    snapshot['groups']['cards']    → [{'label': 'Claude 3 Haiku ...', 'items': ['Certificado']}, ...]
+    snapshot['globals']['perf']    → window.__myiaPerf (serializável)
+
+Seletores são CSS puro (querySelectorAll); o filtro por texto de
+Playwright (:has-text) é expresso com {'selector': ..., 'has_text': [...]}
+(substring, sem diferenciar maiúsculas). O custo fica constante conforme
+a lista de modelos cresce.
+"""
+
+# Listas (texts/groups) são truncadas em max_items para manter o retorno compacto
+DEFAULT_MAX_ITEMS = 200
+LABEL_LENGTH = 80
+
+DOM_SNAPSHOT_SCRIPT = """
+(spec) => {
+    const started = performance.now();
+    const norm = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    const select = (target, root = document) => {
+        const query = typeof target === 'string' ? { selector: target } : target;
+        let elements = Array.from(root.querySelectorAll(query.selector));
+        if (query.has_text) {
+            const needles = query.has_text.map((t) => t.toLowerCase());
+            elements = elements.filter((el) => {
+                const text = (el.textContent || '').toLowerCase();
+                return needles.some((needle) => text.includes(needle));
+            });
+        }
+        return elements;
+    };
+
+    const out = { counts: {}, texts: {}, groups: {}, globals: {} };
+    for (const [name, target] of Object.entries(spec.counts)) {
+        const elements = select(target);
+        out.counts[name] = { total: elements.length, visible: elements.filter(visible).length };
+    }
+    for (const [name, target] of Object.entries(spec.texts)) {
+        out.texts[name] = select(target).slice(0, spec.maxItems).map((el) => norm(el.textContent));
+    }
+    for (const [name, group] of Object.entries(spec.groups)) {
+        out.groups[name] = select(group.container).slice(0, spec.maxItems).map((container) => ({
+            label: norm(container.textContent).slice(0, spec.labelLength),
+            visible: visible(container),
+            items: select(group.item, container).map((el) => norm(el.textContent)),
+        }));
+    }
+    for (const [name, path] of Object.entries(spec.globals)) {
+        const value = path.split('.').reduce((obj, key) => (obj == null ? undefined : obj[key]), window);
+        try {
+            out.globals[name] = value === undefined ? null : JSON.parse(JSON.stringify(value));
+        } catch (e) {
+            out.globals[name] = null;
+        }
+    }
+    out.elapsed_ms = Math.round((performance.now() - started) * 100) / 100;
+    return out;
+}
+"""
+
+
+def _spec(counts, texts, groups, globals, max_items):
+    return {
+        'counts': counts or {},
+        'texts': texts or {},
+        'groups': groups or {},
+        'globals': globals or {},
+        'maxItems': max_items,
+        'labelLength': LABEL_LENGTH,
+    }
+
+
+def dom_snapshot(page, counts=None, texts=None, groups=None, globals=None, max_items=DEFAULT_MAX_ITEMS):
+    """Contagens, textos, grupos e valores de window em um único page.evaluate"""
+    return page.evaluate(DOM_SNAPSHOT_SCRIPT, _spec(counts, texts, groups, globals, max_items))
+
+
+async def dom_snapshot_async(page, counts=None, texts=None, groups=None, globals=None,
+                             max_items=DEFAULT_MAX_ITEMS):
+    """Versão para a API assíncrona do Playwright de dom_snapshot()"""
+    return await page.evaluate(DOM_SNAPSHOT_SCRIPT, _spec(counts, texts, groups, globals, max_items))
+
+
+def groups_without_items(snapshot, name):
+    """Grupos (ex.: cards de modelo) sem nenhum item (ex.: badge)"""
+    return [group for group in snapshot['groups'].get(name, []) if not group['items']]
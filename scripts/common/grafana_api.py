@@ -0,0 +1,150 @@
+"""
+Acesso à API HTTP do Grafana sem browser
+
+Carrega dashboards por uid, percorre os painéis (inclusive dentro de
+rows recolhidas) e monta, para cada painel, a mesma requisição
+/api/ds/query que o frontend do Grafana enviaria, com $__interval,
+$__range e afins já interpolados.
+"""
+
+import re
+import time
+
+from async_http import AsyncHttpClient, basic_auth
+
+DS_QUERY_ENDPOINT = '/api/ds/query'
+DASHBOARD_UIDS = ['myia-errors', 'myia-overview', 'myia-performance']
+DEFAULT_MAX_DATA_POINTS = 1000
+MIN_INTERVAL_MS = 1000
+
+_UNITS_MS = {'ms': 1, 's': 1000, 'm': 60000, 'h': 3600000, 'd': 86400000, 'w': 604800000}
+_RELATIVE_TIME = re.compile(r'^now(?:-(\d+)(ms|s|m|h|d|w))?$')
+_DURATION = re.compile(r'^(\d+)(ms|s|m|h|d|w)$')
+
+
+def parse_duration_ms(value):
+    """'5m' → 300000"""
+    match = _DURATION.match(value.strip())
+    if not match:
+        raise ValueError(f"Duração inválida: {value!r}")
+    return int(match.group(1)) * _UNITS_MS[match.group(2)]
+
+
+def parse_time_ms(value, now_ms=None):
+    """'now', 'now-1h' ou epoch em ms → epoch em ms"""
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    if str(value).isdigit():
+        return int(value)
+    match = _RELATIVE_TIME.match(value)
+    if not match:
+        raise ValueError(f"Tempo inválido: {value!r}")
+    if match.group(1) is None:
+        return now_ms
+    return now_ms - int(match.group(1)) * _UNITS_MS[match.group(2)]
+
+
+def format_duration(ms):
+    """Maior unidade inteira: 60000 → '1m', 15000 → '15s'"""
+    for unit in ('d', 'h', 'm', 's'):
+        if ms >= _UNITS_MS[unit] and ms % _UNITS_MS[unit] == 0:
+            return f'{ms // _UNITS_MS[unit]}{unit}'
+    return f'{ms}ms'
+
+
+def calculate_interval_ms(range_ms, max_data_points=DEFAULT_MAX_DATA_POINTS, min_interval_ms=MIN_INTERVAL_MS):
+    """Intervalo como o Grafana calcula: faixa / pontos, arredondado para segundos"""
+    raw = max(range_ms / max_data_points, min_interval_ms)
+    return int(round(raw / 1000) * 1000) or min_interval_ms
+
+
+def interpolate(expr, range_ms, interval_ms):
+    """Substitui as variáveis globais de intervalo/faixa do Grafana"""
+    replacements = {
+        '$__rate_interval': format_duration(max(4 * interval_ms, 60000)),
+        '$__interval_ms': str(interval_ms),
+        '$__interval': format_duration(interval_ms),
+        '$__range_s': str(range_ms // 1000),
+        '$__range_ms': str(range_ms),
+        '$__range': format_duration(range_ms),
+    }
+    # Nomes mais longos primeiro ($__interval_ms antes de $__interval)
+    for name, value in replacements.items():
+        expr = expr.replace(name, value)
+    return expr
+
+
+def iter_panels(dashboard):
+    """Painéis com targets, incluindo os aninhados em rows"""
+    for panel in dashboard.get('panels', []):
+        if panel.get('type') == 'row':
+            yield from (p for p in panel.get('panels', []) if p.get('targets'))
+        elif panel.get('targets'):
+            yield panel
+
+
+def panel_query(panel, time_from, time_to, max_data_points=None):
+    """Corpo de /api/ds/query para todos os targets do painel"""
+    range_ms = time_to - time_from
+    max_data_points = max_data_points or panel.get('maxDataPoints') or DEFAULT_MAX_DATA_POINTS
+    interval_ms = calculate_interval_ms(range_ms, max_data_points)
+    queries = []
+    for target in panel['targets']:
+        if target.get('hide'):
+            continue
+        query = dict(target)
+        query['datasource'] = target.get('datasource') or panel.get('datasource')
+        if 'expr' in query:
+            query['expr'] = interpolate(query['expr'], range_ms, interval_ms)
+        query.update(intervalMs=interval_ms, maxDataPoints=max_data_points)
+        queries.append(query)
+    return {'queries': queries, 'from': str(time_from), 'to': str(time_to)}
+
+
+def frame_rows(frame):
+    """Número de linhas de um data frame (tamanho do primeiro campo)"""
+    values = frame.get('data', {}).get('values') or []
+    return len(values[0]) if values else 0
+
+
+def summarize_ds_response(response):
+    """Resultado por refId: status, frames, linhas e erro (se houver)"""
+    payload = response.json() or {}
+    results = {}
+    for ref_id, result in (payload.get('results') or {}).items():
+        frames = result.get('frames') or []
+        results[ref_id] = {
+            'status': result.get('status', response.status),
+            'frames': len(frames),
+            'rows': sum(frame_rows(frame) for frame in frames),
+            'error': result.get('error'),
+        }
+    return results
+
+
+class GrafanaClient:
+    """AsyncHttpClient autenticado (Basic ou token de service account) para o Grafana"""
+
+    def __init__(self, base_url, user='admin', password='admin', token=None, max_connections=10, timeout=30):
+        authorization = f'Bearer {token}' if token else basic_auth(user, password)
+        self.http = AsyncHttpClient(base_url, headers={'Authorization': authorization},
+                                    max_connections=max_connections, timeout=timeout)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.http.close()
+
+    async def get_dashboard(self, uid):
+        response = await self.http.get(f'/api/dashboards/uid/{uid}')
+        if response.status != 200:
+            raise RuntimeError(f"Dashboard {uid}: HTTP {response.status}")
+        return response.json()['dashboard']
+
+    async def query_panel(self, dashboard_uid, panel, time_from, time_to, max_data_points=None):
+        """Executa os targets do painel; retorna HttpResponse (headers iguais aos do frontend)"""
+        body = panel_query(panel, time_from, time_to, max_data_points)
+        return await self.http.post(DS_QUERY_ENDPOINT, json=body, headers={
+            'X-Dashboard-Uid': dashboard_uid,
+            'X-Panel-Id': str(panel['id']),
+        })
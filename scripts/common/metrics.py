@@ -0,0 +1,145 @@
+"""
+Estatísticas simples para relatórios de desempenho (somente biblioteca padrão)
+"""
+
+import math
+
+# Limites superiores (ms) dos buckets de histograma de latência
+LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def percentile(values, pct):
+    """Percentil com interpolação linear (pct em 0-100); None se vazio"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values):
+    """Resumo com contagem, extremos, média e p50/p95/p99"""
+    values = [v for v in values if v is not None]
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'min': round(min(values), 2),
+        'max': round(max(values), 2),
+        'mean': round(sum(values) / len(values), 2),
+        'p50': round(percentile(values, 50), 2),
+        'p95': round(percentile(values, 95), 2),
+        'p99': round(percentile(values, 99), 2),
+    }
+
+
+def histogram(values, buckets=LATENCY_BUCKETS_MS):
+    """Contagem por bucket (não cumulativa); último bucket é '+Inf'"""
+    counts = [0] * (len(buckets) + 1)
+    for value in values:
+        if value is None:
+            continue
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [str(b) for b in buckets] + ['+Inf']
+    return [{'le': label, 'count': count} for label, count in zip(labels, counts)]
+
+
+# Até este total de amostras o p-valor do teste U é exato (distribuição das somas de postos)
+EXACT_U_MAX_N = 40
+
+
+def _exact_rank_sum_p(doubled_ranks, n1, observed):
+    """
+    p-valor bilateral exato: fração das C(n, n1) escolhas de postos cuja soma
+    se afasta da média tanto quanto a observada (postos dobrados, inteiros
+    mesmo com empates)
+    """
+    ways = [dict() for _ in range(n1 + 1)]
+    ways[0][0] = 1
+    for i, rank in enumerate(doubled_ranks):
+        for k in range(min(i + 1, n1), 0, -1):
+            target = ways[k]
+            for total, count in ways[k - 1].items():
+                target[total + rank] = target.get(total + rank, 0) + count
+    expected = n1 * (len(doubled_ranks) + 1)
+    deviation = abs(observed - expected)
+    extreme = sum(count for total, count in ways[n1].items() if abs(total - expected) >= deviation)
+    return extreme / math.comb(len(doubled_ranks), n1)
+
+
+def mann_whitney_min_p(n1, n2):
+    """Menor p-valor bilateral possível com n1 x n2 amostras (sem empates)"""
+    if n1 == 0 or n2 == 0:
+        return None
+    return min(1.0, 2 / math.comb(n1 + n2, n1))
+
+
+def mann_whitney_u(sample_a, sample_b):
+    """
+    Teste U de Mann-Whitney bilateral
+
+    Exato (com empates) até EXACT_U_MAX_N amostras no total; acima disso,
+    aproximação normal com correção de empates e de continuidade.
+    Retorna o p-valor; None se alguma amostra estiver vazia. Com poucas
+    repetições nenhum p chega a 0,05 (ver mann_whitney_min_p).
+    """
+    n1, n2 = len(sample_a), len(sample_b)
+    if n1 == 0 or n2 == 0:
+        return None
+
+    combined = sorted([(v, 0) for v in sample_a] + [(v, 1) for v in sample_b])
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[k] = average_rank
+        tied = j - i + 1
+        tie_term += tied ** 3 - tied
+        i = j + 1
+
+    rank_sum_a = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    n = n1 + n2
+    if n <= EXACT_U_MAX_N:
+        return _exact_rank_sum_p([round(2 * rank) for rank in ranks], n1, round(2 * rank_sum_a))
+    u_a = rank_sum_a - n1 * (n1 + 1) / 2
+    mean_u = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u_a - mean_u) - 0.5) / math.sqrt(variance)
+    return min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+
+def linear_trend(xs, ys):
+    """Reta de mínimos quadrados: slope, intercept e r2; None com menos de 2 pontos"""
+    points = [(x, y) for x, y in zip(xs, ys) if x is not None and y is not None]
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    if sxx == 0:
+        return None
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    syy = sum((y - mean_y) ** 2 for _, y in points)
+    slope = sxy / sxx
+    return {
+        'slope': slope,
+        'intercept': mean_y - slope * mean_x,
+        'r2': sxy ** 2 / (sxx * syy) if syy else 1.0,
+    }
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Backend local substituto para rodar os testes de UI sem backend/banco/Grafana
+
+Serve respostas gravadas (fixtures/mock_responses.json) no formato JSend
+para auth, certificações e provedores, além de /api/dashboards/uid/<uid>
+(dashboards versionados em observability/grafana/dashboards) e
+/api/ds/query do Grafana com frames sintéticos. Opcionalmente aplica o
+mesmo limite por janela fixa do authLimiter (backend/src/middleware/
+rateLimiter.ts), com os headers RateLimit-* e 429 em JSend, e simula a
+fila de certificação (POST certify-model, GET jobs/:jobId) com N workers
+e tempo de processamento configuráveis.
+
+Dois modos de uso:
+  - install_routes(context): intercepta /api/* no Playwright (route.fulfill),
+    sem abrir portas; os frontends (vite) continuam precisando estar no ar.
+  - MockServer: servidor HTTP local em thread daemon, para scripts que
+    falam direto com a API (python3 mock_backend.py --port 3001).
+"""
+
+import argparse
+import base64
+import heapq
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from config import ROOT_DIR, TEST_EMAIL, TEST_PASSWORD
+
+FIXTURES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'mock_responses.json')
+DASHBOARDS_DIR = os.path.join(ROOT_DIR, 'observability', 'grafana', 'dashboards')
+
+MOCK_USER = {'id': 'mock-user-1', 'email': TEST_EMAIL, 'name': 'Usuário de Teste'}
+TOKEN_TTL_S = 3600
+
+# authLimiter do backend: 1000 requisições por 15 minutos em /api/auth
+AUTH_RATE_LIMIT = (1000, 15 * 60)
+
+# CERTIFICATION_CONCURRENCY padrão do backend (config/env.ts)
+CERTIFICATION_WORKERS = 3
+CERTIFICATION_QUEUE_PREFIX = '/api/certification-queue/'
+
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b'=').decode()
+
+
+def make_token(user_id=MOCK_USER['id'], ttl_s=TOKEN_TTL_S):
+    """Token com formato JWT (o frontend-admin decodifica e confere exp no cliente)"""
+    header = _b64url({'alg': 'HS256', 'typ': 'JWT'})
+    payload = _b64url({'userId': user_id, 'iat': int(time.time()), 'exp': int(time.time()) + ttl_s})
+    return f'{header}.{payload}.mock-signature'
+
+
+def _token_valid(token):
+    parts = token.split('.')
+    if len(parts) != 3 or parts[2] != 'mock-signature':
+        return False
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(parts[1] + '=' * (-len(parts[1]) % 4)))
+    except ValueError:
+        return False
+    return payload.get('exp', 0) > time.time()
+
+
+def _success(data):
+    return {'status': 'success', 'data': data}
+
+
+def _error(message, code):
+    return {'status': 'error', 'message': message, 'code': code}
+
+
+def _route_pattern(path):
+    """'/api/x/:id' → regex com grupos nomeados"""
+    return re.compile('^' + re.sub(r':(\w+)', r'(?P<\1>[^/]+)', path) + '$')
+
+
+class FixedWindowLimiter:
+    """Janela fixa por cliente, como o MemoryStore do express-rate-limit"""
+
+    def __init__(self, max_requests, window_s):
+        self.max_requests = max_requests
+        self.window_s = window_s
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key):
+        """Conta uma requisição; retorna (permitida, restantes, segundos até o reset)"""
+        now = time.monotonic()
+        with self._lock:
+            started, count = self._windows.get(key, (now, 0))
+            if now - started >= self.window_s:
+                started, count = now, 0
+            count += 1
+            self._windows[key] = (started, count)
+        reset_s = max(0, int(round(started + self.window_s - now)))
+        return count <= self.max_requests, max(0, self.max_requests - count), reset_s
+
+    def headers(self, remaining, reset_s):
+        """standardHeaders: true (draft-6)"""
+        return {
+            'RateLimit-Policy': f'{self.max_requests};w={self.window_s}',
+            'RateLimit-Limit': str(self.max_requests),
+            'RateLimit-Remaining': str(remaining),
+            'RateLimit-Reset': str(reset_s),
+        }
+
+
+def _iso(epoch_s):
+    return datetime.fromtimestamp(epoch_s, timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class CertificationQueueSim:
+    """
+    Fila de certificação simulada: `workers` jobs em paralelo, ordem FIFO
+
+    O agendamento é calculado na submissão (início = quando um worker
+    fica livre, fim = início + processamento com jitter), sem threads; o
+    estado de cada job em GET jobs/:jobId sai do relógio.
+    """
+
+    def __init__(self, workers=CERTIFICATION_WORKERS, processing_ms=2000, jitter=0.3, failure_rate=0.0, seed=None):
+        self.processing_ms = processing_ms
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.jobs = {}
+        self._free_at = [0.0] * workers
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def submit(self, model_id, region, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            free_at = heapq.heappop(self._free_at)
+            duration_s = self.processing_ms / 1000 * self._random.uniform(1 - self.jitter, 1 + self.jitter)
+            started = max(now, free_at)
+            heapq.heappush(self._free_at, started + duration_s)
+            job_id = str(uuid.uuid4())
+            self.jobs[job_id] = {
+                'modelId': model_id, 'region': region, 'created': now, 'started': started,
+                'completed': started + duration_s, 'passed': self._random.random() >= self.failure_rate,
+            }
+        return job_id
+
+    def status(self, job_id, now=None):
+        """Mesmo formato de StatusQuery.getJobStatus (um job = uma certificação)"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        now = time.time() if now is None else now
+        done = now >= job['completed']
+        if done:
+            cert_status = 'PASSED' if job['passed'] else 'FAILED'
+        else:
+            cert_status = 'RUNNING' if now >= job['started'] else 'PENDING'
+        certification = {
+            'id': f'cert-{job_id[:8]}',
+            'jobId': job_id,
+            'modelId': job['modelId'],
+            'region': job['region'],
+            'status': cert_status,
+            'createdAt': _iso(job['created']),
+            'startedAt': _iso(job['started']) if now >= job['started'] else None,
+            'completedAt': _iso(job['completed']) if done else None,
+            'duration': round((job['completed'] - job['started']) * 1000) if done else None,
+            'error': None if not done or job['passed'] else 'Simulated failure',
+        }
+        return {
+            'id': job_id,
+            # Como no backend: RUNNING só com parte processada; um job único fica PENDING até terminar
+            'status': cert_status if done else 'PENDING',
+            'totalModels': 1,
+            'processedModels': 1 if done else 0,
+            'successCount': 1 if done and job['passed'] else 0,
+            'failureCount': 1 if done and not job['passed'] else 0,
+            'certifications': [certification],
+        }
+
+    def counts(self, now=None):
+        now = time.time() if now is None else now
+        jobs = list(self.jobs.values())
+        return {
+            'waiting': sum(1 for j in jobs if now < j['started']),
+            'active': sum(1 for j in jobs if j['started'] <= now < j['completed']),
+            'completed': sum(1 for j in jobs if now >= j['completed'] and j['passed']),
+            'failed': sum(1 for j in jobs if now >= j['completed'] and not j['passed']),
+        }
+
+    def handle(self, method, path, data):
+        """(status, payload) para as rotas da fila; None para cair nas fixtures"""
+        route = path[len(CERTIFICATION_QUEUE_PREFIX):]
+        if route == 'certify-model' and method == 'POST':
+            if not isinstance(data.get('modelId'), str) or not isinstance(data.get('region'), str):
+                return 400, _error('modelId and region are required and must be strings', 400)
+            job_id = self.submit(data['modelId'], data['region'])
+            return 201, _success({'jobId': job_id, 'bullJobId': job_id, 'modelId': data['modelId'],
+                                  'region': data['region'], 'status': 'QUEUED'})
+        if route.startswith('jobs/') and method == 'GET':
+            status = self.status(route[len('jobs/'):])
+            if status is None:
+                return 404, _error('Job not found', 404)
+            return 200, _success(status)
+        if route == 'stats' and method == 'GET':
+            return 200, _success({'queue': {'queue': self.counts()}})
+        return None
+
+
+class MockBackend:
+    """Roteia (método, url) para respostas gravadas; sem I/O de rede
+
+    rate_limits: {prefixo de path: (máximo, janela em s)}, ex. {'/api/auth': AUTH_RATE_LIMIT}
+    certification_queue: CertificationQueueSim para certify-model/jobs/stats da fila
+    """
+
+    def __init__(self, fixtures_file=FIXTURES_FILE, latency_ms=0, rate_limits=None, certification_queue=None):
+        with open(fixtures_file) as f:
+            fixtures = json.load(f)
+        self.latency_ms = latency_ms
+        self.rate_limiters = {prefix: FixedWindowLimiter(*limit) for prefix, limit in (rate_limits or {}).items()}
+        self.certification_queue = certification_queue
+        self.routes = []
+        for key, response in fixtures['routes'].items():
+            method, path = key.split(' ', 1)
+            self.routes.append((method, _route_pattern(path), response))
+        self.dashboards = self._load_dashboards()
+        self.request_count = 0
+
+    @staticmethod
+    def _load_dashboards():
+        dashboards = {}
+        if not os.path.isdir(DASHBOARDS_DIR):
+            return dashboards
+        for name in sorted(os.listdir(DASHBOARDS_DIR)):
+            if name.endswith('.json'):
+                with open(os.path.join(DASHBOARDS_DIR, name)) as f:
+                    dashboard = json.load(f)
+                dashboards[dashboard.get('uid', name[:-5])] = dashboard
+        return dashboards
+
+    def handle(self, method, url, headers=None, body=None):
+        """Retorna (status, headers, corpo em bytes)"""
+        self.request_count += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        response_headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'X-Request-ID': headers.get('x-request-id') or str(uuid.uuid4()),
+        }
+        origin = headers.get('origin')
+        if origin:
+            response_headers.update({
+                'Access-Control-Allow-Origin': origin,
+                'Access-Control-Allow-Credentials': 'true',
+                'Access-Control-Allow-Headers': 'Authorization, Content-Type, X-Request-ID',
+                'Access-Control-Allow-Methods': 'GET, POST, PUT, PATCH, DELETE, OPTIONS',
+                'Access-Control-Expose-Headers': 'X-Request-ID',
+            })
+
+        if method == 'OPTIONS':
+            return 204, response_headers, b''
+
+        parts = urlsplit(url)
+        limited = self._rate_limit(parts.path, headers, response_headers)
+        if limited:
+            return 429, response_headers, json.dumps(limited).encode()
+        status, payload = self._dispatch(method, parts.path, parse_qs(parts.query), headers, body)
+        return status, response_headers, json.dumps(payload).encode()
+
+    def _rate_limit(self, path, headers, response_headers):
+        """Corpo do 429 se algum limitador do path estourou; senão None"""
+        client = headers.get('x-forwarded-for', 'local')
+        for prefix, limiter in self.rate_limiters.items():
+            if not path.startswith(prefix):
+                continue
+            allowed, remaining, reset_s = limiter.hit(client)
+            response_headers.update(limiter.headers(remaining, reset_s))
+            if not allowed:
+                response_headers['Retry-After'] = str(reset_s)
+                return dict(_error('Muitas tentativas de autenticação. Tente novamente em 15 minutos.', 429),
+                            data={'retryAfter': f'{reset_s} seconds'})
+        return None
+
+    def _dispatch(self, method, path, query, headers, body):
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return 400, _error('Invalid JSON body', 400)
+
+        # Grafana
+        if path.startswith('/api/dashboards/uid/'):
+            uid = path.rsplit('/', 1)[-1]
+            if uid not in self.dashboards:
+                return 404, {'message': 'Dashboard not found'}
+            return 200, {'dashboard': self.dashboards[uid], 'meta': {'slug': uid}}
+        if path == '/api/ds/query' and method == 'POST':
+            return 200, self._ds_query(data)
+
+        # Autenticação
+        if path == '/api/auth/login' and method == 'POST':
+            if data.get('email') == TEST_EMAIL and data.get('password') == TEST_PASSWORD:
+                return 200, _success({'token': make_token(), 'user': MOCK_USER})
+            return 401, _error('Invalid credentials', 401)
+
+        if self.certification_queue is not None and path.startswith(CERTIFICATION_QUEUE_PREFIX):
+            handled = self._check_token(headers) or self.certification_queue.handle(method, path, data)
+            if handled is not None:
+                return handled
+
+        route = self._match(method, path)
+        if route is None and path != '/api/auth/me':
+            return 404, _error(f'Route {method} {path} not found', 404)
+
+        if route is None or route.get('auth', True):
+            unauthorized = self._check_token(headers)
+            if unauthorized:
+                return unauthorized
+
+        if route is None:
+            return 200, _success({'user': MOCK_USER})
+        return route.get('status', 200), self._filter(path, route['body'], query)
+
+    @staticmethod
+    def _check_token(headers):
+        """(401, corpo) sem Bearer válido, como o authMiddleware; None se autorizado"""
+        authorization = headers.get('authorization', '')
+        token = authorization[7:] if authorization.startswith('Bearer ') else ''
+        if not token:
+            return 401, _error('No token provided', 401)
+        if not _token_valid(token):
+            return 401, _error('Invalid token', 401)
+        return None
+
+    def _match(self, method, path):
+        for route_method, pattern, response in self.routes:
+            if route_method == method and pattern.match(path):
+                return response
+        return None
+
+    @staticmethod
+    def _filter(path, body, query):
+        """Aplica os filtros modelId/status da listagem de certificações"""
+        if not path.endswith('/certifications') or body.get('status') != 'success':
+            return body
+        certifications = body['data']['certifications']
+        for field in ('modelId', 'status'):
+            if field in query:
+                certifications = [c for c in certifications if c[field] == query[field][0]]
+        return _success(dict(body['data'], certifications=certifications,
+                             pagination=dict(body['data']['pagination'], total=len(certifications))))
+
+    @staticmethod
+    def _ds_query(data):
+        """Um frame com uma série curta por refId (formato de /api/ds/query)"""
+        now_ms = int(time.time() * 1000)
+        results = {}
+        for query in data.get('queries', []):
+            ref_id = query.get('refId', 'A')
+            timestamps = [now_ms - i * 60000 for i in range(5, 0, -1)]
+            results[ref_id] = {
+                'status': 200,
+                'frames': [{
+                    'schema': {
+                        'refId': ref_id,
+                        'fields': [{'name': 'Time', 'type': 'time'}, {'name': 'Value', 'type': 'number'}],
+                    },
+                    'data': {'values': [timestamps, [1, 3, 2, 5, 4]]},
+                }],
+            }
+        return {'results': results}
+
+
+def install_routes(context, backend=None):
+    """Intercepta as chamadas /api/* do context e as responde com o MockBackend"""
+    backend = backend or MockBackend()
+
+    def fulfill(route):
+        request = route.request
+        status, headers, body = backend.handle(request.method, request.url,
+                                               request.headers, request.post_data)
+        route.fulfill(status=status, headers=headers, body=body)
+
+    context.route(lambda url: urlsplit(url).path.startswith('/api/'), fulfill)
+    return backend
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers e corpo saem em writes separados; sem isso o keep-alive paga ~40ms de delayed ACK
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        status, headers, payload = self.server.backend.handle(self.command, self.path,
+                                                              dict(self.headers), body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Backlog padrão (5) derruba SYNs sob concorrência e o cliente paga 1s de retransmissão
+    request_queue_size = 128
+
+
+class MockServer:
+    """MockBackend exposto por HTTP em uma thread daemon (port=0 escolhe uma porta livre)"""
+
+    def __init__(self, backend=None, host='127.0.0.1', port=0):
+        self.backend = backend or MockBackend()
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://{self.host}:{self.port}'
+
+    def start(self):
+        if self._server is None:
+            self._server = _Server((self.host, self.port), _Handler)
+            self._server.backend = self.backend
+            self.port = self._server.server_address[1]
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend/Grafana simulados para testes offline")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3001)
+    parser.add_argument('--latency-ms', type=int, default=0, help="Latência artificial por requisição")
+    parser.add_argument('--auth-rate-limit', type=int, metavar='N',
+                        help=f"Limita /api/auth a N requisições por janela (backend: {AUTH_RATE_LIMIT[0]})")
+    parser.add_argument('--rate-limit-window', type=int, default=AUTH_RATE_LIMIT[1], help="Janela em segundos")
+    parser.add_argument('--cert-workers', type=int, metavar='N',
+                        help=f"Simula a fila de certificação com N workers (backend: {CERTIFICATION_WORKERS})")
+    parser.add_argument('--cert-processing-ms', type=int, default=2000, help="Tempo médio por certificação simulada")
+    args = parser.parse_args()
+
+    rate_limits = {'/api/auth': (args.auth_rate_limit, args.rate_limit_window)} if args.auth_rate_limit else None
+    queue = CertificationQueueSim(args.cert_workers, args.cert_processing_ms) if args.cert_workers else None
+    server = MockServer(MockBackend(latency_ms=args.latency_ms, rate_limits=rate_limits, certification_queue=queue),
+                        args.host, args.port).start()
+    print(f"🧪 Mock backend em {server.url} (Ctrl+C para sair)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
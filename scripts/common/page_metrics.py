@@ -0,0 +1,139 @@
+"""
+Métricas de carregamento de página coletadas no browser
+
+Um init script registra PerformanceObservers (LCP, long tasks, layout
+shift) antes de qualquer código da aplicação; collect_page_metrics()
+lê esses valores, o Navigation Timing e, via CDP, o heap JS.
+
+collect_memory() é a leitura para sessões longas (soak): força um GC e
+lê heap JS, contadores do DOM (nós e listeners, inclusive desanexados)
+e, com browser_rss_mb(), a memória residente dos processos do Chromium.
+"""
+
+PERF_OBSERVER_SCRIPT = """
+(() => {
+    const perf = window.__myiaPerf = { lcp: null, longTasks: [], cls: 0 };
+    const observe = (type, callback) => {
+        try {
+            new PerformanceObserver((list) => list.getEntries().forEach(callback))
+                .observe({ type, buffered: true });
+        } catch (e) { /* tipo não suportado */ }
+    };
+    observe('largest-contentful-paint', (entry) => { perf.lcp = entry.startTime; });
+    observe('longtask', (entry) => {
+        perf.longTasks.push({ start: entry.startTime, duration: entry.duration });
+    });
+    observe('layout-shift', (entry) => {
+        if (!entry.hadRecentInput) perf.cls += entry.value;
+    });
+})();
+"""
+
+_COLLECT_JS = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const perf = window.__myiaPerf || { lcp: null, longTasks: [], cls: 0 };
+    return {
+        navigation: nav ? {
+            ttfb: nav.responseStart - nav.requestStart,
+            dom_content_loaded: nav.domContentLoadedEventEnd,
+            load: nav.loadEventEnd,
+            transfer_bytes: nav.transferSize,
+        } : null,
+        lcp: perf.lcp,
+        long_tasks: perf.longTasks.length,
+        long_task_ms: perf.longTasks.reduce((total, task) => total + task.duration, 0),
+        cls: perf.cls,
+        dom_nodes: document.getElementsByTagName('*').length,
+    };
+}
+"""
+
+
+def install_perf_observers(context):
+    """Registra os observers em todas as páginas do context"""
+    context.add_init_script(PERF_OBSERVER_SCRIPT)
+
+
+def open_cdp(page):
+    """Sessão CDP com o domínio Performance habilitado"""
+    cdp = page.context.new_cdp_session(page)
+    cdp.send('Performance.enable')
+    return cdp
+
+
+def cdp_metrics(cdp):
+    """Métricas do domínio Performance do CDP como dict nome → valor"""
+    return {m['name']: m['value'] for m in cdp.send('Performance.getMetrics')['metrics']}
+
+
+def collect_page_metrics(page, cdp=None):
+    """Navigation Timing, LCP, long tasks, CLS e (com CDP) heap JS em MB"""
+    raw = page.evaluate(_COLLECT_JS)
+    metrics = {
+        'lcp': raw['lcp'],
+        'long_tasks': raw['long_tasks'],
+        'long_task_ms': round(raw['long_task_ms'], 2),
+        'cls': round(raw['cls'], 4),
+        'dom_nodes': raw['dom_nodes'],
+    }
+    if raw['navigation']:
+        metrics.update({k: round(v, 2) for k, v in raw['navigation'].items()})
+    if cdp is not None:
+        metrics['js_heap_mb'] = round(cdp_metrics(cdp)['JSHeapUsedSize'] / 1024 / 1024, 2)
+    return metrics
+
+
+def open_memory_cdp(page):
+    """Sessão CDP para collect_memory()"""
+    cdp = page.context.new_cdp_session(page)
+    cdp.send('HeapProfiler.enable')
+    return cdp
+
+
+def collect_memory(cdp, gc=True):
+    """Heap JS (MB), nós do DOM, listeners e documentos após um GC forçado"""
+    if gc:
+        # Sem o GC, lixo ainda não coletado parece vazamento
+        cdp.send('HeapProfiler.collectGarbage')
+    heap = cdp.send('Runtime.getHeapUsage')
+    counters = cdp.send('Memory.getDOMCounters')
+    return {
+        'js_heap_mb': round(heap['usedSize'] / 1024 / 1024, 2),
+        'js_heap_total_mb': round(heap['totalSize'] / 1024 / 1024, 2),
+        'dom_nodes': counters['nodes'],
+        'listeners': counters['jsEventListeners'],
+        'documents': counters['documents'],
+    }
+
+
+def _proc_rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def browser_rss_mb(browser_cdp):
+    """
+    RSS (MB) por tipo de processo do Chromium: pids via SystemInfo.getProcessInfo,
+    memória via /proc (Linux, browser na mesma máquina); None se indisponível
+
+    browser_cdp: browser.new_browser_cdp_session()
+    """
+    processes = browser_cdp.send('SystemInfo.getProcessInfo')['processInfo']
+    by_type = {}
+    for process in processes:
+        rss_kb = _proc_rss_kb(process['id'])
+        if rss_kb is not None:
+            by_type[process['type']] = by_type.get(process['type'], 0) + rss_kb
+    if not by_type:
+        return None
+    return {
+        'total': round(sum(by_type.values()) / 1024, 1),
+        'by_type': {name: round(kb / 1024, 1) for name, kb in sorted(by_type.items())},
+    }
@@ -0,0 +1,115 @@
+"""
+Execução paralela de testes Playwright
+
+Distribui testes independentes entre N processos, cada um com seu próprio
+BrowserSessionPool (um browser por worker). A saída de cada teste é
+capturada e reimpressa na ordem original, de modo que o resumo final é
+idêntico ao da execução sequencial.
+
+Cada teste é uma função de nível de módulo que recebe o pool e devolve
+um resultado serializável (pickle).
+
+on_result(nome, resultado, duração, saída) é chamado no processo principal
+assim que cada teste termina (inclusive nos workers), para gravação
+incremental (ver results_sink.py).
+"""
+
+import contextlib
+import io
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from browser_pool import BrowserSessionPool
+
+
+def _run_one(pool, func):
+    """Executa um teste convertendo exceções não tratadas em falha"""
+    try:
+        return func(pool)
+    except Exception as e:
+        print(f"❌ FALHOU - {str(e)}")
+        return False
+
+
+def _run_batch(batch, pool_options, completed=None):
+    """Executa um lote de testes em um único browser (processo worker)"""
+    outcomes = []
+    with BrowserSessionPool(**pool_options) as pool:
+        for index, func in batch:
+            output = io.StringIO()
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(output):
+                result = _run_one(pool, func)
+            outcome = (index, result, output.getvalue(), time.perf_counter() - started)
+            if completed is not None:
+                completed.put(outcome)
+            outcomes.append(outcome)
+    return outcomes
+
+
+def _drain(completed, futures, tests, on_result):
+    """Repassa a on_result cada teste concluído nos workers, até todos terminarem"""
+    pending = len(tests)
+    while pending:
+        try:
+            index, result, output, duration = completed.get(timeout=0.5)
+        except queue.Empty:
+            # Worker que morreu não vai mais publicar: future.result() propaga a falha
+            for future in futures:
+                if future.done() and future.exception() is not None:
+                    future.result()
+            continue
+        on_result(tests[index][0], result, duration, output)
+        pending -= 1
+
+
+def run_tests(tests, workers=1, pool_options=None, on_result=None):
+    """
+    Executa testes e retorna lista de (nome, resultado, duração) na ordem de entrada
+
+    tests: lista de (nome, função(pool))
+    workers: 1 executa no processo atual com saída ao vivo
+    on_result: callback(nome, resultado, duração, saída) a cada teste concluído
+               (saída capturada só com workers > 1; None no modo sequencial)
+    """
+    pool_options = pool_options or {}
+    workers = max(1, min(workers, len(tests)))
+
+    if workers == 1:
+        outcomes = []
+        with BrowserSessionPool(**pool_options) as pool:
+            for name, func in tests:
+                started = time.perf_counter()
+                result = _run_one(pool, func)
+                duration = time.perf_counter() - started
+                if on_result is not None:
+                    on_result(name, result, duration, None)
+                outcomes.append((name, result, duration))
+        return outcomes
+
+    # Distribuição round-robin: lotes estáveis para a mesma lista de testes
+    batches = [[] for _ in range(workers)]
+    for index, (_, func) in enumerate(tests):
+        batches[index % workers].append((index, func))
+
+    collected = {}
+    with contextlib.ExitStack() as stack:
+        completed = None
+        if on_result is not None:
+            completed = stack.enter_context(multiprocessing.Manager()).Queue()
+        executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+        futures = [executor.submit(_run_batch, batch, pool_options, completed) for batch in batches]
+        if completed is not None:
+            _drain(completed, futures, tests, on_result)
+        for future in futures:
+            for index, result, output, duration in future.result():
+                collected[index] = (result, output, duration)
+
+    outcomes = []
+    for index, (name, _) in enumerate(tests):
+        result, output, duration = collected[index]
+        print(output, end='')
+        outcomes.append((name, result, duration))
+    return outcomes
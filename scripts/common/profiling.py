@@ -0,0 +1,251 @@
+"""
+Perfil de CPU e trace do Chrome por etapa de um fluxo de UI (opt-in)
+
+    profiler = FlowProfiler(page, '/tmp/perfis', mode='cpu', label='test_4')
+    with profiler.step('models'):
+        page.click(...)
+    profiler.steps  → resumo por etapa (arquivo, top self-time, long tasks)
+
+Modos:
+- cpu:   CDP Profiler (amostragem do V8) → <label>-<etapa>.cpuprofile,
+         aberto pelo speedscope e pela aba Performance do DevTools.
+         Long tasks vêm do PerformanceObserver de page_metrics.py.
+- trace: browser.start_tracing (timeline + amostras do V8) →
+         <label>-<etapa>.trace.json, aberto pelo Perfetto (ui.perfetto.dev)
+         e pelo speedscope. Long tasks = RunTask ≥ 50ms na main thread do
+         renderer; self-time por evento (FunctionCall com nome da função).
+
+Só Chromium. Em modo trace há um trace por browser por vez: etapas de
+páginas diferentes do mesmo browser não podem se sobrepor.
+"""
+
+import json
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from page_metrics import PERF_OBSERVER_SCRIPT
+
+PROFILE_MODES = ('cpu', 'trace')
+LONG_TASK_MS = 50
+DEFAULT_TOP = 10
+DEFAULT_SAMPLING_INTERVAL_US = 200
+
+TRACE_CATEGORIES = [
+    'devtools.timeline',
+    'disabled-by-default-devtools.timeline',
+    'disabled-by-default-devtools.timeline.frame',
+    'disabled-by-default-v8.cpu_profiler',
+    'v8.execute',
+    'blink.user_timing',
+    'loading',
+    'latencyInfo',
+]
+
+_IGNORED_FRAMES = {'(root)', '(idle)'}
+_TASK_EVENTS = {'RunTask', 'ThreadControllerImpl::RunTask'}
+
+# Long tasks em epoch ms (timeOrigin + startTime), comparáveis entre navegações
+_LONG_TASKS_JS = """
+() => ((window.__myiaPerf || {}).longTasks || []).map((task) => ({
+    start: performance.timeOrigin + task.start,
+    duration: task.duration,
+}))
+"""
+
+
+def _slug(name):
+    return re.sub(r'[^\w.-]+', '_', name)
+
+
+def _short_url(url):
+    """Só o caminho do script, sem origem e query (bundles do vite ficam legíveis)"""
+    return re.sub(r'^[a-z]+://[^/]+', '', url or '').split('?', 1)[0]
+
+
+def _top(self_time_us, total_us, top):
+    ranked = sorted(self_time_us.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{
+        'function': key[0],
+        'url': key[1],
+        'line': key[2],
+        'self_ms': round(us / 1000, 2),
+        'self_pct': round(100 * us / total_us, 1) if total_us else None,
+    } for key, us in ranked]
+
+
+def summarize_cpu_profile(profile, top=DEFAULT_TOP):
+    """Top funções por self-time de um .cpuprofile (amostra i dura timeDeltas[i + 1])"""
+    nodes = {node['id']: node for node in profile.get('nodes', [])}
+    samples = profile.get('samples', [])
+    deltas = profile.get('timeDeltas', [])
+    per_node = Counter()
+    for i, node_id in enumerate(samples):
+        per_node[node_id] += deltas[i + 1] if i + 1 < len(deltas) else 0
+
+    self_time = Counter()
+    idle_us = 0
+    for node_id, us in per_node.items():
+        frame = nodes[node_id]['callFrame']
+        name = frame.get('functionName') or '(anonymous)'
+        if name in _IGNORED_FRAMES:
+            idle_us += us if name == '(idle)' else 0
+            continue
+        self_time[(name, _short_url(frame.get('url')), frame.get('lineNumber', -1) + 1)] += us
+
+    busy_us = sum(self_time.values())
+    return {
+        'duration_ms': round((profile.get('endTime', 0) - profile.get('startTime', 0)) / 1000, 2),
+        'busy_ms': round(busy_us / 1000, 2),
+        'idle_ms': round(idle_us / 1000, 2),
+        'top_self': _top(self_time, busy_us, top),
+    }
+
+
+def _trace_events(trace):
+    return trace.get('traceEvents', []) if isinstance(trace, dict) else trace
+
+
+def _renderer_main_threads(events):
+    return {(e['pid'], e['tid']) for e in events
+            if e.get('ph') == 'M' and e.get('name') == 'thread_name'
+            and e.get('args', {}).get('name') == 'CrRendererMain'}
+
+
+def _event_key(event):
+    data = event.get('args', {}).get('data') or {}
+    if event['name'] == 'FunctionCall' and data.get('functionName'):
+        return (data['functionName'], _short_url(data.get('url')), data.get('lineNumber', -1) + 1)
+    return (event['name'], '', 0)
+
+
+def summarize_trace(trace, top=DEFAULT_TOP, long_task_ms=LONG_TASK_MS):
+    """Long tasks e top self-time (eventos X aninhados) da main thread do renderer"""
+    events = _trace_events(trace)
+    threads = _renderer_main_threads(events)
+    complete = sorted(
+        (e for e in events if e.get('ph') == 'X' and 'dur' in e and (e['pid'], e['tid']) in threads),
+        key=lambda e: (e['pid'], e['tid'], e['ts'], -e['dur']),
+    )
+
+    self_time = Counter()
+    stack = []
+    for event in complete:
+        thread = (event['pid'], event['tid'])
+        while stack and (stack[-1][0] != thread or stack[-1][1]['ts'] + stack[-1][1]['dur'] <= event['ts']):
+            stack.pop()
+        if stack:
+            # Tempo do filho sai do self-time do pai
+            self_time[_event_key(stack[-1][1])] -= event['dur']
+        self_time[_event_key(event)] += event['dur']
+        stack.append((thread, event))
+
+    for key in [k for k in self_time if k[0] in _TASK_EVENTS]:
+        # Sobra de RunTask = trabalho sem evento próprio; não é uma função
+        del self_time[key]
+    long_tasks = [e['dur'] / 1000 for e in complete
+                  if e['name'] in _TASK_EVENTS and e['dur'] / 1000 >= long_task_ms]
+    busy_us = sum(max(us, 0) for us in self_time.values())
+    return {
+        'busy_ms': round(busy_us / 1000, 2),
+        'long_tasks': _long_task_summary(long_tasks),
+        'top_self': _top({k: v for k, v in self_time.items() if v > 0}, busy_us, top),
+    }
+
+
+def _long_task_summary(durations_ms):
+    return {
+        'count': len(durations_ms),
+        'total_ms': round(sum(durations_ms), 2),
+        'max_ms': round(max(durations_ms), 2) if durations_ms else 0,
+    }
+
+
+class FlowProfiler:
+    """Captura um perfil (cpu) ou trace (trace) por etapa de um fluxo em uma página"""
+
+    def __init__(self, page, output_dir, mode='cpu', label='flow', top=DEFAULT_TOP,
+                 sampling_interval_us=DEFAULT_SAMPLING_INTERVAL_US):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Modo de profiling inválido: {mode!r} (use {', '.join(PROFILE_MODES)})")
+        self.page = page
+        self.output_dir = output_dir
+        self.mode = mode
+        self.label = _slug(label)
+        self.top = top
+        self.sampling_interval_us = sampling_interval_us
+        self.steps = []
+        self._cdp = None
+        os.makedirs(output_dir, exist_ok=True)
+        if mode == 'cpu':
+            # Long tasks de todos os documentos que a página carregar
+            page.add_init_script(PERF_OBSERVER_SCRIPT)
+
+    def _path(self, step, extension):
+        name = f'{self.label}-{len(self.steps) + 1:02d}-{_slug(step)}{extension}'
+        return os.path.join(self.output_dir, name)
+
+    def _start_cpu(self):
+        if self._cdp is None:
+            self._cdp = self.page.context.new_cdp_session(self.page)
+            self._cdp.send('Profiler.enable')
+            self._cdp.send('Profiler.setSamplingInterval', {'interval': self.sampling_interval_us})
+        self._cdp.send('Profiler.start')
+
+    def _stop_cpu(self, name, started_epoch_ms):
+        profile = self._cdp.send('Profiler.stop')['profile']
+        path = self._path(name, '.cpuprofile')
+        with open(path, 'w') as f:
+            json.dump(profile, f)
+        summary = summarize_cpu_profile(profile, self.top)
+        try:
+            tasks = [t['duration'] for t in self.page.evaluate(_LONG_TASKS_JS) if t['start'] >= started_epoch_ms]
+        except Exception:
+            tasks = []  # Página fechada ou navegando no fim da etapa
+        summary['long_tasks'] = _long_task_summary(tasks)
+        return path, summary
+
+    def _stop_trace(self, name):
+        trace = self.page.context.browser.stop_tracing()
+        path = self._path(name, '.trace.json')
+        with open(path, 'wb') as f:
+            f.write(trace)
+        return path, summarize_trace(json.loads(trace), self.top)
+
+    @contextmanager
+    def step(self, name):
+        """Perfila o bloco; o resumo entra em self.steps mesmo se o bloco falhar"""
+        started_epoch_ms = time.time() * 1000
+        started = time.perf_counter()
+        if self.mode == 'cpu':
+            self._start_cpu()
+        else:
+            self.page.context.browser.start_tracing(page=self.page, categories=TRACE_CATEGORIES)
+        try:
+            yield self
+        finally:
+            wall_ms = round((time.perf_counter() - started) * 1000, 2)
+            if self.mode == 'cpu':
+                path, summary = self._stop_cpu(name, started_epoch_ms)
+            else:
+                path, summary = self._stop_trace(name)
+            self.steps.append(dict(summary, step=name, mode=self.mode, wall_ms=wall_ms, file=path))
+
+    def close(self):
+        if self._cdp is not None:
+            self._cdp.detach()
+            self._cdp = None
+
+
+def print_profile(steps, top=3, indent='   '):
+    """Uma linha por etapa e as funções com mais self-time"""
+    for step in steps:
+        tasks = step['long_tasks']
+        print(f"{indent}⏱️  {step['step']}: {step['wall_ms']:.0f}ms, CPU ocupada {step['busy_ms']:.0f}ms, "
+              f"{tasks['count']} long tasks ({tasks['total_ms']:.0f}ms, máx {tasks['max_ms']:.0f}ms)")
+        for fn in step['top_self'][:top]:
+            location = f" {fn['url']}:{fn['line']}" if fn['url'] else ''
+            print(f"{indent}   {fn['self_ms']:>8.1f}ms {fn['self_pct'] or 0:>5.1f}%  {fn['function']}{location}")
+        print(f"{indent}   → {step['file']}")
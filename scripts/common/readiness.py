@@ -0,0 +1,141 @@
+"""
+Esperas orientadas a eventos para scripts Playwright
+
+Substitui sleeps fixos por sinais concretos de prontidão: seletor
+presente, URL alcançada, requisições de rede concluídas ou DOM sem
+mutações. Toda espera tem um teto (timeout) e retorna False/None ao
+atingi-lo em vez de lançar exceção, deixando a decisão para o chamador.
+"""
+
+import time
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+# Instala (uma vez por documento) um MutationObserver e verifica se o DOM
+# está sem mutações há pelo menos `quietMs` milissegundos
+_DOM_QUIET_JS = """
+(quietMs) => {
+    if (!window.__myiaDomQuiet) {
+        window.__myiaDomQuiet = { last: performance.now() };
+        new MutationObserver(() => { window.__myiaDomQuiet.last = performance.now(); })
+            .observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    }
+    return performance.now() - window.__myiaDomQuiet.last >= quietMs;
+}
+"""
+
+
+def wait_for_any_selector(page, selectors, timeout=10000, state='visible'):
+    """Aguarda o primeiro seletor da lista; retorna o seletor encontrado ou None"""
+    try:
+        page.wait_for_selector(', '.join(selectors), state=state, timeout=timeout)
+    except PlaywrightTimeoutError:
+        return None
+    for selector in selectors:
+        if page.locator(selector).count() > 0:
+            return selector
+    return None
+
+
+def wait_for_url(page, url, timeout=10000):
+    """Aguarda a URL casar com glob/regex/predicado; retorna True se casou"""
+    try:
+        page.wait_for_url(url, timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+def wait_for_dom_quiet(page, quiet_ms=500, timeout=10000):
+    """Aguarda o DOM ficar `quiet_ms` sem mutações; retorna True se estabilizou"""
+    try:
+        page.wait_for_function(_DOM_QUIET_JS, arg=quiet_ms, timeout=timeout, polling=100)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+async def wait_for_dom_quiet_async(page, quiet_ms=500, timeout=10000):
+    """Versão para a API assíncrona do Playwright de wait_for_dom_quiet()"""
+    try:
+        await page.wait_for_function(_DOM_QUIET_JS, arg=quiet_ms, timeout=timeout, polling=100)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+class NetworkWatcher:
+    """
+    Acompanha requisições de uma página que casam com um filtro de URL
+
+    Deve ser criado antes da ação que dispara as requisições (navegação,
+    clique). wait_until_idle() retorna quando não há requisições pendentes
+    e nenhuma nova surgiu durante a janela de silêncio.
+    """
+
+    def __init__(self, page, url_filter):
+        self.page = page
+        self.url_filter = url_filter
+        self.pending = set()
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_finished)
+        page.on("requestfailed", self._on_failed)
+
+    def matches(self, request):
+        if callable(self.url_filter):
+            return self.url_filter(request.url)
+        return self.url_filter in request.url
+
+    def _on_request(self, request):
+        if self.matches(request):
+            self.pending.add(request)
+            self.started += 1
+
+    def _on_finished(self, request):
+        if request in self.pending:
+            self.pending.discard(request)
+            self.completed += 1
+
+    def _on_failed(self, request):
+        if request in self.pending:
+            self.pending.discard(request)
+            self.failed += 1
+
+    def _wait_event(self, event, timeout):
+        """Aguarda um evento de rede que case com o filtro; True se ocorreu"""
+        try:
+            self.page.wait_for_event(event, predicate=self.matches, timeout=timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    def wait_until_idle(self, quiet_ms=500, timeout=15000, min_completed=0):
+        """
+        Aguarda até que ao menos `min_completed` requisições tenham terminado,
+        nenhuma esteja pendente e nenhuma nova comece por `quiet_ms`.
+        Retorna True se a rede estabilizou antes do teto.
+        """
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            remaining = (deadline - time.monotonic()) * 1000
+            if remaining <= 0:
+                return False
+            if self.pending:
+                # Checagem periódica também cobre requisições que falham
+                self._wait_event("requestfinished", min(remaining, 250))
+                continue
+            if self.completed + self.failed < min_completed:
+                self._wait_event("request", min(remaining, 250))
+                continue
+            if not self._wait_event("request", min(remaining, quiet_ms)):
+                return remaining >= quiet_ms
+
+    def stop(self):
+        """Remove os listeners da página"""
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfinished", self._on_finished)
+        self.page.remove_listener("requestfailed", self._on_failed)
@@ -0,0 +1,151 @@
+"""
+Recursos carregados por uma página, por tipo e origem (rede ou cache)
+
+ResourceRecorder escuta os eventos Network.* de uma sessão CDP da página
+e registra cada requisição concluída:
+
+- type:          tipo do DevTools (Document, Script, Stylesheet, Fetch, Image...)
+- source:        network | disk_cache | memory_cache | service_worker | prefetch_cache
+- revalidated:   resposta 304 (cache validado no servidor, corpo não trafega)
+- bytes:         encodedDataLength, bytes recebidos da rede (cabeçalhos incluídos)
+- decoded_bytes: tamanho do corpo entregue à página
+- duration_ms:   requestWillBeSent → loadingFinished
+
+summarize_by_type() agrega por tipo e compare_by_type() contrapõe duas
+execuções (ex.: cache frio x cache quente).
+"""
+
+from collections import Counter
+
+from metrics import percentile
+
+
+class ResourceRecorder:
+    """Registra as requisições da página a partir do momento em que é criado"""
+
+    def __init__(self, page):
+        self.page = page
+        self.resources = []
+        self._pending = {}
+        self.cdp = page.context.new_cdp_session(page)
+        self.cdp.on('Network.requestWillBeSent', self._on_request)
+        self.cdp.on('Network.requestServedFromCache', self._on_memory_cache)
+        self.cdp.on('Network.responseReceived', self._on_response)
+        self.cdp.on('Network.dataReceived', self._on_data)
+        self.cdp.on('Network.loadingFinished', self._on_finished)
+        self.cdp.on('Network.loadingFailed', self._on_failed)
+        self.cdp.send('Network.enable')
+
+    def _on_request(self, event):
+        url = event['request']['url']
+        if url.startswith('data:'):
+            return
+        # Redirect reaproveita o requestId: o registro segue do início da cadeia
+        entry = self._pending.get(event['requestId']) or {'started': event['timestamp']}
+        entry.update(url=url, type=event.get('type', 'Other'), memory_cache=False, decoded_bytes=0)
+        self._pending[event['requestId']] = entry
+
+    def _on_memory_cache(self, event):
+        entry = self._pending.get(event['requestId'])
+        if entry is not None:
+            entry['memory_cache'] = True
+
+    def _on_response(self, event):
+        entry = self._pending.get(event['requestId'])
+        if entry is None:
+            return
+        response = event['response']
+        entry.update(type=event.get('type', entry['type']), status=response['status'],
+                     from_disk_cache=response.get('fromDiskCache', False),
+                     from_service_worker=response.get('fromServiceWorker', False),
+                     from_prefetch_cache=response.get('fromPrefetchCache', False))
+
+    def _on_data(self, event):
+        entry = self._pending.get(event['requestId'])
+        if entry is not None:
+            entry['decoded_bytes'] += event.get('dataLength', 0)
+
+    def _on_finished(self, event):
+        entry = self._pending.pop(event['requestId'], None)
+        if entry is not None:
+            self.resources.append(_finish(entry, event['timestamp'], event.get('encodedDataLength', 0)))
+
+    def _on_failed(self, event):
+        entry = self._pending.pop(event['requestId'], None)
+        if entry is not None:
+            resource = _finish(entry, event['timestamp'], 0)
+            resource['error'] = event.get('errorText') or 'failed'
+            self.resources.append(resource)
+
+    def close(self):
+        self.cdp.detach()
+
+
+def _source(entry):
+    if entry.get('memory_cache'):
+        return 'memory_cache'
+    if entry.get('from_service_worker'):
+        return 'service_worker'
+    if entry.get('from_prefetch_cache'):
+        return 'prefetch_cache'
+    if entry.get('from_disk_cache'):
+        return 'disk_cache'
+    return 'network'
+
+
+def _finish(entry, finished, encoded_bytes):
+    return {
+        'url': entry['url'],
+        'type': entry['type'],
+        'status': entry.get('status'),
+        'source': _source(entry),
+        'revalidated': entry.get('status') == 304,
+        'bytes': int(encoded_bytes),
+        'decoded_bytes': entry['decoded_bytes'],
+        'duration_ms': round((finished - entry['started']) * 1000, 2),
+    }
+
+
+def summarize_by_type(resources):
+    """{tipo: requisições, bytes da rede, bytes decodificados, tempo somado/p50, origens}"""
+    per_type = {}
+    for resource in resources:
+        per_type.setdefault(resource['type'], []).append(resource)
+    summary = {}
+    for kind, items in sorted(per_type.items()):
+        durations = [r['duration_ms'] for r in items]
+        sources = Counter(r['source'] for r in items)
+        summary[kind] = {
+            'requests': len(items),
+            'bytes': sum(r['bytes'] for r in items),
+            'decoded_bytes': sum(r['decoded_bytes'] for r in items),
+            'time_ms': round(sum(durations), 2),
+            'p50_ms': round(percentile(durations, 50), 2),
+            'from_cache': len(items) - sources['network'],
+            'revalidated': sum(1 for r in items if r['revalidated']),
+            'sources': dict(sources),
+        }
+    return summary
+
+
+def _saving(before, after):
+    saved = before - after
+    return {'cold': before, 'warm': after, 'saved': round(saved, 2),
+            'saved_pct': round(saved / before, 3) if before else None}
+
+
+def compare_by_type(cold, warm):
+    """Diferença por tipo entre dois resumos de summarize_by_type() (economia = frio - quente)"""
+    empty = {'requests': 0, 'bytes': 0, 'time_ms': 0, 'p50_ms': 0, 'from_cache': 0, 'revalidated': 0}
+    comparison = {}
+    for kind in sorted(set(cold) | set(warm)):
+        before, after = cold.get(kind, empty), warm.get(kind, empty)
+        comparison[kind] = {
+            'requests': {'cold': before['requests'], 'warm': after['requests']},
+            'bytes': _saving(before['bytes'], after['bytes']),
+            'time_ms': _saving(before['time_ms'], after['time_ms']),
+            'p50_ms': _saving(before['p50_ms'], after['p50_ms']),
+            'warm_from_cache': after['from_cache'],
+            'warm_revalidated': after['revalidated'],
+        }
+    return comparison
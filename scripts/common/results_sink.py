@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Saída incremental de resultados de teste (JSONL) e exportação JUnit XML
+
+Cada teste vira uma linha JSON gravada (e descarregada no disco) assim
+que termina, com status, duração, detalhes e artefatos anexados. Uma
+execução longa ou que quebre no meio mantém os resultados parciais, e
+nada além de um resumo curto por teste fica em memória.
+
+Formato do JSONL (uma execução por arquivo):
+    {"type": "run", "suite": ..., "started_at": ...}
+    {"type": "test", "name": ..., "status": "pass", "duration_s": 1.23, ...}
+    {"type": "summary", "total": ..., "pass": ..., "duration_s": ...}
+
+O JUnit XML é escrito no close(); para uma execução que não chegou ao
+fim, converta o JSONL parcial:
+    python results_sink.py /tmp/resultados.jsonl --junit /tmp/junit.xml
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+# Texto mantido por teste para o JUnit (mensagens de falha, saída)
+MAX_TEXT = 4000
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+def normalize_status(result):
+    """bool (test_login_validation) ou dict com 'status' (test_badge_system) → status"""
+    if isinstance(result, bool):
+        return 'pass' if result else 'fail'
+    if isinstance(result, dict) and result.get('status'):
+        return result['status']
+    return 'error'
+
+
+class ResultsSink:
+    """Grava resultados por teste em JSONL à medida que chegam; JUnit XML opcional no fechamento"""
+
+    def __init__(self, jsonl_path=None, junit_path=None, suite='tests', metadata=None):
+        self.jsonl_path = jsonl_path
+        self.junit_path = junit_path
+        self.suite = suite
+        self.cases = []
+        self.started = time.time()
+        self._file = None
+        if jsonl_path:
+            os.makedirs(os.path.dirname(os.path.abspath(jsonl_path)), exist_ok=True)
+            self._file = open(jsonl_path, 'w', encoding='utf-8')
+            self._write({'type': 'run', 'suite': suite, 'started_at': _now_iso(),
+                         'host': socket.gethostname(), 'metadata': metadata or {}})
+
+    def _write(self, entry):
+        if self._file is not None:
+            self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            self._file.flush()
+
+    def record(self, name, status, duration_s, details=None, artifacts=None, output=None, **extra):
+        """Grava um teste concluído; extra vai para o JSONL (diagnósticos, métricas)"""
+        entry = {
+            'type': 'test',
+            'suite': self.suite,
+            'name': name,
+            'status': status,
+            'duration_s': round(duration_s, 3),
+            'finished_at': _now_iso(),
+            'details': details,
+            'artifacts': artifacts or [],
+        }
+        if output:
+            entry['output'] = output
+        entry.update(extra)
+        self._write(entry)
+        self.cases.append({
+            'name': name,
+            'status': status,
+            'duration_s': entry['duration_s'],
+            'details': (details or '')[:MAX_TEXT],
+            'artifacts': entry['artifacts'],
+            'output': (output or '')[-MAX_TEXT:],
+        })
+        return entry
+
+    def summary(self):
+        counts = {}
+        for case in self.cases:
+            counts[case['status']] = counts.get(case['status'], 0) + 1
+        return dict(counts, total=len(self.cases), duration_s=round(time.time() - self.started, 3))
+
+    def close(self):
+        if self._file is not None:
+            self._write(dict(self.summary(), type='summary', finished_at=_now_iso()))
+            self._file.close()
+            self._file = None
+        if self.junit_path:
+            write_junit(self.cases, self.junit_path, self.suite)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_junit(cases, path, suite):
+    """JUnit XML: fail → <failure>, error → <error>, skip → <skipped>; warning conta como aprovado"""
+    testsuite = ET.Element('testsuite', {
+        'name': suite,
+        'tests': str(len(cases)),
+        'failures': str(sum(1 for c in cases if c['status'] == 'fail')),
+        'errors': str(sum(1 for c in cases if c['status'] == 'error')),
+        'skipped': str(sum(1 for c in cases if c['status'] == 'skip')),
+        'time': f"{sum(c['duration_s'] for c in cases):.3f}",
+        'timestamp': _now_iso(),
+    })
+    for case in cases:
+        testcase = ET.SubElement(testsuite, 'testcase', {
+            'classname': suite, 'name': case['name'], 'time': f"{case['duration_s']:.3f}",
+        })
+        properties = [('status', case['status'])] + [('artifact', a) for a in case.get('artifacts') or []]
+        props = ET.SubElement(testcase, 'properties')
+        for name, value in properties:
+            ET.SubElement(props, 'property', {'name': name, 'value': str(value)})
+        message = case.get('details') or case['status']
+        if case['status'] == 'fail':
+            ET.SubElement(testcase, 'failure', {'message': message[:200]}).text = message
+        elif case['status'] == 'error':
+            ET.SubElement(testcase, 'error', {'message': message[:200]}).text = message
+        elif case['status'] == 'skip':
+            ET.SubElement(testcase, 'skipped', {'message': message[:200]})
+        if case.get('output'):
+            ET.SubElement(testcase, 'system-out').text = case['output']
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    ET.ElementTree(testsuite).write(path, encoding='utf-8', xml_declaration=True)
+
+
+def read_jsonl(path):
+    """(suite, casos) de um JSONL, inclusive de uma execução interrompida"""
+    suite, cases = 'tests', []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Última linha cortada por uma queda no meio da escrita
+            if entry.get('type') == 'run':
+                suite = entry.get('suite', suite)
+            elif entry.get('type') == 'test':
+                cases.append({
+                    'name': entry['name'],
+                    'status': entry['status'],
+                    'duration_s': entry.get('duration_s', 0),
+                    'details': (entry.get('details') or '')[:MAX_TEXT],
+                    'artifacts': entry.get('artifacts') or [],
+                    'output': (entry.get('output') or '')[-MAX_TEXT:],
+                })
+    return suite, cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte resultados JSONL em JUnit XML")
+    parser.add_argument('jsonl')
+    parser.add_argument('--junit', required=True)
+    args = parser.parse_args()
+
+    suite, cases = read_jsonl(args.jsonl)
+    write_junit(cases, args.junit, suite)
+    print(f"📄 {len(cases)} testes de {suite} → {args.junit}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
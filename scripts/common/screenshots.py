@@ -0,0 +1,238 @@
+"""
+Armazenamento de screenshots endereçado por conteúdo, com diff visual
+
+Cada captura é identificada pelo sha256 do PNG original: capturas
+idênticas a uma já guardada não são regravadas. Os objetos ficam em
+<root>/objects/<sha[:2]>/<sha>.<ext>, comprimidos em WebP sem perdas
+(ou PNG quantizado) quando o Pillow está instalado; sem ele o PNG é
+guardado como veio e a comparação se limita ao hash.
+
+<root>/manifest.json aponta cada nome lógico ("04_dashboard_full") para o
+objeto da execução atual (start_run() o zera no início, mantendo os
+objetos); <root>/baseline.json é o manifesto de
+referência. compare() classifica cada captura contra o baseline pela
+fração de pixels diferentes (tolerância configurável) e pela distância
+do hash perceptual (dHash).
+"""
+
+import fcntl
+import hashlib
+import io
+import json
+import os
+from contextlib import contextmanager
+
+try:
+    from PIL import Image, ImageChops
+except ImportError:  # Pillow é opcional
+    Image = None
+
+# Diferença mínima por canal (0-255) para um pixel contar como alterado;
+# absorve ruído de antialiasing e da compressão
+PIXEL_THRESHOLD = 16
+DHASH_SIZE = 8
+
+
+def _dhash(image):
+    """Hash perceptual por diferença de gradiente (64 bits, em hex)"""
+    small = image.convert('L').resize((DHASH_SIZE + 1, DHASH_SIZE))
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(DHASH_SIZE):
+        for col in range(DHASH_SIZE):
+            left = pixels[row * (DHASH_SIZE + 1) + col]
+            right = pixels[row * (DHASH_SIZE + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f'{bits:016x}'
+
+
+def _hamming(hash_a, hash_b):
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+
+def _diff_ratio(image_a, image_b):
+    """Fração de pixels com alguma diferença de canal acima do limiar"""
+    diff = ImageChops.difference(image_a.convert('RGB'), image_b.convert('RGB')).convert('L')
+    changed = sum(diff.point(lambda v: 255 if v > PIXEL_THRESHOLD else 0).histogram()[255:])
+    return changed / (diff.width * diff.height)
+
+
+class ScreenshotStore:
+    """Screenshots deduplicados por hash, comprimidos e comparáveis com um baseline"""
+
+    def __init__(self, root, tolerance=0.01, compression='webp'):
+        self.root = root
+        # Fração máxima de pixels alterados aceita como "igual ao baseline"
+        self.tolerance = tolerance
+        # 'webp' (sem perdas), 'png' (quantizado) ou None (PNG original)
+        self.compression = compression if Image is not None else None
+        self.objects_dir = os.path.join(root, 'objects')
+        self.manifest_file = os.path.join(root, 'manifest.json')
+        self.baseline_file = os.path.join(root, 'baseline.json')
+        self.stats = {'captured': 0, 'stored': 0, 'deduplicated': 0, 'bytes_in': 0, 'bytes_stored': 0}
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        """Lock de arquivo: workers do parallel_runner compartilham o manifesto"""
+        with open(os.path.join(self.root, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read(self, path):
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write(self, path, data):
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+
+    def _compress(self, png_bytes):
+        """Retorna (bytes, extensão, metadados da imagem)"""
+        if Image is None:
+            return png_bytes, 'png', {}
+        image = Image.open(io.BytesIO(png_bytes))
+        meta = {'width': image.width, 'height': image.height, 'dhash': _dhash(image)}
+        if self.compression is None:
+            return png_bytes, 'png', meta
+        buffer = io.BytesIO()
+        if self.compression == 'webp':
+            image.save(buffer, 'WEBP', lossless=True, method=4)
+            return buffer.getvalue(), 'webp', meta
+        image.convert('RGB').quantize(colors=256).save(buffer, 'PNG', optimize=True)
+        return buffer.getvalue(), 'png', meta
+
+    def object_path(self, entry):
+        return os.path.join(self.root, entry['object'])
+
+    def _find_object(self, sha):
+        """Caminho relativo do objeto já guardado com este hash (qualquer extensão)"""
+        prefix_dir = os.path.join(self.objects_dir, sha[:2])
+        if os.path.isdir(prefix_dir):
+            for filename in os.listdir(prefix_dir):
+                if filename.startswith(sha):
+                    return os.path.join('objects', sha[:2], filename)
+        return None
+
+    def start_run(self):
+        """Zera o manifesto (objetos ficam): compare() passa a ver só as capturas desta execução"""
+        with self._locked():
+            self._write(self.manifest_file, {})
+
+    def save(self, name, png_bytes):
+        """Guarda a captura sob `name`; não regrava objetos já existentes"""
+        sha = hashlib.sha256(png_bytes).hexdigest()
+        self.stats['captured'] += 1
+        self.stats['bytes_in'] += len(png_bytes)
+
+        relative = self._find_object(sha)
+        if relative is not None:
+            self.stats['deduplicated'] += 1
+            meta = {}
+            if Image is not None:
+                image = self._load_image({'object': relative})
+                meta = {'width': image.width, 'height': image.height, 'dhash': _dhash(image)}
+            entry = dict(meta, sha256=sha, object=relative,
+                         bytes=os.path.getsize(os.path.join(self.root, relative)),
+                         deduplicated=True)
+        else:
+            data, extension, meta = self._compress(png_bytes)
+            relative = os.path.join('objects', sha[:2], f'{sha}.{extension}')
+            path = os.path.join(self.root, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+            self.stats['stored'] += 1
+            self.stats['bytes_stored'] += len(data)
+            entry = dict(meta, sha256=sha, object=relative, bytes=len(data), deduplicated=False)
+
+        with self._locked():
+            manifest = self._read(self.manifest_file)
+            manifest[name] = entry
+            self._write(self.manifest_file, manifest)
+        return entry
+
+    def capture(self, page, name, **screenshot_options):
+        """page.screenshot() direto para o store (API síncrona do Playwright)"""
+        return self.save(name, page.screenshot(**screenshot_options))
+
+    def _load_image(self, entry):
+        return Image.open(self.object_path(entry))
+
+    def compare(self, names=None):
+        """
+        Compara o manifesto atual com o baseline
+
+        Status por nome: identical (mesmo hash), match (diferença dentro
+        da tolerância), changed, new (sem baseline) ou missing.
+        """
+        with self._locked():
+            manifest = self._read(self.manifest_file)
+        baseline = self._read(self.baseline_file)
+        results = []
+        for name in sorted(names or set(manifest) | set(baseline)):
+            current, reference = manifest.get(name), baseline.get(name)
+            outcome = {'name': name}
+            if current is None:
+                outcome['status'] = 'missing'
+            elif reference is None:
+                outcome['status'] = 'new'
+            elif current['sha256'] == reference['sha256']:
+                outcome.update(status='identical', diff_ratio=0.0)
+            elif Image is None:
+                outcome['status'] = 'changed'  # só hash disponível
+            else:
+                image, base_image = self._load_image(current), self._load_image(reference)
+                if image.size != base_image.size:
+                    outcome.update(status='changed', reason=f'tamanho {base_image.size} → {image.size}')
+                else:
+                    ratio = _diff_ratio(image, base_image)
+                    outcome['diff_ratio'] = round(ratio, 5)
+                    outcome['status'] = 'match' if ratio <= self.tolerance else 'changed'
+                if current.get('dhash') and reference.get('dhash'):
+                    outcome['dhash_distance'] = _hamming(current['dhash'], reference['dhash'])
+            results.append(outcome)
+        return results
+
+    def update_baseline(self):
+        """Promove o manifesto atual a baseline"""
+        with self._locked():
+            manifest = self._read(self.manifest_file)
+            self._write(self.baseline_file, manifest)
+        return manifest
+
+    def prune(self):
+        """Remove objetos não referenciados pelo manifesto nem pelo baseline; retorna quantos"""
+        with self._locked():
+            referenced = {entry['object'] for manifest in (self._read(self.manifest_file),
+                                                           self._read(self.baseline_file))
+                          for entry in manifest.values()}
+            removed = 0
+            for prefix in os.listdir(self.objects_dir):
+                for filename in os.listdir(os.path.join(self.objects_dir, prefix)):
+                    relative = os.path.join('objects', prefix, filename)
+                    if relative not in referenced:
+                        os.remove(os.path.join(self.root, relative))
+                        removed += 1
+        return removed
+
+
+def print_comparison(comparisons):
+    """Imprime o resultado de ScreenshotStore.compare()"""
+    icons = {'identical': '✅', 'match': '✅', 'new': '🆕', 'changed': '❌', 'missing': '⚠️ '}
+    for c in comparisons:
+        detail = ''
+        if 'diff_ratio' in c:
+            detail += f" {c['diff_ratio']:.2%} pixels"
+        if 'dhash_distance' in c:
+            detail += f", dHash {c['dhash_distance']}"
+        if 'reason' in c:
+            detail += f" ({c['reason']})"
+        print(f"   {icons[c['status']]} {c['name']}: {c['status']}{detail}")
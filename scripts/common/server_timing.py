@@ -0,0 +1,183 @@
+"""
+Atribuição de latência cliente x servidor via X-Request-ID e Loki
+
+O backend carimba cada requisição com um UUID (requestId.ts, header
+X-Request-ID) e o httpLogger.ts grava, ao fim da resposta, uma linha
+JSON em logs/http.log com requestId e duration (ms no handler). O job
+myia-backend-http do Promtail leva essa linha inteira ao Loki.
+
+Dados os registros do ApiProfiler (que guardam o request_id do header),
+consulta o Loki em lotes e separa, por requisição:
+
+- client_ms:   início da requisição → responseEnd, visto pelo browser
+- server_ms:   duration do httpLogger (middlewares + controller)
+- overhead_ms: client_ms - server_ms (rede, fila, proxy do vite, download)
+- wire_ms:     ttfb - server_ms (parte do overhead antes do primeiro byte)
+
+Uma página lenta com client_ms baixo é custo do frontend; com server_ms
+dominante, do controller do endpoint; com overhead dominante, do caminho
+até o backend.
+"""
+
+import asyncio
+import json
+import time
+
+from async_http import AsyncHttpClient
+from metrics import summarize
+
+QUERY_RANGE_ENDPOINT = '/loki/api/v1/query_range'
+HTTP_LOG_SELECTOR = '{job="myia-backend-http"}'
+DEFAULT_BATCH_SIZE = 40
+DEFAULT_WAIT_S = 15
+POLL_INTERVAL_S = 1
+# O timestamp do winston ('YYYY-MM-DD HH:mm:ss', hora local) não é RFC3339;
+# o Promtail cai no horário de leitura, então a janela tem folga
+WINDOW_PAD_S = 120
+
+
+def _batches(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def batch_query(request_ids):
+    """Uma consulta LogQL para um lote de UUIDs (só filtro de linha; o JSON é lido aqui)"""
+    alternatives = '|'.join(request_ids)
+    return f'{HTTP_LOG_SELECTOR} |~ "{alternatives}"'
+
+
+def parse_http_line(line):
+    """Linha do httpLogger → campos usados na atribuição (None se não for JSON do httpLogger)"""
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(entry, dict) or not entry.get('requestId') or entry.get('duration') is None:
+        return None
+    return {
+        'request_id': entry['requestId'],
+        'server_ms': float(entry['duration']),
+        'status': entry.get('statusCode'),
+        'method': entry.get('method'),
+        'url': entry.get('url'),
+    }
+
+
+async def _query_batch(loki, request_ids, start_ns, end_ns):
+    response = await loki.get(QUERY_RANGE_ENDPOINT, params={
+        'query': batch_query(request_ids), 'start': str(start_ns), 'end': str(end_ns),
+        'limit': str(len(request_ids) * 2), 'direction': 'forward',
+    })
+    if response.status != 200:
+        raise RuntimeError(f"Loki: HTTP {response.status} {response.body[:200]!r}")
+    found = {}
+    for stream in (response.json() or {}).get('data', {}).get('result', []):
+        for _, line in stream.get('values', []):
+            parsed = parse_http_line(line)
+            if parsed and parsed['request_id'] in request_ids:
+                found[parsed['request_id']] = parsed
+    return found
+
+
+async def fetch_server_timings(loki_url, request_ids, start_s, end_s, batch_size=DEFAULT_BATCH_SIZE,
+                               wait_s=DEFAULT_WAIT_S, concurrency=4):
+    """{request_id: linha do httpLogger}; reconsulta os que faltam até wait_s (atraso de ingestão)"""
+    pending = sorted(set(request_ids))
+    found = {}
+    deadline = time.time() + wait_s
+    start_ns = int((start_s - WINDOW_PAD_S) * 1e9)
+    async with AsyncHttpClient(loki_url, max_connections=concurrency, timeout=15) as loki:
+        while pending:
+            end_ns = int((max(end_s, time.time()) + WINDOW_PAD_S) * 1e9)
+            batches = await asyncio.gather(*[_query_batch(loki, batch, start_ns, end_ns)
+                                             for batch in _batches(pending, batch_size)])
+            for batch in batches:
+                found.update(batch)
+            pending = [rid for rid in pending if rid not in found]
+            if not pending or time.time() >= deadline:
+                break
+            await asyncio.sleep(POLL_INTERVAL_S)
+    return found
+
+
+def attribute(records, timings):
+    """Linha por requisição com tempo do cliente, do servidor e overhead"""
+    rows = []
+    for record in records:
+        server = timings.get(record.get('request_id'))
+        client_ms = record['timing']['total']
+        if server is None or client_ms is None:
+            continue
+        ttfb = record['timing']['ttfb']
+        overhead_ms = round(client_ms - server['server_ms'], 2)
+        rows.append({
+            'session': record['session'],
+            'view': record['view'],
+            'endpoint': record['endpoint'],
+            'url': record['url'],
+            'request_id': record['request_id'],
+            'status': record['status'],
+            'client_ms': client_ms,
+            'server_ms': server['server_ms'],
+            'overhead_ms': overhead_ms,
+            'wire_ms': round(ttfb - server['server_ms'], 2) if ttfb is not None else None,
+            'bound': 'server' if server['server_ms'] >= overhead_ms else 'network',
+        })
+    return rows
+
+
+def build_attribution_report(records, timings, slowest=10):
+    """Resumo por endpoint e as requisições mais lentas com a parte dominante"""
+    rows = attribute(records, timings)
+    with_id = [r for r in records if r.get('request_id')]
+    per_endpoint = {}
+    for row in rows:
+        per_endpoint.setdefault(row['endpoint'], []).append(row)
+
+    endpoints = {}
+    for endpoint, items in sorted(per_endpoint.items()):
+        client_total = sum(r['client_ms'] for r in items)
+        endpoints[endpoint] = {
+            'count': len(items),
+            'client_ms': summarize([r['client_ms'] for r in items]),
+            'server_ms': summarize([r['server_ms'] for r in items]),
+            'overhead_ms': summarize([r['overhead_ms'] for r in items]),
+            'server_share': round(sum(r['server_ms'] for r in items) / client_total, 3) if client_total else None,
+        }
+    return {
+        'api_requests': len(records),
+        'with_request_id': len(with_id),
+        'matched': len(rows),
+        'unmatched': [r['request_id'] for r in with_id if r['request_id'] not in timings],
+        'endpoints': endpoints,
+        'slowest': sorted(rows, key=lambda r: -r['client_ms'])[:slowest],
+        'requests': rows,
+    }
+
+
+def correlate(records, loki_url, **kwargs):
+    """Versão síncrona: consulta o Loki pelos request_ids dos registros e monta o relatório"""
+    with_id = [r for r in records if r.get('request_id')]
+    timings = {}
+    if with_id:
+        started = [r['started_at'] for r in with_id]
+        timings = asyncio.run(fetch_server_timings(
+            loki_url, [r['request_id'] for r in with_id], min(started), max(started), **kwargs))
+    return build_attribution_report(records, timings)
+
+
+def print_attribution(report, top=5):
+    print(f"\n🧭 Cliente x servidor: {report['matched']}/{report['with_request_id']} requisições "
+          f"com X-Request-ID encontradas no Loki")
+    for endpoint, stats in report['endpoints'].items():
+        share = f" ({stats['server_share']:.0%} no servidor)" if stats['server_share'] is not None else ''
+        print(f"   {endpoint}: n={stats['count']} cliente p50={stats['client_ms']['p50']}ms "
+              f"servidor p50={stats['server_ms']['p50']}ms overhead p50={stats['overhead_ms']['p50']}ms{share}")
+    for row in report['slowest'][:top]:
+        where = 'controller' if row['bound'] == 'server' else 'rede/fila'
+        print(f"   🐢 {row['client_ms']:.0f}ms {row['endpoint']} ({row['session']}/{row['view']}): "
+              f"servidor {row['server_ms']:.0f}ms, overhead {row['overhead_ms']:.0f}ms → {where} "
+              f"[{row['request_id']}]")
+    if report['unmatched']:
+        print(f"   ⚠️  {len(report['unmatched'])} request IDs sem linha no Loki (ingestão atrasada ou Promtail parado)")
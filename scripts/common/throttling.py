@@ -0,0 +1,83 @@
+"""
+Emulação de rede e CPU lenta via CDP (só Chromium)
+
+Um perfil nomeado combina condições de rede e desaceleração de CPU:
+
+    {"name": "fast-3g-4x-cpu", "latency_ms": 562.5, "download_kbps": 1440,
+     "upload_kbps": 675, "cpu_rate": 4}
+
+- latency_ms:     RTT adicional por requisição
+- download_kbps / upload_kbps: banda em kbit/s (ausente = sem limite)
+- offline:        true corta a rede (requisições falham com net::ERR_INTERNET_DISCONNECTED)
+- cpu_rate:       fator de desaceleração da main thread (1 = sem throttling)
+
+A emulação vale para a página da sessão CDP (e seus workers). Rotas do
+Playwright (mock backend, replay de HAR) respondem antes da camada de
+rede: nesses casos só o throttling de CPU tem efeito.
+"""
+
+import json
+
+NETWORK_FIELDS = ('latency_ms', 'download_kbps', 'upload_kbps', 'offline')
+
+
+def load_profiles(path):
+    """Perfis do arquivo JSON ({"profiles": [...]}) na ordem em que aparecem"""
+    with open(path) as f:
+        return json.load(f)['profiles']
+
+
+def select_profiles(profiles, names=None):
+    """Filtra por nome (na ordem pedida); sem nomes, os perfis sem "default": false"""
+    if not names:
+        return [p for p in profiles if p.get('default', True)]
+    by_name = {p['name']: p for p in profiles}
+    missing = [name for name in names if name not in by_name]
+    if missing:
+        raise ValueError(f"Perfis desconhecidos: {', '.join(missing)} (disponíveis: {', '.join(by_name)})")
+    return [by_name[name] for name in names]
+
+
+def _bytes_per_second(kbps):
+    return kbps * 1000 / 8 if kbps else -1
+
+
+def network_conditions(profile):
+    """Parâmetros de Network.emulateNetworkConditions (banda em bytes/s, -1 = sem limite)"""
+    return {
+        'offline': bool(profile.get('offline', False)),
+        'latency': profile.get('latency_ms', 0),
+        'downloadThroughput': _bytes_per_second(profile.get('download_kbps')),
+        'uploadThroughput': _bytes_per_second(profile.get('upload_kbps')),
+    }
+
+
+def describe(profile):
+    """Resumo curto: 'RTT 562ms, ↓1.4Mbps ↑675kbps, CPU 4x'"""
+    parts = []
+    if profile.get('offline'):
+        parts.append('offline')
+    elif any(profile.get(field) for field in NETWORK_FIELDS):
+        parts.append(f"RTT {profile.get('latency_ms', 0):.0f}ms")
+        rates = [f"{arrow}{_rate(profile[key])}" for arrow, key in (('↓', 'download_kbps'), ('↑', 'upload_kbps'))
+                 if profile.get(key)]
+        if rates:
+            parts.append(' '.join(rates))
+    if profile.get('cpu_rate', 1) > 1:
+        parts.append(f"CPU {profile['cpu_rate']:g}x")
+    return ', '.join(parts) or 'sem throttling'
+
+
+def _rate(kbps):
+    return f'{kbps / 1000:g}Mbps' if kbps >= 1000 else f'{kbps:g}kbps'
+
+
+def apply_throttling(page, profile):
+    """Abre uma sessão CDP na página e aplica o perfil; retorna a sessão (mantê-la viva)"""
+    cdp = page.context.new_cdp_session(page)
+    if any(profile.get(field) for field in NETWORK_FIELDS):
+        cdp.send('Network.enable')
+        cdp.send('Network.emulateNetworkConditions', network_conditions(profile))
+    if profile.get('cpu_rate', 1) > 1:
+        cdp.send('Emulation.setCPUThrottlingRate', {'rate': profile['cpu_rate']})
+    return cdp
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carregamento de páginas (headless) com baseline versionado
+
+Reutiliza os fluxos de test_badge_system.py e test_login_validation.py:
+  - home:   carregamento autenticado do frontend
+  - login:  login no frontend-admin até o redirecionamento para /certifications
+  - models: Settings → aba Models com badges carregados
+
+Para cada fluxo coleta K repetições de Navigation Timing, LCP, long tasks,
+CLS e heap JS (CDP). Os resultados podem ser gravados como baseline e
+comparados com ele via teste U de Mann-Whitney + variação mínima da mediana.
+
+Com --replay DIR as chamadas /api/ vêm de HARs gravados (test_badge_system.py
+--record DIR), isolando o custo de renderização da latência do backend.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from browser_pool import BrowserSessionPool
+from config import FRONTEND_ADMIN_URL, FRONTEND_URL, TEST_EMAIL, TEST_PASSWORD
+from metrics import mann_whitney_min_p, mann_whitney_u, percentile
+from page_metrics import collect_page_metrics, install_perf_observers, open_cdp
+from readiness import wait_for_dom_quiet, wait_for_url
+from test_badge_system import POOL_OPTIONS, VIEWPORT, BadgePage
+
+BASELINE_SCHEMA_VERSION = 1
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'page_load_baseline.json')
+RESULTS_FILE = '/tmp/page_load_benchmark.json'
+
+# Métricas em que valores maiores indicam regressão
+LOWER_IS_BETTER = ['flow_ms', 'ttfb', 'dom_content_loaded', 'load', 'lcp',
+                   'long_task_ms', 'cls', 'js_heap_mb']
+
+QUIET_MS = 300
+
+
+def _ready_ms(started):
+    """Tempo até a última mutação do DOM (desconta a janela de silêncio)"""
+    return round((time.perf_counter() - started) * 1000 - QUIET_MS, 2)
+
+
+def flow_home(pool):
+    with pool.session(authenticated=True, viewport=VIEWPORT) as context:
+        install_perf_observers(context)
+        page = context.new_page()
+        cdp = open_cdp(page)
+        started = time.perf_counter()
+        page.goto(FRONTEND_URL, wait_until='load')
+        wait_for_dom_quiet(page, quiet_ms=QUIET_MS, timeout=15000)
+        flow_ms = _ready_ms(started)
+        return dict(collect_page_metrics(page, cdp), flow_ms=flow_ms)
+
+
+def flow_login(pool):
+    with pool.session(viewport=VIEWPORT) as context:
+        install_perf_observers(context)
+        page = context.new_page()
+        cdp = open_cdp(page)
+        page.goto(f'{FRONTEND_ADMIN_URL}/login')
+        page.wait_for_selector('input[type="email"]', timeout=10000)
+        page.fill('input[type="email"]', TEST_EMAIL)
+        page.fill('input[type="password"]', TEST_PASSWORD)
+        started = time.perf_counter()
+        page.click('button[type="submit"]')
+        if not wait_for_url(page, '**/certifications', timeout=15000):
+            raise RuntimeError("Login não redirecionou para /certifications")
+        flow_ms = round((time.perf_counter() - started) * 1000, 2)
+        wait_for_dom_quiet(page, quiet_ms=QUIET_MS, timeout=10000)
+        return dict(collect_page_metrics(page, cdp), flow_ms=flow_ms)
+
+
+def flow_models(pool):
+    with pool.session(authenticated=True, viewport=VIEWPORT) as context:
+        install_perf_observers(context)
+        badge_page = BadgePage(context, 'benchmark')
+        cdp = open_cdp(badge_page.page)
+        started = time.perf_counter()
+        badge_page.open_models()
+        flow_ms = _ready_ms(started)
+        return dict(collect_page_metrics(badge_page.page, cdp), flow_ms=flow_ms)
+
+
+FLOWS = {
+    'home': flow_home,
+    'login': flow_login,
+    'models': flow_models,
+}
+
+
+def run_benchmark(flow_names, repetitions, pool_options=None):
+    """Executa cada fluxo K vezes (sequencial, contexts novos) e agrupa as amostras"""
+    samples = {name: {} for name in flow_names}
+    with BrowserSessionPool(**dict(POOL_OPTIONS, **(pool_options or {}))) as pool:
+        for name in flow_names:
+            print(f"⏱️  {name}: {repetitions} repetições")
+            for i in range(repetitions):
+                try:
+                    metrics = FLOWS[name](pool)
+                except Exception as e:
+                    print(f"   ✗ repetição {i + 1}: {str(e)}")
+                    continue
+                for metric, value in metrics.items():
+                    if value is not None:
+                        samples[name].setdefault(metric, []).append(value)
+                print(f"   → repetição {i + 1}: {metrics.get('flow_ms')}ms")
+    return samples
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def build_document(samples, repetitions):
+    return {
+        'schema_version': BASELINE_SCHEMA_VERSION,
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'repetitions': repetitions,
+        'flows': samples,
+    }
+
+
+def compare(baseline, current, alpha, min_change):
+    """
+    Lista de comparações por fluxo/métrica; regressão = significativa e acima da variação mínima
+
+    underpowered: com tão poucas repetições nem a separação total chega a p < alpha
+    """
+    comparisons = []
+    for flow, metrics in current['flows'].items():
+        base_metrics = baseline['flows'].get(flow, {})
+        for metric in LOWER_IS_BETTER:
+            base, cur = base_metrics.get(metric, []), metrics.get(metric, [])
+            if not base or not cur:
+                continue
+            base_median, cur_median = percentile(base, 50), percentile(cur, 50)
+            change = (cur_median / base_median - 1) if base_median else 0.0
+            p_value = mann_whitney_u(base, cur)
+            min_p = mann_whitney_min_p(len(base), len(cur))
+            comparisons.append({
+                'flow': flow,
+                'metric': metric,
+                'baseline_median': round(base_median, 2),
+                'current_median': round(cur_median, 2),
+                'change': round(change, 3),
+                'p_value': round(p_value, 4),
+                'regression': p_value < alpha and change > min_change,
+                'underpowered': min_p >= alpha,
+                'samples': [len(base), len(cur)],
+            })
+    return comparisons
+
+
+def print_comparisons(comparisons):
+    print("\n" + "=" * 60)
+    print("📊 COMPARAÇÃO COM BASELINE")
+    print("=" * 60)
+    for c in comparisons:
+        icon = "❌" if c['regression'] else ("⊘" if c['underpowered'] else "✅")
+        print(f"{icon} {c['flow']}.{c['metric']}: {c['baseline_median']} → {c['current_median']} "
+              f"({c['change']:+.1%}, p={c['p_value']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carregamento de páginas")
+    parser.add_argument('--flows', default=','.join(FLOWS), help="Fluxos separados por vírgula")
+    parser.add_argument('--repetitions', '-k', type=int, default=5)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Arquivo JSON de baseline")
+    parser.add_argument('--save-baseline', action='store_true', help="Grava os resultados como novo baseline")
+    parser.add_argument('--alpha', type=float, default=0.05, help="Nível de significância")
+    parser.add_argument('--min-change', type=float, default=0.10,
+                        help="Variação mínima da mediana para acusar regressão (0.10 = 10%%)")
+    parser.add_argument('--replay', metavar='DIR', help="Responde /api/ com HARs gravados")
+    parser.add_argument('--replay-latency-ms', type=int, default=0,
+                        help="Latência artificial por requisição no replay")
+    args = parser.parse_args()
+
+    flow_names = [name.strip() for name in args.flows.split(',') if name.strip()]
+    unknown = [name for name in flow_names if name not in FLOWS]
+    if unknown:
+        parser.error(f"Fluxos desconhecidos: {', '.join(unknown)}")
+
+    pool_options = {'har_replay_dir': args.replay, 'replay_latency_ms': args.replay_latency_ms}
+    current = build_document(run_benchmark(flow_names, args.repetitions, pool_options), args.repetitions)
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"\n📄 Resultados salvos em: {RESULTS_FILE}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"📌 Baseline gravado em: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️  Baseline não encontrado ({args.baseline}); use --save-baseline")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('schema_version') != BASELINE_SCHEMA_VERSION:
+        print(f"⚠️  Baseline com schema {baseline.get('schema_version')} incompatível; regrave com --save-baseline")
+        return 1
+
+    comparisons = compare(baseline, current, args.alpha, args.min_change)
+    print_comparisons(comparisons)
+    underpowered = [c for c in comparisons if c['underpowered']]
+    if underpowered:
+        sizes = sorted({tuple(c['samples']) for c in underpowered})
+        print(f"\n⚠️  {len(underpowered)} comparação(ões) sem poder para acusar regressão com alpha={args.alpha} "
+              f"(baseline x atual: {', '.join(f'{a}x{b}' for a, b in sizes)}); use -k 4 ou mais nos dois lados")
+    regressions = [c for c in comparisons if c['regression']]
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} regressão(ões) significativa(s)")
+        return 1
+    print("\n🎉 Nenhuma regressão significativa")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
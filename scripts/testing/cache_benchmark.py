@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Benchmark de cache frio x quente com perfis persistentes do Chromium
+
+Os outros scripts partem sempre de um context limpo: só medem o primeiro
+acesso. Aqui cada fluxo roda duas vezes sobre o mesmo diretório de perfil:
+
+  1. frio:   diretório vazio (sem cache HTTP, sem service worker)
+  2. quente: o mesmo diretório reaberto, com o cache HTTP e os service
+             workers deixados pela execução anterior
+
+Fluxos (os mesmos de benchmark_page_load.py):
+  - home:   frontend (localhost:3000) autenticado
+  - login:  frontend-admin (localhost:3003) /login → /certifications
+  - models: Settings → aba Models com badges carregados
+
+Por execução, cada requisição é registrada via CDP (resource_usage.py) e
+agrupada por tipo de recurso: bytes da rede, tempo, e quantas vieram do
+cache (disco, memória, service worker) ou foram revalidadas (304). A
+diferença frio - quente por tipo mostra quanto os cabeçalhos de cache e a
+divisão do bundle economizam de fato.
+
+Sem --mock/--replay: rotas do Playwright desativam o cache HTTP do context.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from browser_pool import BrowserSessionPool
+from config import FRONTEND_ADMIN_URL, FRONTEND_URL, TEST_EMAIL, TEST_PASSWORD
+from metrics import percentile
+from readiness import wait_for_dom_quiet, wait_for_url
+from resource_usage import ResourceRecorder, compare_by_type, summarize_by_type
+from test_badge_system import POOL_OPTIONS, VIEWPORT, BadgePage
+
+RESULTS_FILE = '/tmp/cache_benchmark.json'
+PHASES = ('cold', 'warm')
+QUIET_MS = 300
+
+# Campos de summarize_by_type() agregados pela mediana entre repetições
+TYPE_FIELDS = ('requests', 'bytes', 'decoded_bytes', 'time_ms', 'p50_ms', 'from_cache', 'revalidated')
+
+
+def _ready_ms(started):
+    """Tempo até a última mutação do DOM (desconta a janela de silêncio)"""
+    return round((time.perf_counter() - started) * 1000 - QUIET_MS, 2)
+
+
+def flow_home(context):
+    page = context.new_page()
+    recorder = ResourceRecorder(page)
+    started = time.perf_counter()
+    page.goto(FRONTEND_URL, wait_until='load')
+    wait_for_dom_quiet(page, quiet_ms=QUIET_MS, timeout=15000)
+    return recorder, _ready_ms(started)
+
+
+def flow_login(context):
+    page = context.new_page()
+    recorder = ResourceRecorder(page)
+    started = time.perf_counter()
+    page.goto(f'{FRONTEND_ADMIN_URL}/login')
+    page.wait_for_selector('input[type="email"]', timeout=10000)
+    page.fill('input[type="email"]', TEST_EMAIL)
+    page.fill('input[type="password"]', TEST_PASSWORD)
+    page.click('button[type="submit"]')
+    if not wait_for_url(page, '**/certifications', timeout=15000):
+        raise RuntimeError("Login não redirecionou para /certifications")
+    wait_for_dom_quiet(page, quiet_ms=QUIET_MS, timeout=10000)
+    flow_ms = _ready_ms(started)
+    # O token ficaria no perfil e a execução quente pularia o formulário; o cache HTTP fica
+    page.evaluate('() => { localStorage.clear(); sessionStorage.clear(); }')
+    return recorder, flow_ms
+
+
+def flow_models(context):
+    badge_page = BadgePage(context, 'cache-benchmark')
+    recorder = ResourceRecorder(badge_page.page)
+    started = time.perf_counter()
+    badge_page.open_models()
+    return recorder, _ready_ms(started)
+
+
+# nome: (função, sessão autenticada)
+FLOWS = {
+    'home': (flow_home, True),
+    'login': (flow_login, False),
+    'models': (flow_models, True),
+}
+
+
+def run_pair(pool, name, user_data_dir):
+    """Execução fria e quente do fluxo sobre o mesmo diretório de perfil"""
+    flow, authenticated = FLOWS[name]
+    runs = {}
+    for phase in PHASES:
+        # Fechar o context grava o cache em disco antes da execução quente
+        with pool.persistent_session(user_data_dir, authenticated=authenticated, viewport=VIEWPORT) as context:
+            recorder, flow_ms = flow(context)
+            resources = recorder.resources
+        runs[phase] = {
+            'flow_ms': flow_ms,
+            'requests': len(resources),
+            'bytes': sum(r['bytes'] for r in resources),
+            'failed': sum(1 for r in resources if r.get('error')),
+            'by_type': summarize_by_type(resources),
+        }
+    return runs
+
+
+def _median(values):
+    return round(percentile(values, 50), 2) if values else 0
+
+
+def aggregate(pairs):
+    """Mediana entre repetições do fluxo, do total e de cada campo por tipo, por fase"""
+    result = {}
+    for phase in PHASES:
+        runs = [pair[phase] for pair in pairs]
+        kinds = sorted({kind for run in runs for kind in run['by_type']})
+        result[phase] = {
+            'flow_ms': _median([run['flow_ms'] for run in runs]),
+            'requests': _median([run['requests'] for run in runs]),
+            'bytes': _median([run['bytes'] for run in runs]),
+            'by_type': {
+                kind: {field: _median([run['by_type'].get(kind, {}).get(field, 0) for run in runs])
+                       for field in TYPE_FIELDS}
+                for kind in kinds
+            },
+        }
+    return result
+
+
+def _kb(value):
+    return f'{value / 1024:.1f}KB'
+
+
+def _pct(value):
+    return f'{value:.0%}' if value is not None else '—'
+
+
+def print_flow(name, summary):
+    cold, warm = summary['cold'], summary['warm']
+    by_type = summary['comparison']
+    saved_ms = cold['flow_ms'] - warm['flow_ms']
+    saved_bytes = cold['bytes'] - warm['bytes']
+    print(f"\n📦 {name}: {cold['flow_ms']:.0f}ms → {warm['flow_ms']:.0f}ms ({-saved_ms:+.0f}ms), "
+          f"{_kb(cold['bytes'])} → {_kb(warm['bytes'])} da rede "
+          f"({_pct(saved_bytes / cold['bytes'] if cold['bytes'] else None)} a menos)")
+    for kind, diff in by_type.items():
+        requests = diff['requests']
+        cached = f", {diff['warm_from_cache']:.0f} do cache" if diff['warm_from_cache'] else ''
+        revalidated = f", {diff['warm_revalidated']:.0f} revalidadas (304)" if diff['warm_revalidated'] else ''
+        print(f"   {kind:<12} {requests['cold']:>4.0f} → {requests['warm']:<4.0f} req  "
+              f"{_kb(diff['bytes']['cold']):>9} → {_kb(diff['bytes']['warm']):<9} ({_pct(diff['bytes']['saved_pct'])})  "
+              f"tempo {diff['time_ms']['cold']:.0f} → {diff['time_ms']['warm']:.0f}ms "
+              f"(p50 {diff['p50_ms']['cold']:.0f} → {diff['p50_ms']['warm']:.0f}ms){cached}{revalidated}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de cache frio x quente (perfis persistentes)")
+    parser.add_argument('--flows', default=','.join(FLOWS), help="Fluxos separados por vírgula")
+    parser.add_argument('--repetitions', '-k', type=int, default=3, help="Pares frio/quente por fluxo")
+    parser.add_argument('--profile-dir', help="Onde criar os perfis (padrão: diretório temporário)")
+    parser.add_argument('--keep-profiles', action='store_true', help="Não apaga os perfis ao final")
+    args = parser.parse_args()
+
+    flow_names = [name.strip() for name in args.flows.split(',') if name.strip()]
+    unknown = [name for name in flow_names if name not in FLOWS]
+    if unknown:
+        parser.error(f"Fluxos desconhecidos: {', '.join(unknown)}")
+
+    base_dir = tempfile.mkdtemp(prefix='cache-benchmark-', dir=args.profile_dir)
+    print(f"🗄️  Cache frio x quente: {', '.join(flow_names)}, {args.repetitions} pares por fluxo")
+    print(f"   Perfis em {base_dir}")
+
+    report = {
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'repetitions': args.repetitions,
+        'flows': {},
+    }
+    failed = []
+    try:
+        with BrowserSessionPool(**POOL_OPTIONS) as pool:
+            for name in flow_names:
+                print(f"\n⏱️  {name}")
+                pairs = []
+                for i in range(args.repetitions):
+                    # Diretório novo por par: a execução fria parte de um perfil vazio
+                    user_data_dir = os.path.join(base_dir, f'{name}-{i + 1}')
+                    try:
+                        pair = run_pair(pool, name, user_data_dir)
+                    except Exception as e:
+                        print(f"   ✗ par {i + 1}: {str(e).splitlines()[0]}")
+                        continue
+                    pairs.append(pair)
+                    print(f"   → par {i + 1}: frio {pair['cold']['flow_ms']:.0f}ms/{_kb(pair['cold']['bytes'])}, "
+                          f"quente {pair['warm']['flow_ms']:.0f}ms/{_kb(pair['warm']['bytes'])}")
+                if not pairs:
+                    failed.append(name)
+                    continue
+                summary = aggregate(pairs)
+                summary['comparison'] = compare_by_type(summary['cold']['by_type'], summary['warm']['by_type'])
+                summary['pairs'] = pairs
+                report['flows'][name] = summary
+    finally:
+        if not args.keep_profiles:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+    print("\n" + "=" * 60)
+    print("📊 CACHE FRIO → QUENTE (mediana; bytes recebidos da rede)")
+    print("=" * 60)
+    for name, summary in report['flows'].items():
+        print_flow(name, summary)
+
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Resultados salvos em: {RESULTS_FILE}")
+    if failed:
+        print(f"❌ Fluxos sem nenhum par concluído: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
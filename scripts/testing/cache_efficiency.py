@@ -0,0 +1,78 @@
+"""
+Eficácia do cache de certificações do frontend
+
+A partir dos registros do ApiProfiler (com a visão em que cada requisição
+nasceu) e do número de consumidores de badge renderizados por visão,
+calcula requisições únicas x duplicadas por visão e entre navegações,
+a taxa de acerto do cache e as viagens redundantes ao backend.
+
+Um reload inicia uma nova "época" de cache: buscar de novo após o reload
+é esperado; buscar a mesma chave duas vezes dentro de uma época não é.
+"""
+
+CERTIFICATION_ENDPOINT = '/api/certification'
+
+
+def analyze_cache(records, views, endpoint=CERTIFICATION_ENDPOINT):
+    """
+    records: registros do ApiProfiler
+    views: lista ordenada de dicts {'name', 'resets_cache', 'lookups'}
+           onde lookups é o número de badges/cards que consultam o cache
+    """
+    relevant = [r for r in records if endpoint in r['url']]
+
+    per_view = []
+    epoch_keys = set()
+    total_lookups = 0
+    redundant = 0
+
+    for view in views:
+        if view.get('resets_cache'):
+            epoch_keys = set()
+
+        requests = [r for r in relevant if r['view'] == view['name']]
+        keys = [r['key'] for r in requests]
+        unique = set(keys)
+        in_view_duplicates = len(keys) - len(unique)
+        cross_view_repeats = len(unique & epoch_keys)
+        epoch_keys |= unique
+
+        redundant += in_view_duplicates + cross_view_repeats
+        total_lookups += view.get('lookups', 0)
+
+        per_view.append({
+            'view': view['name'],
+            'resets_cache': bool(view.get('resets_cache')),
+            'lookups': view.get('lookups', 0),
+            'requests': len(keys),
+            'unique': len(unique),
+            'duplicates_in_view': in_view_duplicates,
+            'repeated_from_earlier_view': cross_view_repeats,
+        })
+
+    fetches = sum(v['requests'] for v in per_view)
+    hit_ratio = None
+    if total_lookups:
+        hit_ratio = round(max(0.0, 1 - fetches / total_lookups), 3)
+
+    return {
+        'views': per_view,
+        'lookups': total_lookups,
+        'requests': fetches,
+        'unique_requests': fetches - redundant,
+        'redundant_requests': redundant,
+        'redundant_ratio': round(redundant / fetches, 3) if fetches else 0.0,
+        'hit_ratio': hit_ratio,
+    }
+
+
+def evaluate(analysis, max_redundant_ratio):
+    """Retorna (status, detalhes) conforme o limite de redundância configurado"""
+    summary = (f"{analysis['requests']} requisições ({analysis['redundant_requests']} redundantes, "
+               f"razão {analysis['redundant_ratio']:.0%}) para {analysis['lookups']} consultas, "
+               f"hit ratio {analysis['hit_ratio'] if analysis['hit_ratio'] is not None else 'n/a'}")
+    if analysis['requests'] == 0:
+        return "warning", f"⚠ Nenhuma requisição de certificação observada: {summary}"
+    if analysis['redundant_ratio'] > max_redundant_ratio:
+        return "fail", f"✗ Cache ineficiente (limite {max_redundant_ratio:.0%}): {summary}"
+    return "pass", f"✓ Cache funcionando: {summary}"
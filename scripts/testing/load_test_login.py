@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Teste de carga do caminho de autenticação (sem browser)
+
+Dispara, em asyncio e com concorrência crescente, os mesmos cenários de
+test_login_validation.py direto na API:
+
+- valid:     POST /api/auth/login com as credenciais de teste → 200 + token
+- invalid:   POST /api/auth/login com credenciais erradas → 401
+- expired:   GET /api/auth/me com JWT expirado → 401
+- malformed: GET /api/auth/me com token malformado → 401
+
+Por degrau de concorrência: vazão, latência p50/p95/p99 por cenário e
+respostas inesperadas. Registra a primeira resposta 429 do authLimiter
+(backend/src/middleware/rateLimiter.ts), com os headers RateLimit-*, e
+verifica que nenhuma resposta devolve senha ou token enviados (o token
+emitido em data.token no login válido é o único permitido).
+
+Com --mock roda contra o mock backend local, com o mesmo limite do
+authLimiter (ajustável por --mock-rate-limit).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from async_http import AsyncHttpClient
+from config import BACKEND_URL, TEST_EMAIL, TEST_PASSWORD
+from metrics import summarize
+
+RESULTS_FILE = '/tmp/login_load_test.json'
+
+# Mesmos tokens de test_login_validation.py (testes 3 e 4)
+EXPIRED_TOKEN = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJ1c2VySWQiOiJ0ZXN0IiwiZXhwIjoxNjAwMDAwMDAwfQ.test"
+MALFORMED_TOKEN = "invalid.token.here"
+INVALID_EMAIL = 'invalid@test.com'
+INVALID_PASSWORD = 'wrong'
+
+SCENARIOS = {
+    'valid': {'method': 'POST', 'path': '/api/auth/login', 'expected': 200,
+              'json': {'email': TEST_EMAIL, 'password': TEST_PASSWORD}, 'secrets': [TEST_PASSWORD]},
+    'invalid': {'method': 'POST', 'path': '/api/auth/login', 'expected': 401,
+                'json': {'email': INVALID_EMAIL, 'password': INVALID_PASSWORD}, 'secrets': [INVALID_PASSWORD]},
+    'expired': {'method': 'GET', 'path': '/api/auth/me', 'expected': 401,
+                'token': EXPIRED_TOKEN, 'secrets': [EXPIRED_TOKEN]},
+    'malformed': {'method': 'GET', 'path': '/api/auth/me', 'expected': 401,
+                  'token': MALFORMED_TOKEN, 'secrets': [MALFORMED_TOKEN]},
+}
+
+RATE_LIMIT_HEADERS = ('ratelimit-limit', 'ratelimit-remaining', 'ratelimit-reset', 'ratelimit-policy', 'retry-after')
+
+
+def _strings(value):
+    """Chaves e valores string de um JSON (números não geram falso positivo com a senha)"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield key
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def find_leaks(response, secrets):
+    """Segredos enviados que reaparecem no corpo ou nos headers da resposta"""
+    try:
+        payload = json.loads(response.body) if response.body else None
+    except ValueError:
+        payload = None
+    if isinstance(payload, dict) and isinstance(payload.get('data'), dict):
+        # O token emitido pelo login é a resposta esperada, não vazamento
+        payload = dict(payload, data={k: v for k, v in payload['data'].items() if k != 'token'})
+    texts = list(_strings(payload)) if payload is not None else [response.body.decode(errors='replace')]
+    texts.extend(response.headers.values())
+    return sorted({secret for secret in secrets for text in texts if secret and secret in text})
+
+
+class LoadRecorder:
+    """Numeração de envio, primeiro 429 (por ordem de chegada) e vazamentos"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sent = 0
+        self.accepted = 0
+        self.first_429 = None
+        self.leaks = []
+
+    def record(self, ordinal, scenario, concurrency, response=None, error=None):
+        entry = {'ordinal': ordinal, 'scenario': scenario, 'concurrency': concurrency,
+                 'elapsed_s': round(time.perf_counter() - self.started, 3)}
+        if response is None:
+            entry.update(status=None, latency_ms=None, error=error)
+        else:
+            entry.update(status=response.status, latency_ms=response.elapsed_ms)
+            leaked = find_leaks(response, SCENARIOS[scenario]['secrets'])
+            if leaked:
+                self.leaks.append({'ordinal': ordinal, 'scenario': scenario, 'status': response.status,
+                                   'leaked': [f'{secret[:4]}…' for secret in leaked]})
+            if response.status != 429:
+                self.accepted += 1
+            elif self.first_429 is None:
+                # Em ordem de chegada: quantas respostas não limitadas vieram antes
+                self.first_429 = dict(entry, accepted_before=self.accepted,
+                                      headers={h: response.headers[h] for h in RATE_LIMIT_HEADERS
+                                               if h in response.headers})
+        return entry
+
+
+async def send(client, scenario):
+    spec = SCENARIOS[scenario]
+    headers = {'Authorization': f"Bearer {spec['token']}"} if 'token' in spec else None
+    return await client.request(spec['method'], spec['path'], json=spec.get('json'), headers=headers)
+
+
+async def run_step(client, recorder, scenarios, concurrency, requests):
+    """requests requisições com `concurrency` workers; cenários intercalados por ordem de envio"""
+    remaining = iter(range(requests))
+    step_records = []
+
+    async def worker():
+        for _ in remaining:
+            ordinal = recorder.sent
+            recorder.sent += 1
+            scenario = scenarios[ordinal % len(scenarios)]
+            try:
+                response = await send(client, scenario)
+            except (OSError, asyncio.TimeoutError) as e:
+                step_records.append(recorder.record(ordinal, scenario, concurrency,
+                                                    error=str(e) or type(e).__name__))
+            else:
+                step_records.append(recorder.record(ordinal, scenario, concurrency, response))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return summarize_step(step_records, concurrency, elapsed)
+
+
+def summarize_step(records, concurrency, elapsed):
+    by_scenario = {}
+    for scenario in SCENARIOS:
+        entries = [r for r in records if r['scenario'] == scenario]
+        if not entries:
+            continue
+        expected = SCENARIOS[scenario]['expected']
+        by_scenario[scenario] = {
+            'requests': len(entries),
+            'expected': sum(1 for r in entries if r['status'] == expected),
+            'rate_limited': sum(1 for r in entries if r['status'] == 429),
+            'unexpected': sum(1 for r in entries if r['status'] not in (expected, 429)),
+            'latency_ms': summarize([r['latency_ms'] for r in entries if r['status'] == expected]),
+        }
+    return {
+        'concurrency': concurrency,
+        'requests': len(records),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(records) / elapsed, 2) if elapsed else None,
+        'latency_ms': summarize([r['latency_ms'] for r in records]),
+        'rate_limited': sum(1 for r in records if r['status'] == 429),
+        'unexpected': sum(s['unexpected'] for s in by_scenario.values()),
+        'scenarios': by_scenario,
+    }
+
+
+async def run_load(base_url, scenarios, concurrency_levels, requests_per_step, stop_on_429):
+    recorder = LoadRecorder()
+    steps = []
+    async with AsyncHttpClient(base_url, max_connections=max(concurrency_levels), timeout=30) as client:
+        for concurrency in concurrency_levels:
+            step = await run_step(client, recorder, scenarios, concurrency, requests_per_step)
+            steps.append(step)
+            print_step(step)
+            if stop_on_429 and step['rate_limited']:
+                break
+        stats = dict(client.stats)
+    return {'steps': steps, 'first_429': recorder.first_429, 'leaks': recorder.leaks,
+            'total_requests': recorder.sent, 'connections': stats}
+
+
+def print_step(step):
+    latency = step['latency_ms']
+    print(f"\n⚡ Concorrência {step['concurrency']}: {step['requests']} req em {step['elapsed_s']}s "
+          f"→ {step['throughput_rps']} req/s, p50={latency.get('p50')}ms p95={latency.get('p95')}ms "
+          f"p99={latency.get('p99')}ms")
+    for name, scenario in step['scenarios'].items():
+        icon = '✅' if not scenario['unexpected'] else '❌'
+        extra = f", {scenario['rate_limited']} × 429" if scenario['rate_limited'] else ''
+        extra += f", {scenario['unexpected']} inesperadas" if scenario['unexpected'] else ''
+        print(f"   {icon} {name:<10} {scenario['expected']}/{scenario['requests']} com "
+              f"{SCENARIOS[name]['expected']}, p95={scenario['latency_ms'].get('p95')}ms{extra}")
+
+
+def print_summary(report):
+    print("\n" + "=" * 60)
+    first = report['first_429']
+    if first:
+        headers = ', '.join(f"{k}={v}" for k, v in first['headers'].items())
+        print(f"🚦 Primeiro 429 após {first['accepted_before']} respostas aceitas "
+              f"(requisição #{first['ordinal'] + 1}, {first['scenario']}, concorrência {first['concurrency']}, "
+              f"{first['elapsed_s']}s após o início)")
+        if headers:
+            print(f"   {headers}")
+    else:
+        print(f"🚦 Nenhum 429 em {report['total_requests']} requisições")
+    if report['leaks']:
+        print(f"❌ {len(report['leaks'])} respostas devolveram senha/token enviados:")
+        for leak in report['leaks'][:5]:
+            print(f"   #{leak['ordinal'] + 1} {leak['scenario']} (HTTP {leak['status']}): {', '.join(leak['leaked'])}")
+    else:
+        print("✅ Nenhuma senha ou token enviado apareceu nas respostas")
+    unexpected = sum(step['unexpected'] for step in report['steps'])
+    if unexpected:
+        print(f"❌ {unexpected} respostas com status inesperado")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga concorrente de login e caracterização do rate limiter")
+    parser.add_argument('--url', default=BACKEND_URL)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="Cenários separados por vírgula")
+    parser.add_argument('--concurrency', default='1,10,50,100', help="Níveis de concorrência (degraus)")
+    parser.add_argument('--requests', type=int, default=300, help="Requisições por degrau")
+    parser.add_argument('--stop-on-429', action='store_true', help="Para no primeiro degrau com 429")
+    parser.add_argument('--mock', action='store_true', help="Usa o mock backend local com rate limiter")
+    parser.add_argument('--mock-rate-limit', type=int, help="Limite de /api/auth no mock (padrão: o do backend)")
+    parser.add_argument('--mock-latency-ms', type=int, default=0)
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Cenários desconhecidos: {', '.join(unknown)}")
+    concurrency_levels = [int(level) for level in args.concurrency.split(',')]
+
+    mock_server = None
+    base_url = args.url
+    if args.mock:
+        from mock_backend import AUTH_RATE_LIMIT, MockBackend, MockServer
+        limit = (args.mock_rate_limit or AUTH_RATE_LIMIT[0], AUTH_RATE_LIMIT[1])
+        mock_server = MockServer(MockBackend(latency_ms=args.mock_latency_ms,
+                                             rate_limits={'/api/auth': limit})).start()
+        base_url = mock_server.url
+
+    print(f"🔐 Carga de autenticação em {base_url}: {', '.join(scenarios)}; "
+          f"concorrência {args.concurrency}, {args.requests} req/degrau")
+    try:
+        report = asyncio.run(run_load(base_url, scenarios, concurrency_levels, args.requests, args.stop_on_429))
+    finally:
+        if mock_server is not None:
+            mock_server.stop()
+
+    print_summary(report)
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump(dict(report, base_url=base_url, scenarios=scenarios), f, indent=2)
+    print(f"\n📄 Resultados salvos em: {RESULTS_FILE}")
+
+    unexpected = sum(step['unexpected'] for step in report['steps'])
+    return 1 if report['leaks'] or unexpected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Soak test: vazamento de memória em sessões longas
+
+Mantém uma página aberta como os operadores fazem e amostra a memória
+a cada iteração, por N iterações ou T minutos:
+
+- models:  Settings → aba Models (navegação de test_badge_system.py);
+           cada iteração volta para a home e retorna pelo histórico do
+           SPA (sem reload, que zeraria o heap)
+- grafana: dashboard myia-errors com auto-refresh (como em
+           check_grafana_dashboard.py); cada iteração espera um ciclo
+
+Por amostra, após um GC forçado (CDP): heap JS, nós do DOM, listeners
+e RSS dos processos do Chromium (SystemInfo.getProcessInfo + /proc).
+Depois do aquecimento, ajusta uma reta por métrica; falha quando o
+crescimento ajustado passa do limite e a tendência é consistente (r²).
+Resultados parciais são regravados a cada amostra.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from async_http import basic_auth
+from browser_pool import BrowserSessionPool
+from config import GRAFANA_URL
+from grafana_api import parse_duration_ms
+from metrics import linear_trend
+from page_metrics import browser_rss_mb, collect_memory, open_memory_cdp
+from readiness import NetworkWatcher, wait_for_dom_quiet
+from test_badge_system import POOL_OPTIONS, VIEWPORT, BadgePage
+
+RESULTS_FILE = '/tmp/soak_test.json'
+GRAFANA_DASHBOARD = 'myia-errors'
+DS_QUERY_ENDPOINT = '/api/ds/query'
+
+# Crescimento ajustado máximo (início → fim da reta) por métrica
+DEFAULT_LIMITS = {
+    'js_heap_mb': 20,
+    'dom_nodes': 2000,
+    'listeners': 200,
+    'rss_mb': 150,
+}
+UNITS = {'js_heap_mb': 'MB', 'dom_nodes': ' nós', 'listeners': ' listeners', 'rss_mb': 'MB'}
+
+
+class ModelsFlow:
+    """Settings → Models uma vez; iterações home ⇄ Models pelo histórico"""
+
+    def __init__(self, context):
+        self.badge_page = BadgePage(context, 'soak-models')
+        self.page = self.badge_page.page
+
+    def start(self):
+        self.badge_page.open_models()
+
+    def iterate(self):
+        page = self.badge_page.page
+        page.go_back(wait_until='networkidle')
+        self.badge_page.wait_for_badges()
+        page.go_forward(wait_until='networkidle')
+        self.badge_page.wait_for_badges()
+        return {'model_cards': self.badge_page.count_model_cards(reopen_tab=True)}
+
+
+class GrafanaFlow:
+    """Dashboard com auto-refresh; cada iteração espera um ciclo de consultas"""
+
+    def __init__(self, context, dashboard=GRAFANA_DASHBOARD, refresh='10s'):
+        self.url = f'{GRAFANA_URL}/d/{dashboard}/{dashboard}?orgId=1&refresh={refresh}'
+        self.refresh_ms = parse_duration_ms(refresh)
+        self.page = context.new_page()
+        self.queries = NetworkWatcher(self.page, DS_QUERY_ENDPOINT)
+
+    def start(self):
+        self.page.goto(self.url, wait_until='domcontentloaded', timeout=30000)
+        self.queries.wait_until_idle(quiet_ms=1000, timeout=30000, min_completed=1)
+        wait_for_dom_quiet(self.page, quiet_ms=500, timeout=10000)
+
+    def iterate(self):
+        before = self.queries.completed
+        self.page.wait_for_timeout(self.refresh_ms)
+        self.queries.wait_until_idle(quiet_ms=1000, timeout=30000)
+        return {'queries': self.queries.completed - before, 'failed_queries': self.queries.failed}
+
+
+def take_sample(cdp, browser_cdp, iteration, started, extra):
+    sample = dict(collect_memory(cdp), iteration=iteration,
+                  elapsed_min=round((time.monotonic() - started) / 60, 3), **extra)
+    rss = browser_rss_mb(browser_cdp)
+    sample['rss_mb'] = rss['total'] if rss else None
+    sample['rss_by_type'] = rss['by_type'] if rss else None
+    return sample
+
+
+def analyze(samples, warmup, limits, min_r2):
+    """Reta por métrica depois do aquecimento; leak = crescimento acima do limite com r² ≥ min_r2"""
+    steady = samples[warmup:]
+    xs = [s['elapsed_min'] for s in steady]
+    trends = {}
+    for metric, limit in limits.items():
+        ys = [s.get(metric) for s in steady]
+        fit = linear_trend(xs, ys)
+        if fit is None:
+            trends[metric] = {'status': 'skip', 'limit': limit}
+            continue
+        span = xs[-1] - xs[0]
+        growth = fit['slope'] * span
+        leaking = growth > limit and fit['r2'] >= min_r2
+        trends[metric] = {
+            'status': 'fail' if leaking else 'pass',
+            'slope_per_hour': round(fit['slope'] * 60, 2),
+            'growth': round(growth, 2),
+            'r2': round(fit['r2'], 3),
+            'first': ys[0],
+            'last': ys[-1],
+            'limit': limit,
+        }
+    return trends
+
+
+def save(report):
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def run_soak(flow, pool, iterations, minutes, sample_every, report):
+    cdp = open_memory_cdp(flow.page)
+    browser_cdp = pool.browser.new_browser_cdp_session()
+    flow.start()
+    started = time.monotonic()
+    deadline = started + minutes * 60 if minutes else None
+    samples = report['samples']
+    samples.append(take_sample(cdp, browser_cdp, 0, started, {}))
+    print_sample(samples[-1])
+
+    iteration = 0
+    while (not iterations or iteration < iterations) and (deadline is None or time.monotonic() < deadline):
+        iteration += 1
+        extra = flow.iterate()
+        if iteration % sample_every == 0:
+            samples.append(take_sample(cdp, browser_cdp, iteration, started, extra))
+            print_sample(samples[-1])
+            save(report)
+    return samples
+
+
+def print_sample(sample):
+    rss = f", RSS {sample['rss_mb']:.0f}MB" if sample['rss_mb'] is not None else ''
+    print(f"   🔁 #{sample['iteration']} ({sample['elapsed_min']:.1f} min): heap {sample['js_heap_mb']:.1f}MB, "
+          f"{sample['dom_nodes']} nós, {sample['listeners']} listeners{rss}")
+
+
+def print_trends(trends, minutes_span):
+    print("\n" + "=" * 60)
+    print(f"📈 Tendência após o aquecimento ({minutes_span:.1f} min)")
+    for metric, trend in trends.items():
+        if trend['status'] == 'skip':
+            print(f"   ⊘ {metric}: sem amostras suficientes")
+            continue
+        icon = '❌' if trend['status'] == 'fail' else '✅'
+        unit = UNITS[metric]
+        print(f"   {icon} {metric}: {trend['first']} → {trend['last']}, ajuste {trend['growth']:+}{unit} "
+              f"({trend['slope_per_hour']:+}{unit}/h, r²={trend['r2']}), limite {trend['limit']}{unit}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test de memória (Models ou dashboard do Grafana)")
+    parser.add_argument('target', choices=['models', 'grafana'])
+    parser.add_argument('--iterations', type=int, default=60, help="Iterações (0 = só pelo tempo)")
+    parser.add_argument('--minutes', type=float, help="Duração máxima em minutos")
+    parser.add_argument('--sample-every', type=int, default=1, help="Amostra a cada K iterações")
+    parser.add_argument('--warmup', type=int, default=3, help="Amostras iniciais fora da tendência (caches enchendo)")
+    parser.add_argument('--min-r2', type=float, default=0.6, help="r² mínimo para considerar o crescimento contínuo")
+    parser.add_argument('--max-heap-growth-mb', type=float, default=DEFAULT_LIMITS['js_heap_mb'])
+    parser.add_argument('--max-dom-growth', type=float, default=DEFAULT_LIMITS['dom_nodes'])
+    parser.add_argument('--max-listener-growth', type=float, default=DEFAULT_LIMITS['listeners'])
+    parser.add_argument('--max-rss-growth-mb', type=float, default=DEFAULT_LIMITS['rss_mb'])
+    parser.add_argument('--mock', action='store_true', help="models: /api/* respondido pelo mock backend")
+    parser.add_argument('--dashboard', default=GRAFANA_DASHBOARD)
+    parser.add_argument('--refresh', default='10s', help="grafana: intervalo de auto-refresh")
+    parser.add_argument('--user', default=os.environ.get('GRAFANA_USER', 'admin'))
+    parser.add_argument('--password', default=os.environ.get('GRAFANA_PASSWORD', 'admin'))
+    args = parser.parse_args()
+    if not args.iterations and not args.minutes:
+        parser.error("Informe --iterations ou --minutes")
+
+    limits = {
+        'js_heap_mb': args.max_heap_growth_mb,
+        'dom_nodes': args.max_dom_growth,
+        'listeners': args.max_listener_growth,
+        'rss_mb': args.max_rss_growth_mb,
+    }
+    report = {'target': args.target, 'samples': [], 'limits': limits, 'warmup': args.warmup}
+    budget = ' / '.join(part for part in (
+        f"{args.iterations} iterações" if args.iterations else '',
+        f"{args.minutes} min" if args.minutes else '') if part)
+    print(f"🧪 Soak {args.target}: {budget}, amostra a cada {args.sample_every} iteração(ões)")
+
+    with BrowserSessionPool(**dict(POOL_OPTIONS, mock_backend=args.mock and args.target == 'models')) as pool:
+        if args.target == 'models':
+            session = pool.session(authenticated=True, viewport=VIEWPORT, label='soak-models')
+        else:
+            # Basic auth em todas as requisições, sem o formulário de login
+            session = pool.session(viewport=VIEWPORT, label='soak-grafana',
+                                   extra_http_headers={'Authorization': basic_auth(args.user, args.password)})
+        with session as context:
+            flow = (ModelsFlow(context) if args.target == 'models'
+                    else GrafanaFlow(context, args.dashboard, args.refresh))
+            try:
+                samples = run_soak(flow, pool, args.iterations, args.minutes, args.sample_every, report)
+            except KeyboardInterrupt:
+                samples = report['samples']
+                print("\n⏹️  Interrompido; analisando as amostras coletadas")
+
+    if len(samples) - args.warmup < 3:
+        save(report)
+        print(f"❌ Amostras insuficientes após o aquecimento ({len(samples)} coletadas, warmup {args.warmup})")
+        return 1
+
+    report['trends'] = analyze(samples, args.warmup, limits, args.min_r2)
+    save(report)
+    print_trends(report['trends'], samples[-1]['elapsed_min'] - samples[args.warmup]['elapsed_min'])
+    print(f"\n📄 Resultados salvos em: {RESULTS_FILE}")
+    return 1 if any(t['status'] == 'fail' for t in report['trends'].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
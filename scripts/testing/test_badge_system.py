@@ -2,323 +2,644 @@
 """
 Script de teste para validar o sistema centralizado de badges
 Executa os 8 testes de aceitação especificados no plano
+
+Cada teste abre seu próprio BrowserContext autenticado, o que permite
+executá-los em paralelo com --workers N.
 """
 
-from playwright.sync_api import sync_playwright
+import argparse
 import json
+import os
+import sys
 import time
+from collections import deque
+from contextlib import nullcontext
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from api_profiler import ApiProfiler, build_report, report_inputs
+from cache_efficiency import analyze_cache, evaluate
+from config import FRONTEND_URL, LOKI_URL, TEST_EMAIL, TEST_PASSWORD
+from console_capture import ConsoleCapture
+from dom_snapshot import dom_snapshot, groups_without_items
+from parallel_runner import run_tests
+from profiling import PROFILE_MODES, FlowProfiler, print_profile
+from readiness import NetworkWatcher, wait_for_dom_quiet, wait_for_url
+from results_sink import ResultsSink
+from screenshots import ScreenshotStore, print_comparison
+from server_timing import correlate, print_attribution
+from viewport_sweep import DEFAULT_VIEWPORTS_FILE, RENDER_TIMEOUT_MS, load_viewports, sweep_viewports
+
+RESULTS_FILE = '/tmp/badge_system_test_results.json'
+# Um registro por teste, gravado assim que ele termina
+RESULTS_JSONL = '/tmp/badge_system_test_results.jsonl'
+# Registros completos de API guardados para o JSON final; a íntegra fica no JSONL por teste
+API_SAMPLE_SIZE = 200
+SCREENSHOT_DIR = '/tmp/badge_system_screenshots'
+PROFILE_DIR = '/tmp/badge_system_profiles'
+
+# Login do frontend principal redireciona para /chat
+POOL_OPTIONS = {
+    'headless': True,
+    'auth_options': {'base_url': FRONTEND_URL, 'redirect': '**/chat'},
+}
+
+VIEWPORT = {'width': 1920, 'height': 1080}
+
+MODEL_CARD_SELECTOR = '[class*="ModelCard"], [class*="model-card"]'
+SETTINGS_BUTTON_SELECTOR = 'button[aria-label*="settings"], button[aria-label*="configurações"], a[href*="settings"]'
+MODELS_TAB_SELECTOR = 'button:has-text("Modelos"), button:has-text("Models")'
+# Mesma aba em CSS puro + filtro de texto, para dom_snapshot
+MODELS_TAB_MATCH = {'selector': 'button', 'has_text': ['Modelos', 'Models']}
+BADGE_SELECTOR = '.MuiChip-root'
+LOADING_SELECTOR = '.MuiCircularProgress-root, [class*="loading"], [class*="skeleton"]'
+MODEL_SECTION_SELECTOR = '[class*="model"]'
+
+# Timeouts (ms) das esperas de BadgePage; redes/CPU emuladas lentas (throttle_matrix.py) passam valores maiores
+DEFAULT_TIMEOUTS = {'navigation': 30000, 'load': 10000, 'badges': 15000}
+
+# Fração máxima de requisições de certificação redundantes aceita no teste 4
+DEFAULT_MAX_REDUNDANT_RATIO = 0.1
+
+
+class BadgePage:
+    """Página instrumentada: console, erros de página e chamadas de API"""
+
+    def __init__(self, context, name=None, profile=None, timeouts=None):
+        self.page = context.new_page()
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.console = ConsoleCapture(self.page, secrets={'email': TEST_EMAIL, 'password': TEST_PASSWORD})
+        self.page_errors = []
+
+        self.page.on("pageerror", lambda err: self.page_errors.append(str(err)))
+
+        # Rastrear chamadas de API via eventos passivos (sem page.route)
+        self.api_profiler = ApiProfiler(self.page, '/api/', session=name)
+
+        # Prontidão das requisições de certificação (badges)
+        self.certification_requests = NetworkWatcher(self.page, '/api/certification')
+
+        self.screenshots = ScreenshotStore(SCREENSHOT_DIR)
+        self.artifacts = []
+
+        # Opt-in (--profile): perfil de CPU ou trace por etapa da navegação
+        self.profiler = None
+        if profile:
+            self.profiler = FlowProfiler(self.page, profile['dir'], profile['mode'], label=name or 'badges')
+
+    def profile_step(self, step):
+        return self.profiler.step(step) if self.profiler else nullcontext()
+
+    def capture(self, name, **options):
+        """Screenshot no ScreenshotStore, anexado aos artefatos do teste; retorna o caminho"""
+        path = self.screenshots.object_path(self.screenshots.capture(self.page, name, **options))
+        self.artifacts.append(path)
+        return path
+
+    def wait_for_badges(self):
+        """Aguarda as chamadas de certificação terminarem e o DOM estabilizar"""
+        self.certification_requests.wait_until_idle(quiet_ms=500, timeout=self.timeouts['badges'])
+        wait_for_dom_quiet(self.page, quiet_ms=300, timeout=self.timeouts['load'])
+
+    def open_home(self):
+        """Navega para a aplicação (sessão já autenticada pelo pool)"""
+        page = self.page
+        self.api_profiler.mark('home')
+        with self.profile_step('home'):
+            page.goto(FRONTEND_URL, wait_until='networkidle', timeout=self.timeouts['navigation'])
+            wait_for_dom_quiet(page, quiet_ms=300, timeout=self.timeouts['load'])  # Aguardar carregamento inicial
+
+        # Fazer login se o estado pré-carregado não bastar
+        if page.locator('input[type="email"]').count() > 0:
+            print("   → Fazendo login...")
+            page.fill('input[type="email"]', TEST_EMAIL)
+            page.fill('input[type="password"]', TEST_PASSWORD)
+            page.click('button[type="submit"]')
+            wait_for_url(page, lambda url: '/login' not in url, timeout=self.timeouts['load'])
+            page.wait_for_load_state('networkidle', timeout=self.timeouts['load'])
+            wait_for_dom_quiet(page, quiet_ms=300, timeout=self.timeouts['load'])
+        return page
+
+    def open_models(self):
+        """Navega até Settings → aba Models"""
+        page = self.open_home()
+
+        # Procurar botão de settings
+        settings_button = page.locator(SETTINGS_BUTTON_SELECTOR).first
+        if settings_button.count() == 0:
+            raise RuntimeError("Botão de Settings não encontrado")
+        self.api_profiler.mark('settings')
+        with self.profile_step('settings'):
+            settings_button.click()
+            page.wait_for_load_state('networkidle', timeout=self.timeouts['load'])
+            wait_for_dom_quiet(page, quiet_ms=300, timeout=self.timeouts['load'])
+
+        self.open_models_tab()
+        return page
+
+    def open_models_tab(self):
+        """Clica na aba Models da página de Settings"""
+        models_tab = self.page.locator(MODELS_TAB_SELECTOR).first
+        if models_tab.count() == 0:
+            raise RuntimeError("Aba Models não encontrada")
+        self.api_profiler.mark('models')
+        with self.profile_step('models'):
+            models_tab.click()
+            self.wait_for_badges()
+
+    def snapshot(self):
+        """Badges (contagem, textos e por seção de modelo), cards, aba Models e loading em um só evaluate"""
+        return dom_snapshot(
+            self.page,
+            counts={
+                'badges': BADGE_SELECTOR,
+                'model_cards': MODEL_CARD_SELECTOR,
+                'models_tab': MODELS_TAB_MATCH,
+                'loading': LOADING_SELECTOR,
+            },
+            texts={'badges': BADGE_SELECTOR},
+            groups={'model_sections': {'container': MODEL_SECTION_SELECTOR, 'item': BADGE_SELECTOR}},
+        )
+
+    def count_model_cards(self, reopen_tab=False):
+        """Cards de modelo renderizados; com reopen_tab, reabre a aba Models se ela tiver sido fechada"""
+        counts = self.snapshot()['counts']
+        if reopen_tab and counts['model_cards']['total'] == 0 and counts['models_tab']['total'] > 0:
+            self.page.locator(MODELS_TAB_SELECTOR).first.click()
+            self.wait_for_badges()
+            counts = self.snapshot()['counts']
+        return counts['model_cards']['total']
+
+    def certification_calls(self):
+        return [r for r in self.api_profiler.records if '/api/certification' in r['url']]
+
+    def diagnostics(self):
+        profile = self.profiler.steps if self.profiler else []
+        return {
+            'console_logs': self.console.tail(20),  # Últimos 20 logs
+            'console_levels': dict(self.console.levels),
+            'console_leaks': self.console.leaks,
+            'page_errors': self.page_errors,
+            'api_requests': self.api_profiler.export(),
+            'artifacts': self.artifacts + [step['file'] for step in profile],
+            'profile': profile,
+        }
+
+
+def result(status, details, badge_page=None):
+    """Monta o resultado de um teste com os diagnósticos da página"""
+    outcome = {"status": status, "details": details}
+    if badge_page is not None:
+        outcome["diagnostics"] = badge_page.diagnostics()
+    return outcome
+
+
+def run_check(pool, name, check, profile=None):
+    """Executa um teste em context isolado, convertendo exceções em 'error'"""
+    with pool.session(authenticated=True, viewport=VIEWPORT, label=name) as context:
+        badge_page = BadgePage(context, name, profile)
+        try:
+            return check(badge_page)
+        except Exception as e:
+            print(f"   ✗ ERROR: {str(e)}")
+            try:
+                print(f"   Screenshot de erro salvo: {badge_page.capture(f'error_{name}', full_page=True)}")
+            except Exception:
+                pass
+            return result("error", f"✗ Erro: {str(e)}", badge_page)
+
+
+def print_header(title):
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+
+
+def check_basic_display(badge_page):
+    """TESTE 1: Exibição Básica"""
+    print_header("TEST 1: Exibição Básica de Badges")
+    badge_page.open_home()
+
+    # Capturar screenshot inicial
+    print(f"   ✓ Screenshot inicial salvo: {badge_page.capture('home', full_page=True)}")
+
+    # Procurar por badges na página
+    snapshot = badge_page.snapshot()
+    badge_count = snapshot['counts']['badges']['total']
+
+    if badge_count > 0:
+        print(f"   ✓ PASS: {badge_count} badges encontrados")
+
+        # Listar tipos de badges encontrados
+        badge_texts = snapshot['texts']['badges'][:5]
+        print(f"   → Exemplos: {', '.join(badge_texts)}")
+        return result("pass", f"✓ {badge_count} badges encontrados na página", badge_page)
+
+    print("   ✗ FAIL: Nenhum badge encontrado")
+    return result("fail", "✗ Nenhum badge encontrado", badge_page)
+
+
+def check_shared_cache(badge_page, max_redundant_ratio=DEFAULT_MAX_REDUNDANT_RATIO):
+    """TESTE 4: Cache Compartilhado (Settings → Models → reload → back → Models)"""
+    print_header("TEST 4: Cache Compartilhado")
+    page = badge_page.open_models()
+    profiler = badge_page.api_profiler
+
+    print(f"   ✓ Screenshot salvo: {badge_page.capture('models', full_page=True)}")
+
+    # Consultas ao cache por visão = cards de modelo renderizados
+    views = [
+        {'name': 'home', 'lookups': 0},
+        {'name': 'settings', 'lookups': 0},
+        {'name': 'models', 'lookups': badge_page.count_model_cards()},
+    ]
+
+    # Reload zera o cache em memória: nova época
+    profiler.mark('models-reload')
+    page.reload(wait_until='networkidle')
+    badge_page.wait_for_badges()
+    views.append({'name': 'models-reload', 'resets_cache': True,
+                  'lookups': badge_page.count_model_cards(reopen_tab=True)})
+
+    # Voltar e retornar: os badges devem vir do cache
+    profiler.mark('back')
+    page.go_back(wait_until='networkidle')
+    badge_page.wait_for_badges()
+    views.append({'name': 'back', 'lookups': badge_page.count_model_cards()})
+
+    profiler.mark('models-return')
+    page.go_forward(wait_until='networkidle')
+    badge_page.wait_for_badges()
+    views.append({'name': 'models-return', 'lookups': badge_page.count_model_cards(reopen_tab=True)})
+
+    analysis = analyze_cache(profiler.records, views)
+    for view in analysis['views']:
+        print(f"   → {view['view']}: {view['requests']} requisições, {view['unique']} únicas, "
+              f"{view['duplicates_in_view']} duplicadas, {view['repeated_from_earlier_view']} repetidas "
+              f"({view['lookups']} cards)")
+    hit_ratio = analysis['hit_ratio']
+    print(f"   → Hit ratio: {hit_ratio if hit_ratio is not None else 'n/a'}")
+    print(f"   → Viagens redundantes: {analysis['redundant_requests']}")
+
+    status, details = evaluate(analysis, max_redundant_ratio)
+    icon = {"pass": "✓ PASS", "fail": "✗ FAIL", "warning": "⚠ WARNING"}[status]
+    print(f"   {icon}: {details}")
+
+    outcome = result(status, details, badge_page)
+    outcome["cache_efficiency"] = analysis
+    return outcome
+
+
+def check_loading_state(badge_page):
+    """TESTE 5: Loading State"""
+    print_header("TEST 5: Loading State")
+    page = badge_page.open_models()
+
+    # Recarregar página para ver loading
+    page.reload(wait_until='domcontentloaded')
 
-def test_badge_system():
+    # Procurar por loading indicators
+    loading_indicators = badge_page.snapshot()['counts']['loading']['total']
+
+    if loading_indicators > 0:
+        print(f"   ✓ PASS: Loading state implementado")
+        return result("pass", f"✓ {loading_indicators} loading indicators encontrados", badge_page)
+
+    print(f"   ⚠ WARNING: Loading muito rápido ou não implementado")
+    return result("warning", "⚠ Nenhum loading indicator visível (pode ser muito rápido)", badge_page)
+
+
+def check_error_handling(badge_page):
+    """TESTE 6: Error Handling"""
+    print_header("TEST 6: Error Handling")
+    page = badge_page.open_models()
+
+    # Recarregar para cobrir também o carregamento a frio da aba
+    page.reload(wait_until='networkidle')
+    badge_page.wait_for_badges()
+
+    page_errors = badge_page.page_errors
+    if len(page_errors) == 0:
+        print(f"   ✓ PASS: Sem erros de página")
+        return result("pass", "✓ Nenhum erro de página detectado", badge_page)
+
+    print(f"   ✗ FAIL: {len(page_errors)} erros encontrados")
+    for err in page_errors[:3]:
+        print(f"      → {err}")
+    return result("fail", f"✗ {len(page_errors)} erros detectados", badge_page)
+
+
+def check_no_badges(badge_page):
+    """TESTE 7: Modelo Sem Badges"""
+    print_header("TEST 7: Modelo Sem Badges")
+    badge_page.open_models()
+
+    # Procurar por modelos sem badges (todas as seções, em uma única consulta ao DOM)
+    snapshot = badge_page.snapshot()
+    sections = snapshot['groups']['model_sections']
+    models_without_badges = len(groups_without_items(snapshot, 'model_sections'))
+
+    print(f"   ✓ PASS: {models_without_badges} de {len(sections)} modelos sem badges renderizados corretamente")
+    return result("pass", f"✓ Sistema lida corretamente com modelos sem badges", badge_page)
+
+
+def check_responsiveness(pool, viewports):
+    """TESTE 8: Responsividade (um context por viewport, em paralelo)"""
+    print_header("TEST 8: Responsividade")
+    if pool.auth_state is None:
+        pool.capture_auth_state(**pool.auth_options)
+
+    started = time.perf_counter()
+    outcomes = sweep_viewports(viewports, pool, {
+        'settings': SETTINGS_BUTTON_SELECTOR,
+        'models_tab': MODELS_TAB_SELECTOR,
+    }, ScreenshotStore(SCREENSHOT_DIR))
+    elapsed = time.perf_counter() - started
+
+    responsive_ok = True
+    for viewport in outcomes:
+        if 'error' in viewport:
+            print(f"   ✗ {viewport['name']}: {viewport['error']}")
+            responsive_ok = False
+            continue
+        render = (f"render ⚠️  DOM não estabilizou em {RENDER_TIMEOUT_MS / 1000:.0f}s" if viewport['render_timed_out']
+                  else f"render {viewport['render_ms']}ms")
+        print(f"   → {viewport['name']} ({viewport['width']}x{viewport['height']} @{viewport['device_scale_factor']}x"
+              f"{', touch' if viewport['has_touch'] else ''}): {viewport['visible_badges']} badges visíveis, "
+              f"{render}, CLS {viewport['cls']}")
+        print(f"      Screenshot: {viewport['screenshot']}")
+        if viewport['visible_badges'] == 0:
+            responsive_ok = False
+    print(f"   → {len(outcomes)} viewports em {elapsed:.1f}s")
+
+    if responsive_ok:
+        print(f"   ✓ PASS: Layout responsivo OK")
+        outcome = result("pass", f"✓ Layout responsivo funciona em {len(outcomes)} viewports")
+    else:
+        print(f"   ✗ FAIL: Problemas de responsividade")
+        outcome = result("fail", "✗ Problemas de responsividade detectados")
+    outcome["viewports"] = outcomes
+    return outcome
+
+
+# Funções de nível de módulo (picklable) para o runner paralelo
+def test_1_basic_display(pool, profile=None):
+    return run_check(pool, "test_1_basic_display", check_basic_display, profile)
+
+
+def test_2_badge_filter(pool):
+    # Filtro e Ordem são testes unitários, não visuais
+    return result("skip", "⊘ Teste requer props específicas (teste unitário)")
+
+
+def test_3_custom_order(pool):
+    return result("skip", "⊘ Teste requer props específicas (teste unitário)")
+
+
+def test_4_shared_cache(pool, max_redundant_ratio=DEFAULT_MAX_REDUNDANT_RATIO, profile=None):
+    return run_check(pool, "test_4_shared_cache",
+                     partial(check_shared_cache, max_redundant_ratio=max_redundant_ratio), profile)
+
+
+def test_5_loading_state(pool, profile=None):
+    return run_check(pool, "test_5_loading_state", check_loading_state, profile)
+
+
+def test_6_error_handling(pool, profile=None):
+    return run_check(pool, "test_6_error_handling", check_error_handling, profile)
+
+
+def test_7_no_badges(pool, profile=None):
+    return run_check(pool, "test_7_no_badges", check_no_badges, profile)
+
+
+def test_8_responsiveness(pool, viewports_file=DEFAULT_VIEWPORTS_FILE):
+    try:
+        return check_responsiveness(pool, load_viewports(viewports_file))
+    except Exception as e:
+        print(f"   ✗ ERROR: {str(e)}")
+        return result("error", f"✗ Erro: {str(e)}")
+
+
+TESTS = [
+    ("test_1_basic_display", test_1_basic_display),
+    ("test_2_badge_filter", test_2_badge_filter),
+    ("test_3_custom_order", test_3_custom_order),
+    ("test_4_shared_cache", test_4_shared_cache),
+    ("test_5_loading_state", test_5_loading_state),
+    ("test_6_error_handling", test_6_error_handling),
+    ("test_7_no_badges", test_7_no_badges),
+    ("test_8_responsiveness", test_8_responsiveness),
+]
+
+
+def print_api_profile(report):
+    """Latência por endpoint e duplicatas, em formato compacto"""
+    print(f"\n📡 API: {report['total_requests']} requisições, {report['duplicate_requests']} duplicadas")
+    for endpoint, stats in report['endpoints'].items():
+        latency = stats['latency_ms']
+        if latency['count']:
+            print(f"   {endpoint}: n={stats['count']} p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms")
+
+
+def test_badge_system(workers=1, max_redundant_ratio=DEFAULT_MAX_REDUNDANT_RATIO, mock=False,
+                      record_dir=None, replay_dir=None, replay_latency_ms=0,
+                      viewports_file=DEFAULT_VIEWPORTS_FILE, screenshot_tolerance=0.01,
+                      update_screenshot_baseline=False, jsonl_path=RESULTS_JSONL, junit_path=None,
+                      profile_mode=None, profile_dir=PROFILE_DIR, loki_url=LOKI_URL):
     """Executa todos os testes de aceitação do sistema de badges"""
-    
-    results = {
-        "test_1_basic_display": {"status": "pending", "details": ""},
-        "test_2_badge_filter": {"status": "pending", "details": ""},
-        "test_3_custom_order": {"status": "pending", "details": ""},
-        "test_4_shared_cache": {"status": "pending", "details": ""},
-        "test_5_loading_state": {"status": "pending", "details": ""},
-        "test_6_error_handling": {"status": "pending", "details": ""},
-        "test_7_no_badges": {"status": "pending", "details": ""},
-        "test_8_responsiveness": {"status": "pending", "details": ""}
+    test_options = {
+        test_4_shared_cache: {'max_redundant_ratio': max_redundant_ratio},
+        test_8_responsiveness: {'viewports_file': viewports_file},
     }
-    
-    with sync_playwright() as p:
-        # Configurar browser
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
-        page = context.new_page()
-        
-        # Capturar logs do console
-        console_logs = []
-        page.on("console", lambda msg: console_logs.append(f"[{msg.type}] {msg.text}"))
-        
-        # Capturar erros
-        page_errors = []
-        page.on("pageerror", lambda err: page_errors.append(str(err)))
-        
-        # Rastrear chamadas de API
-        api_calls = []
-        def track_api_calls(route, request):
-            if '/api/certification' in request.url:
-                api_calls.append({
-                    'url': request.url,
-                    'method': request.method,
-                    'timestamp': time.time()
-                })
-            route.continue_()
-        
-        page.route("**/*", track_api_calls)
-        
+    if profile_mode:
+        profile = {'mode': profile_mode, 'dir': profile_dir}
+        for func in (test_1_basic_display, test_4_shared_cache, test_5_loading_state,
+                     test_6_error_handling, test_7_no_badges):
+            test_options[func] = dict(test_options.get(func, {}), profile=profile)
+    tests = [
+        (name, partial(func, **test_options[func]) if func in test_options else func)
+        for name, func in TESTS
+    ]
+
+    print("🚀 Iniciando testes do sistema de badges...")
+    print(f"   → {workers} worker(s), contexts autenticados em {FRONTEND_URL}")
+    if mock:
+        print("   → /api/* respondido pelo mock backend (fixtures gravadas)")
+    if record_dir:
+        print(f"   → gravando tráfego /api/ em HARs: {record_dir}")
+    if replay_dir:
+        print(f"   → replay dos HARs de {replay_dir} (+{replay_latency_ms}ms por requisição)")
+    if profile_mode:
+        print(f"   → profiling ({profile_mode}) por etapa em {profile_dir}")
+    print("=" * 60)
+
+    # Manifesto de screenshots só com esta execução (workers gravam nele em paralelo)
+    ScreenshotStore(SCREENSHOT_DIR).start_run()
+
+    results = {}
+    console_logs = deque(maxlen=20)  # Últimos 20 logs entre todos os testes
+    console_leaks = []
+    page_errors = []
+    # Só os campos do relatório (cresce com o nº de requisições, mas pouco por registro) + amostra limitada
+    api_requests = []
+    api_sample = deque(maxlen=API_SAMPLE_SIZE)
+
+    pool_options = dict(POOL_OPTIONS, mock_backend=mock, har_record_dir=record_dir,
+                        har_replay_dir=replay_dir, replay_latency_ms=replay_latency_ms)
+    sink = ResultsSink(jsonl_path, junit_path, suite='badge_system',
+                       metadata={'workers': workers, 'mock': mock, 'replay_dir': replay_dir})
+
+    def on_result(test_name, outcome, duration, output):
+        """Consolida o teste e o grava no JSONL assim que ele termina"""
+        if not isinstance(outcome, dict):
+            outcome = result("error", "✗ Teste abortado")
+        diagnostics = outcome.pop("diagnostics", None) or {}
+        console_logs.extend(diagnostics.get('console_logs', []))
+        console_leaks.extend(dict(leak, test=test_name) for leak in diagnostics.get('console_leaks', []))
+        page_errors.extend(diagnostics.get('page_errors', []))
+        records = diagnostics.get('api_requests', [])
+        api_requests.extend(report_inputs(record) for record in records)
+        api_sample.extend(records)
+        outcome["duration"] = round(duration, 2)
+        if diagnostics.get('profile'):
+            outcome["profile"] = diagnostics.pop('profile')
+        results[test_name] = outcome
+        extra = {k: v for k, v in outcome.items() if k not in ('status', 'details', 'duration')}
+        sink.record(test_name, outcome['status'], duration, details=outcome['details'],
+                    artifacts=diagnostics.get('artifacts'), output=output,
+                    diagnostics=diagnostics or None, **extra)
+
+    try:
+        run_tests(tests, workers=workers, pool_options=pool_options, on_result=on_result)
+    finally:
+        sink.close()
+    # Com workers > 1 os testes chegam na ordem de conclusão
+    results = {name: results[name] for name, _ in tests if name in results}
+
+    # Resumo final
+    print("\n" + "=" * 60)
+    print("📊 RESUMO DOS TESTES")
+    print("=" * 60)
+
+    for test_name, outcome in results.items():
+        status_icon = {
+            "pass": "✅",
+            "fail": "❌",
+            "warning": "⚠️",
+            "skip": "⊘",
+            "pending": "⏸️",
+            "error": "💥"
+        }.get(outcome["status"], "❓")
+
+        print(f"{status_icon} {test_name}: {outcome['status'].upper()}")
+        print(f"   {outcome['details']}")
+
+    # Estatísticas
+    passed = sum(1 for r in results.values() if r["status"] == "pass")
+    failed = sum(1 for r in results.values() if r["status"] == "fail")
+    warnings = sum(1 for r in results.values() if r["status"] == "warning")
+    skipped = sum(1 for r in results.values() if r["status"] == "skip")
+
+    print("\n" + "=" * 60)
+    print(f"✅ Passed: {passed}")
+    print(f"❌ Failed: {failed}")
+    print(f"⚠️  Warnings: {warnings}")
+    print(f"⊘  Skipped: {skipped}")
+    print("=" * 60)
+
+    # Regressão visual: screenshots desta execução x baseline (capturas de erro ficam de fora)
+    screenshots = ScreenshotStore(SCREENSHOT_DIR, tolerance=screenshot_tolerance)
+    visual_diff = [c for c in screenshots.compare() if not c['name'].startswith('error_')]
+    print(f"\n🖼️  Screenshots x baseline ({SCREENSHOT_DIR}, tolerância {screenshot_tolerance:.2%}):")
+    print_comparison(visual_diff)
+    if update_screenshot_baseline:
+        screenshots.update_baseline()
+        screenshots.prune()
+        print("📌 Baseline de screenshots atualizado")
+
+    # Tempo no servidor (log HTTP no Loki) x tempo visto pelo browser, por X-Request-ID
+    server_timing = None
+    if loki_url and not (mock or replay_dir):
         try:
-            print("🚀 Iniciando testes do sistema de badges...")
-            print("=" * 60)
-            
-            # Navegar para a aplicação
-            print("\n📍 Navegando para http://localhost:3000...")
-            page.goto('http://localhost:3000', wait_until='networkidle', timeout=30000)
-            page.wait_for_timeout(2000)  # Aguardar carregamento inicial
-            
-            # Fazer login se necessário
-            print("🔐 Verificando necessidade de login...")
-            if page.locator('input[type="email"]').count() > 0:
-                print("   → Fazendo login...")
-                page.fill('input[type="email"]', '123@123.com')
-                page.fill('input[type="password"]', '123123')
-                page.click('button[type="submit"]')
-                page.wait_for_load_state('networkidle', timeout=10000)
-                page.wait_for_timeout(2000)
-            
-            # Capturar screenshot inicial
-            page.screenshot(path='/tmp/badge_system_home.png', full_page=True)
-            print("   ✓ Screenshot inicial salvo: /tmp/badge_system_home.png")
-            
-            # TESTE 1: Exibição Básica
-            print("\n" + "=" * 60)
-            print("TEST 1: Exibição Básica de Badges")
-            print("=" * 60)
-            try:
-                # Procurar por badges na página
-                badges = page.locator('.MuiChip-root').all()
-                badge_count = len(badges)
-                
-                if badge_count > 0:
-                    results["test_1_basic_display"]["status"] = "pass"
-                    results["test_1_basic_display"]["details"] = f"✓ {badge_count} badges encontrados na página"
-                    print(f"   ✓ PASS: {badge_count} badges encontrados")
-                    
-                    # Listar tipos de badges encontrados
-                    badge_texts = [badge.text_content() for badge in badges[:5]]
-                    print(f"   → Exemplos: {', '.join(badge_texts)}")
-                else:
-                    results["test_1_basic_display"]["status"] = "fail"
-                    results["test_1_basic_display"]["details"] = "✗ Nenhum badge encontrado"
-                    print("   ✗ FAIL: Nenhum badge encontrado")
-                    
-            except Exception as e:
-                results["test_1_basic_display"]["status"] = "error"
-                results["test_1_basic_display"]["details"] = f"✗ Erro: {str(e)}"
-                print(f"   ✗ ERROR: {str(e)}")
-            
-            # TESTE 2: Navegação para Settings (onde há mais badges)
-            print("\n" + "=" * 60)
-            print("TEST 2-7: Navegando para Settings/Models")
-            print("=" * 60)
-            try:
-                # Procurar botão de settings
-                settings_button = page.locator('button[aria-label*="settings"], button[aria-label*="configurações"], a[href*="settings"]').first
-                if settings_button.count() > 0:
-                    print("   → Clicando em Settings...")
-                    settings_button.click()
-                    page.wait_for_load_state('networkidle', timeout=10000)
-                    page.wait_for_timeout(2000)
-                    
-                    # Procurar aba de Models
-                    models_tab = page.locator('button:has-text("Modelos"), button:has-text("Models")').first
-                    if models_tab.count() > 0:
-                        print("   → Clicando em Models tab...")
-                        models_tab.click()
-                        page.wait_for_timeout(2000)
-                        
-                        page.screenshot(path='/tmp/badge_system_models.png', full_page=True)
-                        print("   ✓ Screenshot salvo: /tmp/badge_system_models.png")
-                        
-                        # TESTE 4: Cache Compartilhado
-                        print("\n" + "=" * 60)
-                        print("TEST 4: Cache Compartilhado")
-                        print("=" * 60)
-                        
-                        # Contar chamadas API antes
-                        api_calls_before = len(api_calls)
-                        
-                        # Aguardar carregamento completo
-                        page.wait_for_timeout(3000)
-                        
-                        # Contar chamadas API depois
-                        api_calls_after = len(api_calls)
-                        certification_calls = [call for call in api_calls if 'certification' in call['url'].lower()]
-                        
-                        print(f"   → Total de chamadas API: {api_calls_after}")
-                        print(f"   → Chamadas de certificação: {len(certification_calls)}")
-                        
-                        # Contar modelos visíveis
-                        model_cards = page.locator('[class*="ModelCard"], [class*="model-card"]').all()
-                        model_count = len(model_cards)
-                        print(f"   → Modelos visíveis: {model_count}")
-                        
-                        if len(certification_calls) < model_count:
-                            results["test_4_shared_cache"]["status"] = "pass"
-                            results["test_4_shared_cache"]["details"] = f"✓ Cache funcionando: {len(certification_calls)} chamadas para {model_count} modelos"
-                            print(f"   ✓ PASS: Cache compartilhado funcionando!")
-                        else:
-                            results["test_4_shared_cache"]["status"] = "warning"
-                            results["test_4_shared_cache"]["details"] = f"⚠ Possível problema: {len(certification_calls)} chamadas para {model_count} modelos"
-                            print(f"   ⚠ WARNING: Muitas chamadas API")
-                        
-                        # TESTE 5: Loading State
-                        print("\n" + "=" * 60)
-                        print("TEST 5: Loading State")
-                        print("=" * 60)
-                        
-                        # Recarregar página para ver loading
-                        page.reload(wait_until='domcontentloaded')
-                        
-                        # Procurar por loading indicators
-                        loading_indicators = page.locator('.MuiCircularProgress-root, [class*="loading"], [class*="skeleton"]').all()
-                        
-                        if len(loading_indicators) > 0:
-                            results["test_5_loading_state"]["status"] = "pass"
-                            results["test_5_loading_state"]["details"] = f"✓ {len(loading_indicators)} loading indicators encontrados"
-                            print(f"   ✓ PASS: Loading state implementado")
-                        else:
-                            results["test_5_loading_state"]["status"] = "warning"
-                            results["test_5_loading_state"]["details"] = "⚠ Nenhum loading indicator visível (pode ser muito rápido)"
-                            print(f"   ⚠ WARNING: Loading muito rápido ou não implementado")
-                        
-                        page.wait_for_load_state('networkidle')
-                        page.wait_for_timeout(2000)
-                        
-                        # TESTE 6: Error Handling
-                        print("\n" + "=" * 60)
-                        print("TEST 6: Error Handling")
-                        print("=" * 60)
-                        
-                        # Verificar se há erros no console
-                        error_logs = [log for log in console_logs if 'error' in log.lower()]
-                        
-                        if len(page_errors) == 0:
-                            results["test_6_error_handling"]["status"] = "pass"
-                            results["test_6_error_handling"]["details"] = "✓ Nenhum erro de página detectado"
-                            print(f"   ✓ PASS: Sem erros de página")
-                        else:
-                            results["test_6_error_handling"]["status"] = "fail"
-                            results["test_6_error_handling"]["details"] = f"✗ {len(page_errors)} erros detectados"
-                            print(f"   ✗ FAIL: {len(page_errors)} erros encontrados")
-                            for err in page_errors[:3]:
-                                print(f"      → {err}")
-                        
-                        # TESTE 7: Modelo Sem Badges
-                        print("\n" + "=" * 60)
-                        print("TEST 7: Modelo Sem Badges")
-                        print("=" * 60)
-                        
-                        # Procurar por modelos sem badges
-                        all_model_sections = page.locator('[class*="model"]').all()
-                        models_without_badges = 0
-                        
-                        for section in all_model_sections[:10]:  # Verificar primeiros 10
-                            badges_in_section = section.locator('.MuiChip-root').count()
-                            if badges_in_section == 0:
-                                models_without_badges += 1
-                        
-                        results["test_7_no_badges"]["status"] = "pass"
-                        results["test_7_no_badges"]["details"] = f"✓ Sistema lida corretamente com modelos sem badges"
-                        print(f"   ✓ PASS: {models_without_badges} modelos sem badges renderizados corretamente")
-                        
-                        # TESTE 8: Responsividade
-                        print("\n" + "=" * 60)
-                        print("TEST 8: Responsividade")
-                        print("=" * 60)
-                        
-                        viewports = [
-                            {'width': 1920, 'height': 1080, 'name': 'Desktop'},
-                            {'width': 768, 'height': 1024, 'name': 'Tablet'},
-                            {'width': 375, 'height': 667, 'name': 'Mobile'}
-                        ]
-                        
-                        responsive_ok = True
-                        for viewport in viewports:
-                            page.set_viewport_size({'width': viewport['width'], 'height': viewport['height']})
-                            page.wait_for_timeout(1000)
-                            
-                            # Verificar se badges ainda são visíveis
-                            visible_badges = page.locator('.MuiChip-root:visible').count()
-                            
-                            screenshot_name = f"/tmp/badge_system_{viewport['name'].lower()}.png"
-                            page.screenshot(path=screenshot_name, full_page=True)
-                            
-                            print(f"   → {viewport['name']} ({viewport['width']}x{viewport['height']}): {visible_badges} badges visíveis")
-                            print(f"      Screenshot: {screenshot_name}")
-                            
-                            if visible_badges == 0:
-                                responsive_ok = False
-                        
-                        if responsive_ok:
-                            results["test_8_responsiveness"]["status"] = "pass"
-                            results["test_8_responsiveness"]["details"] = "✓ Layout responsivo funciona em todos os tamanhos"
-                            print(f"   ✓ PASS: Layout responsivo OK")
-                        else:
-                            results["test_8_responsiveness"]["status"] = "fail"
-                            results["test_8_responsiveness"]["details"] = "✗ Problemas de responsividade detectados"
-                            print(f"   ✗ FAIL: Problemas de responsividade")
-                
-            except Exception as e:
-                print(f"   ✗ ERROR: {str(e)}")
-            
-            # TESTE 2 e 3: Filtro e Ordem (testes unitários, não visuais)
-            results["test_2_badge_filter"]["status"] = "skip"
-            results["test_2_badge_filter"]["details"] = "⊘ Teste requer props específicas (teste unitário)"
-            
-            results["test_3_custom_order"]["status"] = "skip"
-            results["test_3_custom_order"]["details"] = "⊘ Teste requer props específicas (teste unitário)"
-            
-        except Exception as e:
-            print(f"\n❌ Erro fatal: {str(e)}")
-            page.screenshot(path='/tmp/badge_system_error.png', full_page=True)
-            print("   Screenshot de erro salvo: /tmp/badge_system_error.png")
-        
-        finally:
-            # Resumo final
-            print("\n" + "=" * 60)
-            print("📊 RESUMO DOS TESTES")
-            print("=" * 60)
-            
-            for test_name, result in results.items():
-                status_icon = {
-                    "pass": "✅",
-                    "fail": "❌",
-                    "warning": "⚠️",
-                    "skip": "⊘",
-                    "pending": "⏸️",
-                    "error": "💥"
-                }.get(result["status"], "❓")
-                
-                print(f"{status_icon} {test_name}: {result['status'].upper()}")
-                print(f"   {result['details']}")
-            
-            # Estatísticas
-            passed = sum(1 for r in results.values() if r["status"] == "pass")
-            failed = sum(1 for r in results.values() if r["status"] == "fail")
-            warnings = sum(1 for r in results.values() if r["status"] == "warning")
-            skipped = sum(1 for r in results.values() if r["status"] == "skip")
-            
-            print("\n" + "=" * 60)
-            print(f"✅ Passed: {passed}")
-            print(f"❌ Failed: {failed}")
-            print(f"⚠️  Warnings: {warnings}")
-            print(f"⊘  Skipped: {skipped}")
-            print("=" * 60)
-            
-            # Salvar resultados em JSON
-            with open('/tmp/badge_system_test_results.json', 'w') as f:
-                json.dump({
-                    'results': results,
-                    'summary': {
-                        'passed': passed,
-                        'failed': failed,
-                        'warnings': warnings,
-                        'skipped': skipped,
-                        'total': len(results)
-                    },
-                    'console_logs': console_logs[-20:],  # Últimos 20 logs
-                    'page_errors': page_errors,
-                    'api_calls': len(api_calls)
-                }, f, indent=2)
-            
-            print("\n📄 Resultados salvos em: /tmp/badge_system_test_results.json")
-            
-            browser.close()
-    
+            server_timing = correlate(api_requests, loki_url)
+        except (OSError, RuntimeError) as e:
+            print(f"\n⚠️  Atribuição cliente x servidor indisponível (Loki em {loki_url}): {e}")
+
+    # Salvar resultados em JSON
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump({
+            'results': results,
+            'summary': {
+                'passed': passed,
+                'failed': failed,
+                'warnings': warnings,
+                'skipped': skipped,
+                'total': len(results)
+            },
+            'console_logs': list(console_logs),
+            'console_leaks': console_leaks,
+            'page_errors': page_errors,
+            'api_calls': len(api_requests),
+            'api_profile': build_report(api_requests),
+            'api_requests_sample': list(api_sample),
+            'server_timing': server_timing,
+            'visual_diff': visual_diff
+        }, f, indent=2)
+
+    print_api_profile(build_report(api_requests))
+    if server_timing:
+        print_attribution(server_timing)
+    profiled = {name: outcome['profile'] for name, outcome in results.items() if outcome.get('profile')}
+    if profiled:
+        print(f"\n🔬 Perfis por etapa ({profile_dir}; .cpuprofile → speedscope, .trace.json → Perfetto):")
+        for test_name, steps in profiled.items():
+            print(f"   {test_name}")
+            print_profile(steps, indent='     ')
+    if console_leaks:
+        kinds = sorted({leak['kind'] for leak in console_leaks})
+        print(f"\n⚠️  {len(console_leaks)} dados sensíveis no console ({', '.join(kinds)})")
+    print(f"\n📄 Resultados salvos em: {RESULTS_FILE}")
+    if jsonl_path:
+        print(f"📄 Resultados por teste (JSONL): {jsonl_path}")
+    if junit_path:
+        print(f"📄 JUnit XML: {junit_path}")
+
     return results
 
+
 if __name__ == "__main__":
-    test_badge_system()
+    parser = argparse.ArgumentParser(description="Testes de aceitação do sistema de badges")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processos paralelos (um browser por worker)")
+    parser.add_argument('--max-redundant-ratio', type=float, default=DEFAULT_MAX_REDUNDANT_RATIO,
+                        help="Fração máxima de requisições de certificação redundantes (teste 4)")
+    parser.add_argument('--viewports', default=DEFAULT_VIEWPORTS_FILE,
+                        help="JSON com a matriz de viewports do teste 8")
+    parser.add_argument('--screenshot-tolerance', type=float, default=0.01,
+                        help="Fração de pixels alterados tolerada contra o baseline de screenshots")
+    parser.add_argument('--update-screenshot-baseline', action='store_true',
+                        help="Promove os screenshots desta execução a baseline")
+    parser.add_argument('--mock', action='store_true',
+                        help="Responde /api/* com o mock backend (sem backend/banco)")
+    har_mode = parser.add_mutually_exclusive_group()
+    har_mode.add_argument('--record', metavar='DIR', help="Grava o tráfego /api/ de cada teste em HARs")
+    har_mode.add_argument('--replay', metavar='DIR', help="Responde /api/ com os HARs gravados (sem rede)")
+    parser.add_argument('--replay-latency-ms', type=int, default=0,
+                        help="Latência artificial por requisição no replay")
+    parser.add_argument('--jsonl', default=RESULTS_JSONL,
+                        help="Arquivo JSONL gravado a cada teste concluído ('' desativa)")
+    parser.add_argument('--junit', metavar='FILE', help="Exporta os resultados em JUnit XML")
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help="Perfil de CPU (cpu) ou trace do Chrome (trace) por etapa da navegação")
+    parser.add_argument('--profile-dir', default=PROFILE_DIR)
+    parser.add_argument('--loki-url', default=LOKI_URL,
+                        help="Loki com o log HTTP do backend para a atribuição cliente x servidor ('' desativa)")
+    args = parser.parse_args()
+    test_badge_system(workers=args.workers, max_redundant_ratio=args.max_redundant_ratio, mock=args.mock,
+                      record_dir=args.record, replay_dir=args.replay, replay_latency_ms=args.replay_latency_ms,
+                      viewports_file=args.viewports, screenshot_tolerance=args.screenshot_tolerance,
+                      update_screenshot_baseline=args.update_screenshot_baseline,
+                      jsonl_path=args.jsonl or None, junit_path=args.junit,
+                      profile_mode=args.profile, profile_dir=args.profile_dir, loki_url=args.loki_url)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Matriz de throttling de rede e CPU para os fluxos de login e badges
+
+Cada perfil de throttle_profiles.json (ex.: fast-3g-4x-cpu) é aplicado via
+CDP (Network.emulateNetworkConditions + Emulation.setCPUThrottlingRate) na
+página de um context novo, antes da primeira navegação:
+
+  - login:  frontend-admin /login (fluxo de test_login_validation.py)
+            login_page_ms = goto → campo de e-mail visível
+            redirect_ms   = clique em Entrar → URL /certifications
+  - badges: Settings → aba Models (fluxo de test_badge_system.py)
+            badges_ms     = clique na aba Models → primeiro badge visível,
+                            medido na página (init script), sem as janelas
+                            de silêncio das esperas do fluxo
+
+As repetições de cada perfil rodam em sequência (CPU dividida distorceria
+o throttling). O relatório compara as medianas com o perfil de referência.
+Com --mock as chamadas /api/ são respondidas por rotas do Playwright, que
+não passam pela rede emulada: só os assets e a CPU ficam lentos.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from browser_pool import BrowserSessionPool
+from config import FRONTEND_ADMIN_URL, TEST_EMAIL, TEST_PASSWORD
+from metrics import summarize
+from readiness import wait_for_url
+from test_badge_system import BADGE_SELECTOR, POOL_OPTIONS, VIEWPORT, BadgePage
+from throttling import apply_throttling, describe, load_profiles, network_conditions, select_profiles
+
+RESULTS_FILE = '/tmp/throttle_matrix.json'
+DEFAULT_PROFILES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'throttle_profiles.json')
+DEFAULT_REFERENCE = 'baseline'
+# Redes lentas multiplicam o carregamento; os timeouts do fluxo normal são curtos demais
+NAV_TIMEOUT_MS = 90000
+FLOW_TIMEOUTS = {'navigation': NAV_TIMEOUT_MS, 'load': NAV_TIMEOUT_MS, 'badges': NAV_TIMEOUT_MS}
+
+# Clique na aba Models zera a medição; o primeiro badge visível depois dele fecha
+BADGE_TIMING_SCRIPT = """
+(() => {
+    const timing = window.__myiaBadgeTiming = { tabClick: null, firstBadge: null };
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    document.addEventListener('click', (event) => {
+        const button = event.target.closest && event.target.closest('button');
+        if (button && /Modelos|Models/.test(button.textContent)) {
+            timing.tabClick = performance.now();
+            timing.firstBadge = null;
+        }
+    }, true);
+    new MutationObserver(() => {
+        if (timing.tabClick === null || timing.firstBadge !== null) return;
+        if (Array.from(document.querySelectorAll(BADGE_SELECTOR)).some(visible)) {
+            timing.firstBadge = performance.now();
+        }
+    }).observe(document, { childList: true, subtree: true, attributes: true });
+})();
+""".replace('BADGE_SELECTOR', json.dumps(BADGE_SELECTOR))
+
+# (fluxo, métrica, título da coluna)
+TABLE_COLUMNS = [
+    ('login', 'login_page_ms', 'Página de login'),
+    ('login', 'redirect_ms', 'Login → redirect'),
+    ('badges', 'badges_ms', 'Models → badges'),
+]
+
+
+def _elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def flow_login(pool, profile):
+    with pool.session(viewport=VIEWPORT, label=f"throttle-login-{profile['name']}") as context:
+        page = context.new_page()
+        apply_throttling(page, profile)
+        started = time.perf_counter()
+        page.goto(f'{FRONTEND_ADMIN_URL}/login', timeout=NAV_TIMEOUT_MS)
+        page.wait_for_selector('input[type="email"]', timeout=NAV_TIMEOUT_MS)
+        login_page_ms = _elapsed_ms(started)
+
+        page.fill('input[type="email"]', TEST_EMAIL)
+        page.fill('input[type="password"]', TEST_PASSWORD)
+        started = time.perf_counter()
+        page.click('button[type="submit"]')
+        if not wait_for_url(page, '**/certifications', timeout=NAV_TIMEOUT_MS):
+            raise RuntimeError("Login não redirecionou para /certifications")
+        return {'login_page_ms': login_page_ms, 'redirect_ms': _elapsed_ms(started)}
+
+
+def flow_badges(pool, profile):
+    with pool.session(authenticated=True, viewport=VIEWPORT, label=f"throttle-badges-{profile['name']}") as context:
+        context.add_init_script(BADGE_TIMING_SCRIPT)
+        badge_page = BadgePage(context, f"throttle-{profile['name']}", timeouts=FLOW_TIMEOUTS)
+        page = badge_page.page
+        page.set_default_timeout(NAV_TIMEOUT_MS)
+        apply_throttling(page, profile)
+        badge_page.open_models()
+        # As esperas do fluxo devolvem False no timeout; o primeiro badge é esperado aqui
+        try:
+            page.wait_for_function('() => window.__myiaBadgeTiming && window.__myiaBadgeTiming.firstBadge !== null',
+                                   timeout=NAV_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            pass
+        timing = page.evaluate('window.__myiaBadgeTiming')
+        if not timing or timing['tabClick'] is None:
+            raise RuntimeError("Clique na aba Models não registrado")
+        if timing['firstBadge'] is None:
+            raise RuntimeError("Nenhum badge visível após abrir a aba Models")
+        return {'badges_ms': round(timing['firstBadge'] - timing['tabClick'], 2)}
+
+
+FLOWS = {
+    'login': flow_login,
+    'badges': flow_badges,
+}
+
+
+def run_profile(pool, profile, flow_names, repetitions):
+    """K repetições de cada fluxo sob o perfil; amostras e erros por fluxo"""
+    flows = {}
+    for name in flow_names:
+        runs, errors = [], []
+        for i in range(repetitions):
+            try:
+                metrics = FLOWS[name](pool, profile)
+            except Exception as e:
+                errors.append(str(e).splitlines()[0])
+                print(f"   ✗ {name} #{i + 1}: {errors[-1]}")
+                continue
+            runs.append(metrics)
+            print(f"   → {name} #{i + 1}: " + ', '.join(f"{k}={v:.0f}ms" for k, v in metrics.items()))
+        metric_names = sorted({metric for run in runs for metric in run})
+        flows[name] = {
+            'runs': runs,
+            'errors': errors,
+            'summary': {metric: summarize([run.get(metric) for run in runs]) for metric in metric_names},
+        }
+    return flows
+
+
+def flow_status(profile, flow):
+    """pass/fail; perfis com expect_failure passam quando nenhuma repetição conclui"""
+    if profile.get('expect_failure'):
+        return 'pass' if not flow['runs'] else 'fail'
+    return 'fail' if flow['errors'] else 'pass'
+
+
+def build_table(results, reference):
+    """Uma linha por perfil: mediana de cada coluna e o fator em relação à referência"""
+    base = next((r for r in results if r['name'] == reference), None)
+    rows = []
+    for result in results:
+        row = {'profile': result['name'], 'description': result['description'], 'columns': {}}
+        for flow, metric, _ in TABLE_COLUMNS:
+            summary = result['flows'].get(flow, {}).get('summary', {}).get(metric)
+            median = summary['p50'] if summary else None
+            base_summary = base['flows'].get(flow, {}).get('summary', {}).get(metric) if base else None
+            base_median = base_summary['p50'] if base_summary else None
+            row['columns'][metric] = {
+                'p50': median,
+                'p95': summary['p95'] if summary else None,
+                'slowdown': round(median / base_median, 2) if median is not None and base_median else None,
+            }
+        row['status'] = 'fail' if any(f['status'] == 'fail' for f in result['flows'].values()) else 'pass'
+        rows.append(row)
+    return rows
+
+
+def _cell(column):
+    if column['p50'] is None:
+        return '—'
+    slowdown = f" ({column['slowdown']:.1f}x)" if column['slowdown'] is not None else ''
+    return f"{column['p50']:.0f}ms{slowdown}"
+
+
+def print_table(rows, reference):
+    headers = ['Perfil'] + [title for _, _, title in TABLE_COLUMNS]
+    lines = [[row['profile']] + [_cell(row['columns'][metric]) for _, metric, _ in TABLE_COLUMNS] for row in rows]
+    widths = [max(len(headers[i]), *(len(line[i]) for line in lines)) for i in range(len(headers))]
+
+    print("\n" + "=" * 60)
+    print(f"📊 MATRIZ DE THROTTLING (mediana, fator vs {reference})")
+    print("=" * 60)
+    print('   ' + ' │ '.join(h.ljust(w) for h, w in zip(headers, widths)))
+    print('   ' + '─┼─'.join('─' * w for w in widths))
+    for row, line in zip(rows, lines):
+        icon = '❌' if row['status'] == 'fail' else '✅'
+        print(f"{icon} " + ' │ '.join(cell.ljust(w) for cell, w in zip(line, widths)) + f"  {row['description']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Matriz de throttling de rede/CPU (login e badges)")
+    parser.add_argument('--profiles', help="Perfis separados por vírgula (padrão: os marcados como default)")
+    parser.add_argument('--profiles-file', default=DEFAULT_PROFILES_FILE)
+    parser.add_argument('--flows', default=','.join(FLOWS), help="Fluxos separados por vírgula")
+    parser.add_argument('--repetitions', '-k', type=int, default=3)
+    parser.add_argument('--reference', default=DEFAULT_REFERENCE, help="Perfil usado como base dos fatores")
+    parser.add_argument('--mock', action='store_true', help="/api/* respondido pelo mock backend")
+    args = parser.parse_args()
+
+    flow_names = [name.strip() for name in args.flows.split(',') if name.strip()]
+    unknown = [name for name in flow_names if name not in FLOWS]
+    if unknown:
+        parser.error(f"Fluxos desconhecidos: {', '.join(unknown)}")
+    names = [name.strip() for name in args.profiles.split(',') if name.strip()] if args.profiles else None
+    try:
+        profiles = select_profiles(load_profiles(args.profiles_file), names)
+    except ValueError as e:
+        parser.error(str(e))
+    if not profiles:
+        parser.error("Nenhum perfil selecionado")
+
+    print(f"🐌 Matriz de throttling: {len(profiles)} perfis × {', '.join(flow_names)}, "
+          f"{args.repetitions} repetições")
+    if args.mock:
+        print("   ⚠️  Mock backend: /api/ não passa pela rede emulada")
+
+    results = []
+    with BrowserSessionPool(**dict(POOL_OPTIONS, mock_backend=args.mock)) as pool:
+        for profile in profiles:
+            print(f"\n📶 {profile['name']}: {describe(profile)}")
+            flows = run_profile(pool, profile, flow_names, args.repetitions)
+            for flow in flows.values():
+                flow['status'] = flow_status(profile, flow)
+            results.append({
+                'name': profile['name'],
+                'description': describe(profile),
+                'network': network_conditions(profile),
+                'cpu_rate': profile.get('cpu_rate', 1),
+                'expect_failure': bool(profile.get('expect_failure')),
+                'flows': flows,
+            })
+
+    table = build_table(results, args.reference)
+    print_table(table, args.reference)
+
+    report = {
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'repetitions': args.repetitions,
+        'reference': args.reference,
+        'mock_backend': args.mock,
+        'profiles': results,
+        'table': table,
+    }
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Resultados salvos em: {RESULTS_FILE}")
+
+    failed = [row['profile'] for row in table if row['status'] == 'fail']
+    if failed:
+        print(f"⚠️  Perfis com falha: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Varredura paralela de viewports para o teste de responsividade
+
+Cada viewport da matriz (viewports.json) ganha um BrowserContext próprio
+com emulação de dispositivo (DPR, touch, mobile, user agent) e todos
+navegam até Settings → Models ao mesmo tempo pela API assíncrona do
+Playwright, em um browser separado rodando em outra thread (a API
+síncrona do teste mantém o event loop da thread principal ocupado).
+
+Por viewport: badges visíveis, tempo até o DOM estabilizar e CLS. Se o
+DOM não estabiliza em RENDER_TIMEOUT_MS, render_ms fica None e
+render_timed_out True (o tempo medido seria só o limite de espera).
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from playwright.async_api import async_playwright
+
+from config import FRONTEND_URL
+from dom_snapshot import dom_snapshot_async
+from page_metrics import PERF_OBSERVER_SCRIPT
+from readiness import wait_for_dom_quiet_async
+
+DEFAULT_VIEWPORTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'viewports.json')
+
+BADGE_SELECTOR = '.MuiChip-root'
+QUIET_MS = 300
+RENDER_TIMEOUT_MS = 15000
+
+_EMULATION_KEYS = ('device_scale_factor', 'is_mobile', 'has_touch')
+
+
+def load_viewports(path=DEFAULT_VIEWPORTS_FILE):
+    with open(path) as f:
+        return json.load(f)['viewports']
+
+
+def _context_options(playwright, viewport):
+    """Opções de new_context(): descritor de playwright.devices ou campos avulsos"""
+    if 'device' in viewport:
+        options = dict(playwright.devices[viewport['device']])
+        options.pop('default_browser_type', None)
+    else:
+        options = {'viewport': {'width': viewport['width'], 'height': viewport['height']}}
+        options.update({k: viewport[k] for k in _EMULATION_KEYS if k in viewport})
+    return options
+
+
+async def _install_backend_routes(context, pool):
+    """Replica no context assíncrono o mock/replay de HAR configurado no pool"""
+    if pool.mock_backend is not None:
+        backend = pool.mock_backend
+
+        async def fulfill(route):
+            request = route.request
+            # handle() dorme a latência simulada: fora do event loop, para não travar os outros viewports
+            status, headers, body = await asyncio.get_running_loop().run_in_executor(
+                None, backend.handle, request.method, request.url, request.headers, request.post_data)
+            await route.fulfill(status=status, headers=headers, body=body)
+
+        await context.route(lambda url: urlsplit(url).path.startswith('/api/'), fulfill)
+    for har_file in pool.har_replay_files:
+        await context.route_from_har(har_file, url='**/api/**', not_found='fallback')
+    if pool.har_replay_files and pool.replay_latency_ms:
+        async def delay(route):
+            await asyncio.sleep(pool.replay_latency_ms / 1000)
+            await route.fallback()
+        await context.route('**/api/**', delay)
+
+
+async def _check_viewport(browser, playwright, viewport, pool, selectors, screenshots):
+    outcome = {'name': viewport['name']}
+    options = _context_options(playwright, viewport)
+    context = await browser.new_context(storage_state=pool.auth_state, **options)
+    try:
+        await _install_backend_routes(context, pool)
+        await context.add_init_script(PERF_OBSERVER_SCRIPT)
+        page = await context.new_page()
+        outcome.update(
+            width=page.viewport_size['width'],
+            height=page.viewport_size['height'],
+            device_scale_factor=options.get('device_scale_factor', 1),
+            is_mobile=options.get('is_mobile', False),
+            has_touch=options.get('has_touch', False),
+        )
+
+        started = time.perf_counter()
+        await page.goto(FRONTEND_URL, wait_until='networkidle', timeout=30000)
+        settings_button = page.locator(selectors['settings']).first
+        if await settings_button.count() == 0:
+            raise RuntimeError("Botão de Settings não encontrado")
+        await settings_button.click()
+        models_tab = page.locator(selectors['models_tab']).first
+        await models_tab.wait_for(timeout=10000)
+        await models_tab.click()
+        quiet = await wait_for_dom_quiet_async(page, quiet_ms=QUIET_MS, timeout=RENDER_TIMEOUT_MS)
+        outcome['render_timed_out'] = not quiet
+        outcome['render_ms'] = round((time.perf_counter() - started) * 1000 - QUIET_MS, 2) if quiet else None
+
+        snapshot = await dom_snapshot_async(page, counts={'badges': BADGE_SELECTOR},
+                                            globals={'cls': '__myiaPerf.cls'})
+        outcome['visible_badges'] = snapshot['counts']['badges']['visible']
+        outcome['cls'] = round(snapshot['globals']['cls'] or 0, 4)
+        slug = viewport['name'].lower().replace(' ', '_')
+        entry = screenshots.save(f'viewport_{slug}', await page.screenshot(full_page=True))
+        outcome['screenshot'] = screenshots.object_path(entry)
+    except Exception as e:
+        outcome['error'] = str(e)
+    finally:
+        await context.close()
+    return outcome
+
+
+async def _sweep(viewports, pool, selectors, screenshots, headless):
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=headless)
+        try:
+            return await asyncio.gather(*[
+                _check_viewport(browser, playwright, viewport, pool, selectors, screenshots)
+                for viewport in viewports
+            ])
+        finally:
+            await browser.close()
+
+
+def sweep_viewports(viewports, pool, selectors, screenshots):
+    """
+    Executa a matriz em paralelo e retorna um resultado por viewport (na ordem dada)
+
+    pool: BrowserSessionPool já autenticado (auth_state, mock e replay de HAR são reaproveitados)
+    selectors: {'settings': ..., 'models_tab': ...}
+    screenshots: ScreenshotStore que recebe uma captura por viewport
+    """
+    outcome = {}
+
+    def run():
+        try:
+            outcome['results'] = asyncio.run(_sweep(viewports, pool, selectors, screenshots, pool.headless))
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run, name='viewport-sweep')
+    thread.start()
+    thread.join()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['results']